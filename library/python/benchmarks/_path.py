@@ -0,0 +1,14 @@
+"""
+Make golden_path importable when a benchmark runs from a source checkout.
+
+Benchmark scripts import this module before golden_path; it puts the
+library directory (the parent of benchmarks/) first on sys.path.
+"""
+
+import os
+import sys
+
+LIBRARY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if LIBRARY_DIR not in sys.path:
+    sys.path.insert(0, LIBRARY_DIR)
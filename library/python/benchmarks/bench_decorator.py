@@ -0,0 +1,90 @@
+"""
+Micro-benchmark ObservabilityMiddleware.decorator.
+
+Reports ns per call of a trivial decorated function, compared with the
+previous per-call implementation, for sync and async functions. Spans are
+unsampled so the numbers show the decorator's own overhead.
+
+Usage:
+    python benchmarks/bench_decorator.py [calls]
+"""
+
+import asyncio
+import sys
+import time
+from functools import wraps
+
+import _path  # noqa: F401  (makes golden_path importable)
+
+from golden_path.metrics import MetricsCollector
+from golden_path.middleware import ObservabilityMiddleware
+from golden_path.tracing import TracingCollector
+
+
+def _legacy_decorator(observability, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        func_name = f"{func.__module__}.{func.__name__}"
+        start_time = time.time()
+
+        with observability.tracing.span(
+            func_name,
+            attributes={"function.name": func.__name__},
+        ):
+            observability.logger.debug(f"Calling {func_name}")
+            result = func(*args, **kwargs)
+            duration = time.time() - start_time
+            observability.metrics.record_business_operation(
+                func_name, "success", duration
+            )
+            observability.logger.debug(
+                f"{func_name} completed",
+                duration_ms=duration * 1000,
+            )
+            return result
+
+    return wrapper
+
+
+def _per_call_ns(func, calls: int) -> float:
+    start = time.perf_counter_ns()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter_ns() - start) / calls
+
+
+async def _async_per_call_ns(func, calls: int) -> float:
+    start = time.perf_counter_ns()
+    for i in range(calls):
+        await func(i)
+    return (time.perf_counter_ns() - start) / calls
+
+
+def main(calls: int = 200_000):
+    observability = ObservabilityMiddleware(
+        "bench",
+        metrics_collector=MetricsCollector("bench"),
+        tracing_collector=TracingCollector("bench", transport="none", sample_ratio=0.0),
+    )
+
+    def handler(value):
+        return value
+
+    async def async_handler(value):
+        return value
+
+    bare = _per_call_ns(handler, calls)
+    legacy = _per_call_ns(_legacy_decorator(observability, handler), calls)
+    after = _per_call_ns(observability.decorator(handler), calls)
+    async_after = asyncio.run(
+        _async_per_call_ns(observability.decorator(async_handler), calls)
+    )
+
+    print(f"undecorated         {bare:>8.0f} ns/call")
+    print(f"sync before         {legacy:>8.0f} ns/call")
+    print(f"sync after          {after:>8.0f} ns/call  ({legacy / after:.2f}x)")
+    print(f"async after         {async_after:>8.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,73 @@
+"""
+Measure cold import time of golden_path with ``python -X importtime``.
+
+Each statement runs in a fresh interpreter; the cumulative time of the
+top-level imports it triggers (excluding interpreter startup) is compared
+against a budget. Exits non-zero if any statement is over budget.
+
+Usage:
+    python benchmarks/bench_import_time.py
+"""
+
+import os
+import subprocess
+import sys
+
+from _path import LIBRARY_DIR
+
+# Statement -> budget in milliseconds
+BUDGETS_MS = {
+    "import golden_path": 10.0,
+    "from golden_path import StructuredLogger": 30.0,
+    "from golden_path import MetricsCollector": None,
+    "from golden_path import TracingCollector": None,
+    "from golden_path import ObservabilityMiddleware": None,
+}
+
+
+def _top_level_imports(statement: str) -> dict:
+    """Run a statement under -X importtime and return top-level import times."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [LIBRARY_DIR, env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; only top-level entries are summed
+        if not name.startswith("  "):
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def main() -> int:
+    baseline = _top_level_imports("pass")
+    failed = False
+
+    for statement, budget_ms in BUDGETS_MS.items():
+        imports = _top_level_imports(statement)
+        total_ms = sum(
+            cumulative for name, cumulative in imports.items() if name not in baseline
+        ) / 1000
+        status = ""
+        if budget_ms is not None:
+            status = "ok" if total_ms <= budget_ms else "OVER BUDGET"
+            status = f"(budget {budget_ms:.0f} ms) {status}"
+            failed = failed or total_ms > budget_ms
+        print(f"{statement:<50} {total_ms:>8.1f} ms {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Benchmark StructuredLogger throughput (lines/sec).
+
+Compares the legacy pipeline (json.dumps in the logger, json.loads probe in
+the formatter) against the single-serialization pipeline for each installed
+encoder.
+
+Usage:
+    python benchmarks/bench_logging.py [iterations]
+"""
+
+import io
+import json
+import logging
+import sys
+import time
+
+import _path  # noqa: F401  (makes golden_path importable)
+
+from golden_path.logging import StructuredFormatter, StructuredLogger
+
+
+class LegacyFormatter(logging.Formatter):
+    """Formatter reproducing the previous json.loads probe."""
+
+    def format(self, record):
+        try:
+            json.loads(record.getMessage())
+            return record.getMessage()
+        except (json.JSONDecodeError, ValueError):
+            return record.getMessage()
+
+
+def _legacy_log(logger, message, **kwargs):
+    log_data = {
+        "service": "bench",
+        "environment": "benchmark",
+        "version": "0.0.0",
+        "message": message,
+    }
+    log_data.update(kwargs)
+    logger.log(logging.INFO, json.dumps(log_data))
+
+
+def _make_logger(formatter):
+    logger = StructuredLogger(
+        "bench", "benchmark", "0.0.0", enable_trace_correlation=False
+    )
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(formatter)
+    logger.logger.handlers = [handler]
+    return logger
+
+
+def _run(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn("HTTP request completed", method="GET", endpoint="/orders", status_code=200)
+    return iterations / (time.perf_counter() - start)
+
+
+def main(iterations: int = 100_000):
+    legacy = _make_logger(LegacyFormatter())
+    results = {
+        "legacy": _run(lambda m, **kw: _legacy_log(legacy.logger, m, **kw), iterations)
+    }
+
+    for encoder in ("json", "orjson", "msgspec"):
+        try:
+            formatter = StructuredFormatter(encoder=encoder)
+        except ImportError:
+            continue
+        results[encoder] = _run(_make_logger(formatter).info, iterations)
+
+    for name, rate in results.items():
+        print(f"{name:>10}: {rate:>12,.0f} lines/sec ({rate / results['legacy']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark MetricsCollector.record_http_request.
+
+Reports ns per call with and without the pre-bound label-child cache,
+with several threads recording concurrently.
+
+Usage:
+    python benchmarks/bench_record_http_request.py [calls_per_thread]
+"""
+
+import sys
+import threading
+import time
+
+import _path  # noqa: F401  (makes golden_path importable)
+
+from golden_path.metrics import MetricsCollector
+
+ROUTES = [
+    ("GET", "/orders/{order_id}", 200),
+    ("POST", "/orders", 201),
+    ("GET", "/users/{user_id}", 200),
+    ("GET", "/users/{user_id}", 404),
+]
+
+
+def _legacy_record(metrics, method, endpoint, status_code, duration):
+    labels = [method, endpoint, str(status_code)]
+    metrics.http_requests_total.labels(*labels).inc()
+    metrics.http_request_duration_seconds.labels(*labels).observe(duration)
+
+
+def _run(record, threads: int, calls: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for i in range(calls):
+            method, endpoint, status_code = ROUTES[i & 3]
+            record(method, endpoint, status_code, 0.012)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    barrier.wait()
+    start = time.perf_counter_ns()
+    for worker_thread in workers:
+        worker_thread.join()
+    return (time.perf_counter_ns() - start) / (threads * calls)
+
+
+def main(calls: int = 200_000):
+    for threads in (1, 4, 8):
+        legacy = MetricsCollector("bench", http_child_cache_size=0)
+        cached = MetricsCollector("bench")
+        cached.prebind_http_routes([(m, e) for m, e, _ in ROUTES], (200, 201, 404))
+
+        before = _run(
+            lambda *args: _legacy_record(legacy, *args), threads, calls // threads
+        )
+        after = _run(cached.record_http_request, threads, calls // threads)
+        print(
+            f"{threads:>2} threads: before {before:>7.0f} ns/call  "
+            f"after {after:>7.0f} ns/call  ({before / after:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
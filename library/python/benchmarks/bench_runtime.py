@@ -0,0 +1,77 @@
+"""
+Overhead of the runtime collector's always-on hooks.
+
+Measures ns per garbage collection with and without the GC pause callback,
+an allocation-heavy workload that triggers many young-generation
+collections, and ns per event loop callback with and without the
+slow-callback hook.
+
+Usage:
+    python benchmarks/bench_runtime.py [iterations]
+"""
+
+import asyncio
+import gc
+import sys
+import time
+
+import _path  # noqa: F401  (makes golden_path importable)
+
+from golden_path.metrics import MetricsCollector
+from golden_path.runtime import RuntimeCollector
+
+
+def _gc_collect_ns(iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        gc.collect(0)
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def _allocation_ns(iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for i in range(iterations):
+        {"id": i, "items": [i, i + 1]}
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def _event_loop_callback_ns(iterations: int) -> float:
+    async def worker(steps: int):
+        for _ in range(steps):
+            await asyncio.sleep(0)
+
+    async def run():
+        tasks = 10
+        start = time.perf_counter_ns()
+        await asyncio.gather(*(worker(iterations // tasks) for _ in range(tasks)))
+        return (time.perf_counter_ns() - start) / iterations
+
+    return asyncio.run(run())
+
+
+def _compare(label: str, measure, runtime: RuntimeCollector, iterations: int):
+    before = measure(iterations)
+    runtime.start()
+    after = measure(iterations)
+    runtime.close()
+    print(
+        f"{label:<32} off {before:>8.0f} ns  on {after:>8.0f} ns  "
+        f"(+{after - before:.0f} ns)"
+    )
+
+
+def main(iterations: int = 200_000):
+    metrics = MetricsCollector("bench")
+
+    gc_runtime = RuntimeCollector(metrics, slow_callbacks=False)
+    _compare(
+        "gc.collect(0), empty young gen", _gc_collect_ns, gc_runtime, iterations // 10
+    )
+    _compare("allocation (dict + list)", _allocation_ns, gc_runtime, iterations * 5)
+
+    loop_runtime = RuntimeCollector(metrics, gc_pauses=False)
+    _compare("event loop callback", _event_loop_callback_ns, loop_runtime, iterations)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,61 @@
+"""
+Scaling benchmark for sharded metrics.
+
+Runs record_http_request and record_business_operation on a shared
+MetricsCollector from 1, 4, 16 and 64 threads, with the default
+prometheus_client backend and with sharded=True. It reports the total
+calls per second for each. All threads record the same series, which is
+the worst case for lock contention.
+
+Usage:
+    python benchmarks/bench_sharded.py [calls_per_thread]
+"""
+
+import sys
+import threading
+import time
+
+import _path  # noqa: F401  (makes golden_path importable)
+
+from golden_path.metrics import MetricsCollector
+
+THREAD_COUNTS = (1, 4, 16, 64)
+
+
+def _calls_per_second(metrics: MetricsCollector, threads: int, calls: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        record_http_request = metrics.record_http_request
+        record_business_operation = metrics.record_business_operation
+        barrier.wait()
+        for _ in range(calls):
+            record_http_request("GET", "/orders/{id}", 200, 0.012)
+            record_business_operation("checkout", "success", 0.05)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter_ns()
+    for thread in workers:
+        thread.join()
+    elapsed = (time.perf_counter_ns() - start) / 1e9
+    return threads * calls / elapsed
+
+
+def main(calls: int = 20_000):
+    print(f"{'threads':<9}{'default':>14}{'sharded':>14}")
+    for threads in THREAD_COUNTS:
+        default = _calls_per_second(MetricsCollector("bench"), threads, calls)
+        sharded = _calls_per_second(
+            MetricsCollector("bench", sharded=True), threads, calls
+        )
+        print(
+            f"{threads:<9}{default:>10,.0f}/s {sharded:>10,.0f}/s"
+            f"  ({sharded / default:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,85 @@
+"""
+Compare sketch-backed and fixed-bucket latency histograms.
+
+Observes a log-normal latency distribution concentrated below 5ms (where
+the default HTTP buckets have a single bucket) into a prometheus_client
+Histogram and a DDSketch, then reports the relative error of p50/p90/p99
+estimates (linear interpolation within buckets for the classic histogram),
+the number of stored buckets or bins per series, and ns per observe().
+
+Usage:
+    python benchmarks/bench_sketch.py [observations]
+"""
+
+import random
+import sys
+import time
+
+import _path  # noqa: F401  (makes golden_path importable)
+
+from prometheus_client import CollectorRegistry, Histogram
+
+from golden_path.sketch import DDSketch
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _bucket_quantile(bounds, cumulative, q: float) -> float:
+    # Same interpolation as PromQL histogram_quantile()
+    rank = q * cumulative[-1]
+    lower, below = 0.0, 0
+    for bound, count in zip(bounds, cumulative):
+        if count >= rank:
+            if bound == float("inf"):
+                return lower
+            return lower + (bound - lower) * (rank - below) / max(count - below, 1)
+        lower, below = bound, count
+    return lower
+
+
+def _per_observe_ns(observe, values) -> float:
+    start = time.perf_counter_ns()
+    for value in values:
+        observe(value)
+    return (time.perf_counter_ns() - start) / len(values)
+
+
+def main(observations: int = 200_000):
+    rng = random.Random(42)
+    values = [rng.lognormvariate(-7, 0.6) for _ in range(observations)]
+    exact = sorted(values)
+
+    histogram = Histogram(
+        "bench_seconds", "bench", registry=CollectorRegistry(), buckets=HTTP_BUCKETS
+    )
+    sketch = DDSketch(relative_accuracy=0.01)
+    classic_ns = _per_observe_ns(histogram.observe, values)
+    sketch_ns = _per_observe_ns(sketch.observe, values)
+
+    bounds, cumulative = [], []
+    for sample in histogram.collect()[0].samples:
+        if sample.name.endswith("_bucket"):
+            bounds.append(float(sample.labels["le"]))
+            cumulative.append(sample.value)
+
+    print(
+        f"{'quantile':<10}{'exact':>12}{'classic':>12}{'error':>9}"
+        f"{'sketch':>12}{'error':>9}"
+    )
+    for q in QUANTILES:
+        true = exact[int(q * (len(exact) - 1))]
+        classic = _bucket_quantile(bounds, cumulative, q)
+        estimate = sketch.quantile(q)
+        print(
+            f"p{q * 100:<9g}{true * 1000:>10.3f}ms{classic * 1000:>10.3f}ms"
+            f"{abs(classic - true) / true:>9.1%}{estimate * 1000:>10.3f}ms"
+            f"{abs(estimate - true) / true:>9.1%}"
+        )
+
+    print(f"classic: {len(bounds)} buckets/series, {classic_ns:.0f} ns/observe")
+    print(f"sketch:  {len(sketch)} bins/series, {sketch_ns:.0f} ns/observe")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark TracingCollector.span.
+
+Compares the previous generator-based span() (start_span without making
+the span current) with the context-activating implementation, for sampled
+root spans, unsampled root spans (sampled before any SDK span is built) and
+children of an unsampled trace (which short-circuit to a shared no-op scope).
+Spans go to an in-memory exporter.
+
+Usage:
+    python benchmarks/bench_span.py [iterations]
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+
+import _path  # noqa: F401  (makes golden_path importable)
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace.sampling import ALWAYS_OFF, ALWAYS_ON, ParentBased
+
+from golden_path.tracing import TracingCollector
+
+ATTRIBUTES = {"order.id": "42", "order.items": 3}
+
+
+def _legacy_span(tracer):
+    @contextmanager
+    def span(name, attributes=None, kind=None):
+        current = tracer.start_span(
+            name, kind=kind or trace.SpanKind.INTERNAL, attributes=attributes
+        )
+        try:
+            yield current
+        except Exception as e:
+            if current.is_recording():
+                current.record_exception(e)
+                current.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+            raise
+        finally:
+            current.end()
+
+    return span
+
+
+def _per_call_ns(span, iterations: int, parent=None) -> float:
+    def run():
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            with span("bench", ATTRIBUTES):
+                pass
+        return (time.perf_counter_ns() - start) / iterations
+
+    if parent is None:
+        return run()
+    with parent("parent"):
+        return run()
+
+
+def main(iterations: int = 50_000):
+    tracing = TracingCollector("bench", transport="memory")
+    legacy = _legacy_span(tracing.tracer)
+    cases = [
+        ("sampled root", ALWAYS_ON, None),
+        ("unsampled root", ALWAYS_OFF, None),
+        ("unsampled child", ParentBased(ALWAYS_OFF), tracing.span),
+    ]
+
+    for label, sampler, parent in cases:
+        tracing.sampler = sampler
+        before = _per_call_ns(legacy, iterations, parent)
+        tracing.exporter.clear()
+        after = _per_call_ns(tracing.span, iterations, parent)
+        tracing.exporter.clear()
+        print(
+            f"{label:<16} before {before:>8.0f} ns/span  "
+            f"after {after:>8.0f} ns/span  ({before / after:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
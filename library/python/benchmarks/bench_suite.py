@@ -0,0 +1,325 @@
+"""
+Per-call overhead benchmark suite for the library's hot paths.
+
+Covers MetricsCollector.record_http_request, span creation with and without
+sampling, StructuredLogger.info with and without trace correlation, the
+instrumentation decorator, and full Flask and FastAPI round-trips through
+their test clients (bare and instrumented). Everything runs offline: spans
+go to an in-memory exporter and log lines to os.devnull.
+
+Each benchmark is timed over several rounds; the median ns per call is
+reported. Results can be written as JSON and compared against a previous
+run, exiting non-zero if any benchmark regressed by more than the threshold.
+
+Usage:
+    python benchmarks/bench_suite.py [--json results.json]
+        [--compare baseline.json] [--threshold 0.2] [--rounds 5]
+        [--scale 1.0] [--filter name]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import _path  # noqa: F401  (makes golden_path importable)
+
+import golden_path
+from golden_path.metrics import MetricsCollector
+from golden_path.middleware import ObservabilityMiddleware
+from golden_path.logging import StructuredLogger
+from golden_path.tracing import TracingCollector
+
+
+def _time_sync(func: Callable[[], None], iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+class Suite:
+    """Registry of benchmarks sharing one set of collectors."""
+
+    def __init__(self):
+        # The tracer provider is process-global, so a single collector is
+        # shared and its sampler swapped per benchmark
+        self.tracing = TracingCollector(
+            "bench", "benchmark", "0.0.0", transport="memory"
+        )
+        self.metrics = MetricsCollector("bench", "benchmark", "0.0.0")
+        self.devnull = open(os.devnull, "w")
+        self.logger = self._make_logger(enable_trace_correlation=True)
+        self.observability = ObservabilityMiddleware(
+            "bench",
+            "benchmark",
+            "0.0.0",
+            metrics_collector=self.metrics,
+            tracing_collector=self.tracing,
+            logger=self.logger,
+        )
+        self.benchmarks: Dict[str, Callable[[int], float]] = {}
+
+    def _make_logger(self, enable_trace_correlation: bool) -> StructuredLogger:
+        logger = StructuredLogger(
+            "bench",
+            "benchmark",
+            "0.0.0",
+            enable_trace_correlation=enable_trace_correlation,
+        )
+        logger.logger.handlers[0].stream = self.devnull
+        return logger
+
+    def _set_sampling(self, sampled: bool):
+        from opentelemetry.sdk.trace.sampling import ALWAYS_OFF, ALWAYS_ON
+
+        self.tracing.sampler = ALWAYS_ON if sampled else ALWAYS_OFF
+        self.tracing.exporter.clear()
+
+    def register(self, name: str, iterations: int):
+        """Register a benchmark function taking an iteration count."""
+
+        def decorate(func):
+            self.benchmarks[name] = lambda scale: func(max(1, int(iterations * scale)))
+            return func
+
+        return decorate
+
+    def setup(self):
+        metrics = self.metrics
+        tracing = self.tracing
+        logger = self.logger
+        plain_logger = self._make_logger(enable_trace_correlation=False)
+
+        @self.register("metrics.record_http_request", 200_000)
+        def record_http_request(iterations):
+            return _time_sync(
+                lambda: metrics.record_http_request("GET", "/orders/{id}", 200, 0.012),
+                iterations,
+            )
+
+        def span_benchmark(sampled: bool):
+            def run(iterations):
+                self._set_sampling(sampled)
+
+                def call():
+                    with tracing.span("bench", attributes={"order.id": "42"}):
+                        pass
+
+                return _time_sync(call, iterations)
+
+            return run
+
+        self.register("tracing.span[sampled]", 50_000)(span_benchmark(True))
+        self.register("tracing.span[unsampled]", 50_000)(span_benchmark(False))
+
+        def log_call(log):
+            return lambda: log.info(
+                "HTTP request completed", method="GET", status_code=200
+            )
+
+        @self.register("logging.info[trace_correlation]", 50_000)
+        def info_with_trace(iterations):
+            self._set_sampling(True)
+            with tracing.tracer.start_as_current_span("bench"):
+                return _time_sync(log_call(logger), iterations)
+
+        @self.register("logging.info[no_trace_correlation]", 50_000)
+        def info_without_trace(iterations):
+            return _time_sync(log_call(plain_logger), iterations)
+
+        @self.observability.decorator
+        def decorated(value=None):
+            return value
+
+        @self.register("middleware.decorator", 50_000)
+        def decorator(iterations):
+            self._set_sampling(True)
+            return _time_sync(decorated, iterations)
+
+        self._setup_flask()
+        self._setup_fastapi()
+
+    def _setup_flask(self):
+        try:
+            from flask import Flask
+        except ImportError:
+            return
+
+        def make_app(instrumented: bool):
+            app = Flask("bench")
+
+            @app.route("/orders/<order_id>")
+            def get_order(order_id):
+                return {"order_id": order_id}
+
+            if instrumented:
+                self.observability.flask_middleware(app)
+            return app
+
+        def round_trip(instrumented: bool):
+            def run(iterations):
+                self._set_sampling(True)
+                client = make_app(instrumented).test_client()
+                return _time_sync(lambda: client.get("/orders/42"), iterations)
+
+            return run
+
+        self.register("flask.round_trip[bare]", 5_000)(round_trip(False))
+        self.register("flask.round_trip[instrumented]", 5_000)(round_trip(True))
+
+    def _setup_fastapi(self):
+        try:
+            import httpx
+            from fastapi import FastAPI
+        except ImportError:
+            return
+
+        def make_app(instrumented: bool):
+            app = FastAPI()
+
+            @app.get("/orders/{order_id}")
+            async def get_order(order_id: str):
+                return {"order_id": order_id}
+
+            if instrumented:
+                self.observability.fastapi_middleware(app)
+            return app
+
+        def round_trip(instrumented: bool):
+            def run(iterations):
+                self._set_sampling(True)
+                app = make_app(instrumented)
+
+                async def session():
+                    transport = httpx.ASGITransport(app=app)
+                    async with httpx.AsyncClient(
+                        transport=transport, base_url="http://bench"
+                    ) as client:
+                        start = time.perf_counter_ns()
+                        for _ in range(iterations):
+                            await client.get("/orders/42")
+                        return (time.perf_counter_ns() - start) / iterations
+
+                return asyncio.run(session())
+
+            return run
+
+        self.register("fastapi.round_trip[bare]", 2_000)(round_trip(False))
+        self.register("fastapi.round_trip[instrumented]", 2_000)(round_trip(True))
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(rounds: int, scale: float, name_filter: str = "") -> dict:
+    """Run every benchmark and return the JSON-serializable results."""
+    suite = Suite()
+    suite.setup()
+
+    results = {}
+    for name, benchmark in suite.benchmarks.items():
+        if name_filter and name_filter not in name:
+            continue
+        benchmark(scale / 10)  # warm up caches and lazily bound children
+        samples: List[float] = [benchmark(scale) for _ in range(rounds)]
+        results[name] = {
+            "ns_per_call": statistics.median(samples),
+            "min_ns": min(samples),
+            "max_ns": max(samples),
+            "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "rounds": rounds,
+        }
+        print(f"{name:<40} {results[name]['ns_per_call']:>12,.0f} ns/call")
+
+    for framework in ("flask", "fastapi"):
+        bare = results.get(f"{framework}.round_trip[bare]")
+        instrumented = results.get(f"{framework}.round_trip[instrumented]")
+        if bare and instrumented:
+            overhead = instrumented["ns_per_call"] - bare["ns_per_call"]
+            print(f"{framework + ' middleware overhead':<40} {overhead:>12,.0f} ns/req")
+
+    return {
+        "meta": {
+            "golden_path_version": golden_path.__version__,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print per-benchmark deltas; return True if any regressed past threshold."""
+    regressed = False
+    print(f"\ncompared with {baseline['meta'].get('commit', 'baseline')}:")
+    for name, result in results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            continue
+        change = result["ns_per_call"] / previous["ns_per_call"] - 1
+        status = ""
+        if change > threshold:
+            status = "REGRESSION"
+            regressed = True
+        print(f"{name:<40} {change:>+8.1%} {status}")
+    return regressed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown counted as a regression (default: 0.2)",
+    )
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per benchmark")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiplier for iteration counts"
+    )
+    parser.add_argument("--filter", default="", help="only run matching benchmarks")
+    args = parser.parse_args(argv)
+
+    # Instrumentation may log exporter errors; keep the output readable
+    logging.getLogger("opentelemetry").setLevel(logging.CRITICAL)
+
+    results = run_suite(args.rounds, args.scale, args.filter)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@
 Example FastAPI application using Golden Path observability.
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from golden_path import ObservabilityMiddleware
 
 app = FastAPI(title="Example FastAPI App")
@@ -29,13 +29,14 @@ def health():
 
 
 @app.get("/metrics")
-def metrics():
+def metrics(request: Request):
     """Expose Prometheus metrics."""
     from fastapi.responses import Response
-    return Response(
-        content=observability.metrics.get_metrics(),
-        media_type="text/plain",
+    body, headers = observability.metrics.render_metrics(
+        request.headers.get("accept"),
+        request.headers.get("accept-encoding"),
     )
+    return Response(content=body, headers=headers)
 
 
 if __name__ == "__main__":
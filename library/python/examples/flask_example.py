@@ -31,11 +31,12 @@ def health():
 @app.route("/metrics")
 def metrics():
     """Expose Prometheus metrics."""
-    from flask import Response
-    return Response(
-        observability.metrics.get_metrics(),
-        mimetype="text/plain",
+    from flask import Response, request
+    body, headers = observability.metrics.render_metrics(
+        request.headers.get("Accept"),
+        request.headers.get("Accept-Encoding"),
     )
+    return Response(body, headers=headers)
 
 
 if __name__ == "__main__":
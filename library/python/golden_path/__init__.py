@@ -7,10 +7,23 @@ with Prometheus, Tempo, and Loki.
 
 __version__ = "0.1.0"
 
-from .middleware import ObservabilityMiddleware
-from .metrics import MetricsCollector
-from .tracing import TracingCollector
-from .logging import StructuredLogger
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .middleware import ObservabilityMiddleware
+    from .metrics import MetricsCollector
+    from .tracing import TracingCollector
+    from .logging import StructuredLogger
+
+# Public names are imported on first access (PEP 562) so that, for example,
+# a process using only StructuredLogger never imports OpenTelemetry
+_LAZY_ATTRIBUTES = {
+    "ObservabilityMiddleware": ".middleware",
+    "MetricsCollector": ".metrics",
+    "TracingCollector": ".tracing",
+    "StructuredLogger": ".logging",
+}
 
 __all__ = [
     "ObservabilityMiddleware",
@@ -19,3 +32,17 @@ __all__ = [
     "StructuredLogger",
 ]
 
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
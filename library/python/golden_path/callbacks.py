@@ -0,0 +1,185 @@
+"""
+Gauge values computed by callbacks when metrics are scraped.
+
+Instead of setting a gauge on every change, a function is registered and
+only evaluated when the registry is collected. Each callback is isolated:
+an exception, a timeout or a garbage-collected owner turns its value into
+NaN for that scrape instead of failing the whole scrape.
+"""
+
+import math
+import queue
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .fork import register_after_fork
+
+if TYPE_CHECKING:
+    from .metrics import MetricsCollector
+
+ERROR = "error"
+TIMEOUT = "timeout"
+
+NAN = math.nan
+
+
+class GaugeCallback:
+    """
+    Scrape-time gauge function with a timeout and error isolation.
+
+    Instances are passed to a Gauge child's set_function(). With a timeout,
+    the function runs on a shared daemon worker thread and the scrape waits
+    at most that long; a function still running from an earlier scrape is
+    not started again until it returns.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., float],
+        gauge_name: str,
+        obj: Any = None,
+        timeout: Optional[float] = 1.0,
+        metrics_collector: Optional["MetricsCollector"] = None,
+        on_release: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Initialize gauge callback.
+
+        Args:
+            func: Function returning the gauge value; called as func(obj)
+                when obj is given, otherwise without arguments
+            gauge_name: Gauge name, used to label callback errors
+            obj: Optional object passed to func, held by weak reference so
+                that registering does not keep it alive
+            timeout: Maximum seconds a scrape waits for func (None calls it
+                inline without a limit)
+            metrics_collector: Optional metrics collector for error counters
+            on_release: Called once from a scrape after obj has been
+                garbage collected, e.g. to remove the gauge child
+        """
+        self.func = func
+        self.gauge_name = gauge_name
+        self.timeout = timeout
+        self.metrics_collector = metrics_collector
+        self.on_release = on_release
+
+        self._obj_ref: Optional[weakref.ref] = None
+        if obj is not None:
+            self._obj_ref = weakref.ref(obj)
+
+        # Evaluation started by an earlier scrape that has not returned yet
+        self._pending: Optional[_Evaluation] = None
+        register_after_fork(self)
+
+    def _after_fork_in_child(self):
+        # The thread running a pending evaluation did not survive the fork
+        self._pending = None
+
+    def __call__(self) -> float:
+        args = ()
+        if self._obj_ref is not None:
+            obj = self._obj_ref()
+            if obj is None:
+                self.release()
+                return NAN
+            args = (obj,)
+
+        if self.timeout is None:
+            try:
+                return float(self.func(*args))
+            except Exception:
+                self._record_error(ERROR)
+                return NAN
+
+        evaluation = self._pending
+        if evaluation is None:
+            evaluation = _Evaluation(self.func, args)
+            self._pending = evaluation
+
+        if not evaluation.done.wait(self.timeout):
+            self._record_error(TIMEOUT)
+            return NAN
+
+        self._pending = None
+        if evaluation.failed:
+            self._record_error(ERROR)
+            return NAN
+        return evaluation.value
+
+    def release(self):
+        """Call on_release now if it has not been called yet."""
+        on_release, self.on_release = self.on_release, None
+        if on_release is not None:
+            on_release()
+
+    def _record_error(self, reason: str):
+        if self.metrics_collector is not None:
+            self.metrics_collector.record_gauge_callback_error(self.gauge_name, reason)
+
+
+class _Evaluation:
+    """One call of a gauge function, run by a callback worker."""
+
+    __slots__ = ("func", "args", "done", "value", "failed")
+
+    def __init__(self, func: Callable[..., float], args: tuple):
+        self.func = func
+        self.args = args
+        self.done = threading.Event()
+        self.value = NAN
+        self.failed = False
+        _WORKERS.submit(self)
+
+    def run(self):
+        try:
+            self.value = float(self.func(*self.args))
+        except Exception:
+            self.failed = True
+        finally:
+            self.args = ()
+            self.done.set()
+
+
+class _CallbackWorkers:
+    """
+    Daemon threads evaluating gauge functions, reused across scrapes.
+
+    Scrapes evaluate callbacks one after another, so a single thread
+    usually does all the work. A new thread is only started when every
+    existing one is busy, i.e. stuck in a function that timed out.
+    """
+
+    def __init__(self):
+        self._queue: "queue.SimpleQueue[_Evaluation]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._idle = 0
+        register_after_fork(self)
+
+    def _after_fork_in_child(self):
+        # Worker threads do not survive a fork
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._idle = 0
+
+    def submit(self, evaluation: _Evaluation):
+        """Run an evaluation on an idle worker, starting one if none is."""
+        with self._lock:
+            self._queue.put(evaluation)
+            if self._idle:
+                self._idle -= 1
+                return
+        threading.Thread(
+            target=self._work,
+            name="golden-path-gauge-callback",
+            daemon=True,
+        ).start()
+
+    def _work(self):
+        while True:
+            self._queue.get().run()
+            with self._lock:
+                self._idle += 1
+
+
+_WORKERS = _CallbackWorkers()
@@ -0,0 +1,94 @@
+"""
+Pluggable JSON encoders for structured log output.
+
+The fast encoders do not produce byte-identical output to the standard
+library: orjson and msgspec write compact separators (``{"a":1}`` rather
+than ``{"a": 1}``) and encode NaN and infinity as ``null``, where json
+writes the non-standard ``NaN`` / ``Infinity`` tokens. Values a fast encoder
+rejects (e.g. integers wider than 64 bits) are encoded with json instead,
+so a line is never lost to the choice of encoder.
+"""
+
+import json
+from typing import Any, Callable, Dict, Union
+
+Encoder = Callable[[Dict[str, Any]], str]
+
+
+def _json_encoder() -> Encoder:
+    dumps = json.JSONEncoder(default=str).encode
+
+    def encode(data: Dict[str, Any]) -> str:
+        return dumps(data)
+
+    return encode
+
+
+def _orjson_encoder() -> Encoder:
+    import orjson
+
+    dumps = orjson.dumps
+    options = orjson.OPT_NON_STR_KEYS
+    fallback = _json_encoder()
+
+    def encode(data: Dict[str, Any]) -> str:
+        try:
+            return dumps(data, default=str, option=options).decode("utf-8")
+        except TypeError:
+            # orjson.JSONEncodeError, raised e.g. for integers over 64 bits
+            return fallback(data)
+
+    return encode
+
+
+def _msgspec_encoder() -> Encoder:
+    import msgspec
+
+    dumps = msgspec.json.Encoder(enc_hook=str).encode
+    fallback = _json_encoder()
+
+    def encode(data: Dict[str, Any]) -> str:
+        try:
+            return dumps(data).decode("utf-8")
+        except (msgspec.EncodeError, OverflowError, TypeError):
+            return fallback(data)
+
+    return encode
+
+
+_ENCODERS = {
+    "json": _json_encoder,
+    "orjson": _orjson_encoder,
+    "msgspec": _msgspec_encoder,
+}
+
+# Preference order when the encoder is "auto"
+_AUTO_ORDER = ("orjson", "msgspec", "json")
+
+
+def get_encoder(encoder: Union[str, Encoder, None] = "auto") -> Encoder:
+    """
+    Resolve an encoder that turns a structured log dict into a JSON string.
+
+    Args:
+        encoder: "auto" (fastest installed), "json", "orjson", "msgspec",
+            or a callable taking a dict and returning a string
+
+    Returns:
+        Encoder callable
+    """
+    if callable(encoder):
+        return encoder
+
+    if encoder is None or encoder == "auto":
+        for name in _AUTO_ORDER:
+            try:
+                return _ENCODERS[name]()
+            except ImportError:
+                continue
+
+    if encoder not in _ENCODERS:
+        raise ValueError(
+            f"Unknown encoder {encoder!r}; expected one of {sorted(_ENCODERS)}"
+        )
+    return _ENCODERS[encoder]()
@@ -0,0 +1,431 @@
+"""
+Span export pipeline instrumented with Prometheus metrics.
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
+
+from opentelemetry.sdk.environment_variables import (
+    OTEL_EXPORTER_OTLP_COMPRESSION,
+    OTEL_EXPORTER_OTLP_TRACES_COMPRESSION,
+)
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from .fork import register_after_fork
+
+if TYPE_CHECKING:
+    from .metrics import MetricsCollector
+
+GRPC = "grpc"
+HTTP_PROTOBUF = "http/protobuf"
+FILE = "file"
+MEMORY = "memory"
+NONE = "none"
+
+TRANSPORTS = (GRPC, HTTP_PROTOBUF, FILE, MEMORY, NONE)
+
+DEFAULT_ENDPOINTS = {
+    GRPC: "http://localhost:4317",
+    HTTP_PROTOBUF: "http://localhost:4318/v1/traces",
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_span_exporter(
+    transport: str = GRPC,
+    endpoint: Optional[str] = None,
+    compression: Optional[str] = None,
+    export_file: Optional[str] = None,
+    headers: Optional[dict] = None,
+    timeout: Optional[float] = None,
+) -> SpanExporter:
+    """
+    Create a span exporter for a transport.
+
+    Args:
+        transport: grpc, http/protobuf, file, memory or none
+        endpoint: Collector endpoint (default depends on the transport)
+        compression: Request compression ("gzip", "none" or None for the
+            OTEL_EXPORTER_OTLP_COMPRESSION setting; http/protobuf falls back
+            to gzip when that is unset)
+        export_file: Output path for the file transport (default: stdout)
+        headers: Extra request headers for the OTLP transports
+        timeout: Export request timeout in seconds for the OTLP transports
+
+    Returns:
+        Span exporter
+    """
+    if transport == GRPC:
+        endpoint = endpoint or DEFAULT_ENDPOINTS[GRPC]
+        return ForkSafeSpanExporter(
+            functools.partial(_grpc_exporter, endpoint, compression, headers, timeout)
+        )
+
+    if transport == HTTP_PROTOBUF:
+        endpoint = endpoint or DEFAULT_ENDPOINTS[HTTP_PROTOBUF]
+        return ForkSafeSpanExporter(
+            functools.partial(_http_exporter, endpoint, compression, headers, timeout)
+        )
+
+    if transport == FILE:
+        if export_file:
+            return FileSpanExporter(export_file)
+        return ConsoleSpanExporter(out=sys.stdout, formatter=_json_line)
+
+    if transport == MEMORY:
+        return InMemorySpanExporter()
+
+    if transport == NONE:
+        return NullSpanExporter()
+
+    raise ValueError(f"Unknown transport {transport!r}; expected one of {TRANSPORTS}")
+
+
+def _json_line(span: ReadableSpan) -> str:
+    return span.to_json(indent=None) + "\n"
+
+
+def _grpc_exporter(
+    endpoint: str,
+    compression: Optional[str],
+    headers: Optional[dict],
+    timeout: Optional[float],
+) -> SpanExporter:
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+        OTLPSpanExporter,
+    )
+
+    return OTLPSpanExporter(
+        endpoint=endpoint,
+        insecure=not endpoint.startswith("https://"),
+        compression=_grpc_compression(compression),
+        headers=headers,
+        timeout=timeout,
+    )
+
+
+def _http_exporter(
+    endpoint: str,
+    compression: Optional[str],
+    headers: Optional[dict],
+    timeout: Optional[float],
+) -> SpanExporter:
+    try:
+        from opentelemetry.exporter.otlp.proto.http import Compression
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+    except ImportError as e:
+        raise ImportError(
+            "The http/protobuf transport requires "
+            "opentelemetry-exporter-otlp-proto-http"
+        ) from e
+
+    return OTLPSpanExporter(
+        endpoint=endpoint,
+        compression=_http_compression(compression, Compression),
+        headers=headers,
+        timeout=timeout,
+        session=shared_session(),
+    )
+
+
+def shared_session():
+    """
+    Get the process-wide requests session used by the OTLP HTTP exporter.
+
+    Sharing one session keeps a pool of keep-alive connections to the
+    collector instead of one per exporter.
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _reset_session():
+    """Forget the parent's session; its pooled sockets belong to the parent."""
+    global _session, _session_lock
+
+    _session = None
+    _session_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_session)
+
+
+def _grpc_compression(compression: Optional[str]):
+    """Map a compression name to the gRPC exporter's compression setting."""
+    if compression is None:
+        return None
+
+    from grpc import Compression
+
+    if compression == "gzip":
+        return Compression.Gzip
+    if compression == "none":
+        return Compression.NoCompression
+    raise ValueError(
+        f"Unsupported compression {compression!r}; expected 'gzip' or 'none'"
+    )
+
+
+def _http_compression(compression: Optional[str], compression_enum):
+    """
+    Map a compression name to the HTTP exporter's compression setting.
+
+    Without an explicit setting, gzip is used unless the standard OTLP
+    compression environment variables choose otherwise.
+    """
+    if compression is None:
+        if os.environ.get(OTEL_EXPORTER_OTLP_TRACES_COMPRESSION) or os.environ.get(
+            OTEL_EXPORTER_OTLP_COMPRESSION
+        ):
+            return None  # resolved from the environment by the exporter
+        return compression_enum.Gzip
+
+    if compression == "gzip":
+        return compression_enum.Gzip
+    if compression == "none":
+        return compression_enum.NoCompression
+    raise ValueError(
+        f"Unsupported compression {compression!r}; expected 'gzip' or 'none'"
+    )
+
+
+class ForkSafeSpanExporter(SpanExporter):
+    """
+    Span exporter that is rebuilt in every forked child process.
+
+    Network exporters hold gRPC channels or pooled connections that cannot
+    be shared with the parent, so the child abandons the inherited exporter
+    and creates its own from the factory.
+    """
+
+    def __init__(self, factory: Callable[[], SpanExporter]):
+        """
+        Initialize fork-safe span exporter.
+
+        Args:
+            factory: Callable creating the underlying exporter
+        """
+        self._factory = factory
+        self._exporter: Optional[SpanExporter] = factory()
+        register_after_fork(self)
+
+    def _after_fork_in_child(self):
+        # The parent's exporter is abandoned rather than shut down, since
+        # closing it here could tear down state the parent still uses. The
+        # replacement is created on first use, once every fork hook (such as
+        # the shared session reset) has run.
+        self._exporter = None
+
+    @property
+    def exporter(self) -> SpanExporter:
+        """Exporter of the current process."""
+        exporter = self._exporter
+        if exporter is None:
+            exporter = self._exporter = self._factory()
+        return exporter
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        return self.exporter.export(spans)
+
+    def shutdown(self):
+        self.exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.exporter.force_flush(timeout_millis)
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+    """Span exporter appending one JSON span per line to a file it owns."""
+
+    def __init__(self, path: str):
+        """
+        Initialize file span exporter.
+
+        Args:
+            path: Output file, opened for appending until shutdown()
+        """
+        self.path = path
+        super().__init__(out=open(path, "a", encoding="utf-8"), formatter=_json_line)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self.out.closed:
+            return SpanExportResult.FAILURE
+        return super().export(spans)
+
+    def shutdown(self):
+        self.out.close()
+
+
+class NullSpanExporter(SpanExporter):
+    """Span exporter that discards every span."""
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+class InstrumentedSpanExporter(SpanExporter):
+    """Span exporter wrapper recording batch sizes, latency and errors."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        metrics_collector: "MetricsCollector",
+        after_export: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Initialize instrumented span exporter.
+
+        Args:
+            exporter: Exporter that sends the spans
+            metrics_collector: Metrics collector for export statistics
+            after_export: Optional function called after every export request
+        """
+        self.exporter = exporter
+        self.metrics_collector = metrics_collector
+        self.after_export = after_export
+        metrics_collector.enable_span_export_metrics()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        start_time = time.perf_counter()
+        try:
+            result = self.exporter.export(spans)
+        except Exception:
+            self.metrics_collector.record_span_export(
+                len(spans), time.perf_counter() - start_time, success=False
+            )
+            raise
+        finally:
+            if self.after_export is not None:
+                self.after_export()
+
+        self.metrics_collector.record_span_export(
+            len(spans),
+            time.perf_counter() - start_time,
+            success=result is SpanExportResult.SUCCESS,
+        )
+        return result
+
+    def shutdown(self):
+        self.exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.exporter.force_flush(timeout_millis)
+
+
+class InstrumentedBatchSpanProcessor(BatchSpanProcessor):
+    """
+    BatchSpanProcessor that publishes queue depth and dropped spans.
+
+    Export latency, batch sizes and exporter errors are recorded by wrapping
+    the exporter in an InstrumentedSpanExporter.
+
+    The queue depth is read at scrape time. In multi-process mode, where
+    scrape-time gauge functions are not aggregated across workers, it is
+    instead set whenever a span is queued and after every export.
+    """
+
+    def __init__(
+        self,
+        span_exporter: SpanExporter,
+        metrics_collector: "MetricsCollector",
+        max_queue_size: Optional[int] = None,
+        schedule_delay_millis: Optional[float] = None,
+        max_export_batch_size: Optional[int] = None,
+        export_timeout_millis: Optional[float] = None,
+    ):
+        """
+        Initialize instrumented batch span processor.
+
+        Args:
+            span_exporter: Exporter that sends the spans
+            metrics_collector: Metrics collector for pipeline statistics
+            max_queue_size: Maximum spans queued before new spans are dropped
+            schedule_delay_millis: Delay between exports in milliseconds
+            max_export_batch_size: Maximum spans per export
+            export_timeout_millis: Export timeout in milliseconds
+        """
+        self.metrics_collector = metrics_collector
+        self._explicit_queue_depth = bool(metrics_collector.multiprocess_dir)
+
+        super().__init__(
+            InstrumentedSpanExporter(
+                span_exporter,
+                metrics_collector,
+                after_export=(
+                    self._publish_queue_depth if self._explicit_queue_depth else None
+                ),
+            ),
+            max_queue_size=max_queue_size,
+            schedule_delay_millis=schedule_delay_millis,
+            max_export_batch_size=max_export_batch_size,
+            export_timeout_millis=export_timeout_millis,
+        )
+
+        if not self._explicit_queue_depth:
+            metrics_collector.span_export_queue_depth.set_function(
+                self._queue_depth
+            )
+
+    def _sdk_queue(self):
+        # The SDK keeps its queue private; its location differs across
+        # versions, and it is replaced in a forked child, so it is looked up
+        # on every use rather than cached
+        batch_processor = getattr(self, "_batch_processor", self)
+        queue = getattr(batch_processor, "_queue", None)
+        if queue is None:
+            queue = getattr(self, "queue", None)
+        return queue
+
+    def _queue_depth(self) -> float:
+        queue = self._sdk_queue()
+        return len(queue) if queue is not None else 0
+
+    def _publish_queue_depth(self):
+        self.metrics_collector.span_export_queue_depth.set(self._queue_depth())
+
+    def on_end(self, span: ReadableSpan):
+        queue = self._sdk_queue()
+        if (
+            queue is not None
+            and span.context.trace_flags.sampled
+            and len(queue) >= queue.maxlen
+        ):
+            # The SDK only logs this: its bounded deque silently discards a
+            # span to make room for this one
+            self.metrics_collector.record_spans_dropped(1)
+        super().on_end(span)
+        if self._explicit_queue_depth:
+            self._publish_queue_depth()
@@ -0,0 +1,98 @@
+"""
+Cached Prometheus exposition for /metrics scrapes.
+"""
+
+import gzip
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+Encoder = Callable[..., bytes]
+
+
+class _Entry:
+    """A rendered exposition body and its lazily gzipped form."""
+
+    __slots__ = ("rendered_at", "body", "gzipped")
+
+    def __init__(self, body: bytes):
+        self.rendered_at = time.monotonic()
+        self.body = body
+        self.gzipped: Optional[bytes] = None
+
+
+class ScrapeCache:
+    """
+    Reuses rendered exposition bodies across scrapes for a bounded time.
+
+    Bodies are cached per content type. When a body is older than the max
+    staleness, exactly one scrape re-renders it while concurrent scrapes of
+    the same content type wait for and share that render (single-flight).
+    """
+
+    def __init__(self, render: Callable[[Encoder], bytes], max_staleness: float):
+        """
+        Initialize scrape cache.
+
+        Args:
+            render: Callable rendering the registry with a given encoder
+            max_staleness: Maximum age in seconds of a served body
+        """
+        self.render = render
+        self.max_staleness = max_staleness
+        self._entries: Dict[str, _Entry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def get(self, encoder: Encoder, content_type: str, compress: bool = False) -> bytes:
+        """
+        Get the exposition body for a content type, rendering it if stale.
+
+        Args:
+            encoder: Exposition encoder (e.g. prometheus_client.generate_latest)
+            content_type: Content type produced by the encoder, used as cache key
+            compress: Return the gzip-compressed body
+
+        Returns:
+            Exposition body
+        """
+        entry = self._entries.get(content_type)
+        if entry is None or self._is_stale(entry):
+            entry = self._refresh(encoder, content_type)
+
+        if not compress:
+            return entry.body
+        if entry.gzipped is None:
+            with self._lock_for(content_type):
+                if entry.gzipped is None:
+                    entry.gzipped = gzip.compress(entry.body)
+        return entry.gzipped
+
+    def invalidate(self):
+        """Drop all cached bodies."""
+        self._entries.clear()
+
+    def _after_fork_in_child(self):
+        """Drop cached bodies and locks inherited from the parent process."""
+        self._entries.clear()
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _is_stale(self, entry: _Entry) -> bool:
+        return time.monotonic() - entry.rendered_at > self.max_staleness
+
+    def _refresh(self, encoder: Encoder, content_type: str) -> _Entry:
+        with self._lock_for(content_type):
+            # Another scrape may have rendered while this one waited
+            entry = self._entries.get(content_type)
+            if entry is None or self._is_stale(entry):
+                entry = _Entry(self.render(encoder))
+                self._entries[content_type] = entry
+            return entry
+
+    def _lock_for(self, content_type: str) -> threading.Lock:
+        lock = self._locks.get(content_type)
+        if lock is None:
+            with self._locks_lock:
+                lock = self._locks.setdefault(content_type, threading.Lock())
+        return lock
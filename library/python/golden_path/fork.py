@@ -0,0 +1,42 @@
+"""
+Re-initialization of background state in forked worker processes.
+
+Pre-fork servers (gunicorn --preload, uvicorn workers) create collectors
+in the master and then fork. Threads do not survive a fork, and locks or
+connections inherited from the master may be in an unusable state (a lock
+held by a master thread is never released in the child).
+
+Components with per-process state implement ``_after_fork_in_child()``,
+which rebuilds that state, and register themselves with
+register_after_fork(). Objects they own (children of a metric, limiters,
+caches) implement the same method and are reset by their owner. A single
+process-wide fork hook calls every registered object that is still alive.
+"""
+
+import os
+import weakref
+from typing import Any
+
+_registered: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def register_after_fork(obj: Any):
+    """
+    Call obj._after_fork_in_child() in the child process after every fork.
+
+    Only a weak reference to the object is kept, so registering does not
+    keep it alive, and nothing is left behind once it is collected.
+
+    Args:
+        obj: Object implementing _after_fork_in_child()
+    """
+    _registered.add(obj)
+
+
+def _after_fork_in_child():
+    for obj in list(_registered):
+        obj._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):  # fork is not available on every platform
+    os.register_at_fork(after_in_child=_after_fork_in_child)
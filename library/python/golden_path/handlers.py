@@ -0,0 +1,253 @@
+"""
+Non-blocking log handlers for structured logging.
+"""
+
+import atexit
+import logging
+import os
+import signal
+import sys
+import threading
+import weakref
+from collections import deque
+from typing import Any, Dict, Optional, TextIO
+
+from .fork import register_after_fork
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# Handlers flushed on SIGTERM/SIGINT. A single process-wide signal handler
+# dispatches to them, so it neither grows with every handler created nor
+# keeps closed handlers alive.
+_flush_on_signal: "weakref.WeakSet[AsyncLogHandler]" = weakref.WeakSet()
+_previous_signal_handlers: Dict[int, Any] = {}
+_signal_handlers_installed = False
+_signal_lock = threading.Lock()
+
+
+class AsyncLogHandler(logging.Handler):
+    """
+    Log handler that hands records to a background writer thread.
+
+    Records are queued in a bounded in-memory buffer and formatted and
+    written by the writer thread in batches, so the calling thread (or
+    event loop) never waits on the output stream.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        capacity: int = 10000,
+        overflow_policy: str = DROP_OLDEST,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+        metrics_collector: Optional[Any] = None,
+        install_signal_handlers: bool = True,
+    ):
+        """
+        Initialize async log handler.
+
+        Args:
+            stream: Output stream (default: sys.stdout)
+            capacity: Maximum number of records buffered in memory
+            overflow_policy: What to do when the buffer is full
+                (drop_oldest, drop_newest, block)
+            batch_size: Maximum number of lines joined into a single write
+                (at most capacity)
+            flush_interval: Maximum seconds a record waits before being written
+            metrics_collector: Optional MetricsCollector for dropped-line counters
+            install_signal_handlers: Flush on SIGTERM/SIGINT (main thread only)
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy {overflow_policy!r}; "
+                f"expected one of {OVERFLOW_POLICIES}"
+            )
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        super().__init__()
+        self.stream = stream or sys.stdout
+        self.capacity = capacity
+        self.overflow_policy = overflow_policy
+        # A batch larger than the buffer would never fill, and the writer
+        # would wait out flush_interval in front of every full buffer
+        self.batch_size = min(batch_size, capacity)
+        self.flush_interval = flush_interval
+        self.metrics_collector = metrics_collector
+        self.dropped = 0
+
+        self._buffer: deque = deque()
+        self._cond = threading.Condition()
+        self._writing = False
+        self._closed = False
+        self._start_writer()
+        register_after_fork(self)
+
+        atexit.register(self.close)
+        if install_signal_handlers:
+            _flush_on_signal.add(self)
+            _install_signal_handlers()
+
+    def _start_writer(self):
+        self._writer = threading.Thread(
+            target=self._run, name="golden-path-log-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _after_fork_in_child(self):
+        """Restart the writer thread, which does not survive a fork."""
+        # Records queued before the fork are written by the parent
+        self._buffer.clear()
+        self._cond = threading.Condition()
+        self._writing = False
+        if not self._closed:
+            self._start_writer()
+
+    def emit(self, record: logging.LogRecord):
+        """Queue a record for the writer thread."""
+        reason = None
+        with self._cond:
+            if self._closed or threading.current_thread() is self._writer:
+                reason = "closed"
+            elif len(self._buffer) >= self.capacity:
+                if self.overflow_policy == DROP_OLDEST:
+                    self._buffer.popleft()
+                    self._buffer.append(record)
+                    reason = DROP_OLDEST
+                elif self.overflow_policy == DROP_NEWEST:
+                    reason = DROP_NEWEST
+                else:
+                    while len(self._buffer) >= self.capacity and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        reason = "closed"
+                    else:
+                        self._buffer.append(record)
+            else:
+                self._buffer.append(record)
+
+            if len(self._buffer) == 1 or len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+
+        if reason is not None:
+            self._record_dropped(1, reason)
+
+    def _record_dropped(self, count: int, reason: str):
+        with self._cond:
+            self.dropped += count
+        if self.metrics_collector is not None:
+            self.metrics_collector.record_log_lines_dropped(count, reason)
+
+    def _run(self):
+        try:
+            self._write_until_closed()
+        finally:
+            self._writer_stopped()
+
+    def _write_until_closed(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if not self._buffer:
+                    return
+                # Give producers a moment to fill a larger batch
+                if len(self._buffer) < self.batch_size and not self._closed:
+                    self._cond.wait(self.flush_interval)
+
+                batch = [
+                    self._buffer.popleft()
+                    for _ in range(min(self.batch_size, len(self._buffer)))
+                ]
+                self._writing = True
+                self._cond.notify_all()
+
+            try:
+                self._write(batch)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _writer_stopped(self):
+        """Called on the writer thread once it has written its last batch."""
+
+    def _write(self, batch):
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+
+        if lines:
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            except Exception:
+                self.handleError(batch[-1])
+
+    def flush(self, timeout: Optional[float] = 5.0):
+        """
+        Wait until all queued records have been written.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        """
+        with self._cond:
+            self._cond.notify_all()
+            self._cond.wait_for(
+                lambda: (not self._buffer and not self._writing)
+                or not self._writer.is_alive(),
+                timeout,
+            )
+
+    def close(self):
+        """Flush queued records and stop the writer thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+
+        _flush_on_signal.discard(self)
+        self._writer.join(timeout=5.0)
+        atexit.unregister(self.close)
+        super().close()
+
+
+def _install_signal_handlers():
+    """Install the flushing SIGTERM/SIGINT handler once (main thread only)."""
+    global _signal_handlers_installed
+
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    with _signal_lock:
+        if _signal_handlers_installed:
+            return
+        _signal_handlers_installed = True
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(signum)
+            try:
+                signal.signal(signum, _flush_and_forward)
+            except (ValueError, OSError):
+                continue
+            _previous_signal_handlers[signum] = previous
+
+
+def _flush_and_forward(signum, frame):
+    for handler in list(_flush_on_signal):
+        handler.flush(timeout=1.0)
+
+    previous = _previous_signal_handlers.get(signum)
+    if callable(previous):
+        previous(signum, frame)
+    elif previous != signal.SIG_IGN:
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
@@ -0,0 +1,132 @@
+"""
+Sampling and rate limiting for high-volume log call sites.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from .fork import register_after_fork
+
+if TYPE_CHECKING:
+    from .metrics import MetricsCollector
+
+# Field added to every record logged through a sampler: the number of lines
+# the record stands for (itself plus the lines suppressed before it)
+SAMPLED_RATE_FIELD = "sampled_rate"
+
+SAMPLED = "sampled"
+RATE_LIMITED = "rate_limited"
+
+
+class LogSampler:
+    """
+    Decides which log lines to keep, per message key.
+
+    Lines at or above always_keep_level (WARNING by default) are always
+    kept. Other lines are first sampled 1-in-N per message, then limited by
+    a per-message token bucket. A kept line reports how many lines it
+    represents, so totals can be reconstructed by summing sampled_rate.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 1,
+        sample_rates: Optional[Dict[str, int]] = None,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        always_keep_level: int = logging.WARNING,
+        max_keys: int = 10000,
+        metrics_collector: Optional["MetricsCollector"] = None,
+    ):
+        """
+        Initialize log sampler.
+
+        Args:
+            sample_rate: Keep 1 in N lines of each message (1 keeps every line)
+            sample_rates: Per-message overrides of sample_rate, e.g.
+                {"HTTP request completed": 100}
+            rate_limit: Maximum kept lines per second for each message
+                (None disables rate limiting)
+            burst: Token bucket size (default: rate_limit, at least 1)
+            always_keep_level: Lines at or above this level are never dropped
+            max_keys: Maximum number of messages tracked; the least recently
+                used is forgotten
+            metrics_collector: Optional metrics collector for suppressed-line
+                counters
+        """
+        if sample_rate < 1:
+            raise ValueError("sample_rate must be at least 1")
+
+        self.sample_rate = sample_rate
+        self.sample_rates = dict(sample_rates or {})
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else max(rate_limit or 0.0, 1.0)
+        self.always_keep_level = always_keep_level
+        self.max_keys = max_keys
+        self.metrics_collector = metrics_collector
+
+        # Per message: [lines seen, tokens, last refill, lines suppressed
+        # since the last kept line]
+        self._state: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork_in_child(self):
+        self._lock = threading.Lock()
+
+    def sample(self, level: int, key: str) -> int:
+        """
+        Decide whether to keep a line.
+
+        Args:
+            level: Log level of the line
+            key: Message key, typically the log message
+
+        Returns:
+            Number of lines the kept line represents, or 0 to drop it
+        """
+        if level >= self.always_keep_level:
+            return 1
+
+        sample_rate = self.sample_rates.get(key, self.sample_rate)
+        reason = None
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = [0, self.burst, time.monotonic(), 0]
+                self._state[key] = state
+                if len(self._state) > self.max_keys:
+                    self._state.popitem(last=False)
+            else:
+                self._state.move_to_end(key)
+
+            seen = state[0]
+            state[0] = seen + 1
+            if sample_rate > 1 and seen % sample_rate:
+                reason = SAMPLED
+            elif self.rate_limit is not None and not self._take_token(state):
+                reason = RATE_LIMITED
+
+            if reason is None:
+                represented = state[3] + 1
+                state[3] = 0
+            else:
+                state[3] += 1
+
+        if reason is not None:
+            if self.metrics_collector is not None:
+                self.metrics_collector.record_log_lines_suppressed(1, reason)
+            return 0
+        return represented
+
+    def _take_token(self, state: List[float]) -> bool:
+        now = time.monotonic()
+        state[1] = min(self.burst, state[1] + (now - state[2]) * self.rate_limit)
+        state[2] = now
+        if state[1] < 1.0:
+            return False
+        state[1] -= 1.0
+        return True
@@ -2,11 +2,64 @@
 Structured logging with trace correlation.
 """
 
-import json
 import logging
 import sys
-from typing import Optional, Dict, Any
-from datetime import datetime
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple, Union
+from datetime import datetime, timezone
+
+from .encoding import Encoder, get_encoder
+from .handlers import AsyncLogHandler, DROP_OLDEST
+from .log_sampling import SAMPLED_RATE_FIELD, LogSampler
+
+if TYPE_CHECKING:
+    from .metrics import MetricsCollector
+
+# LogRecord attribute carrying the structured payload built by StructuredLogger
+STRUCTURED_ATTR = "structured"
+
+_EMPTY_TRACE_CONTEXT: Dict[str, str] = {}
+
+_UNRESOLVED = object()
+
+# opentelemetry.trace.get_current_span, resolved on first use (None if the
+# API is not installed)
+_get_current_span: Any = _UNRESOLVED
+
+# Hex ids of the most recently logged span context in this execution context
+_trace_context_cache: ContextVar[Tuple[Any, Dict[str, str]]] = ContextVar(
+    "golden_path_trace_context", default=(None, _EMPTY_TRACE_CONTEXT)
+)
+
+
+def _current_trace_context() -> Dict[str, str]:
+    """Get hex trace and span ids of the active span, formatted once per span."""
+    global _get_current_span
+
+    get_current_span = _get_current_span
+    if get_current_span is _UNRESOLVED:
+        try:
+            from opentelemetry.trace import get_current_span
+        except ImportError:
+            get_current_span = None
+        _get_current_span = get_current_span
+    if get_current_span is None:
+        return _EMPTY_TRACE_CONTEXT
+
+    span_context = get_current_span().get_span_context()
+    cached_context, trace_context = _trace_context_cache.get()
+    if span_context is cached_context:
+        return trace_context
+
+    if span_context.is_valid:
+        trace_context = {
+            "trace_id": format(span_context.trace_id, "032x"),
+            "span_id": format(span_context.span_id, "016x"),
+        }
+    else:
+        trace_context = _EMPTY_TRACE_CONTEXT
+    _trace_context_cache.set((span_context, trace_context))
+    return trace_context
 
 
 class StructuredLogger:
@@ -21,6 +74,16 @@ class StructuredLogger:
         version: str = "unknown",
         log_level: str = "INFO",
         enable_trace_correlation: bool = True,
+        encoder: Union[str, Encoder, None] = "auto",
+        async_output: bool = False,
+        queue_size: int = 10000,
+        overflow_policy: str = DROP_OLDEST,
+        metrics_collector: Optional["MetricsCollector"] = None,
+        loki_endpoint: Optional[str] = None,
+        sample_rate: int = 1,
+        sample_rates: Optional[Dict[str, int]] = None,
+        rate_limit: Optional[float] = None,
+        sampler: Optional[LogSampler] = None,
     ):
         """
         Initialize structured logger.
@@ -31,24 +94,74 @@ class StructuredLogger:
             version: Service version
             log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
             enable_trace_correlation: Enable trace ID correlation
+            encoder: JSON encoder ("auto", "json", "orjson", "msgspec" or a callable)
+            async_output: Write logs from a background thread instead of the caller
+            queue_size: Maximum number of buffered records in async mode
+            overflow_policy: Policy when the async buffer is full
+                (drop_oldest, drop_newest, block)
+            metrics_collector: Optional metrics collector for dropped-line counters
+            loki_endpoint: Loki base URL to push logs to directly
+                (e.g. http://localhost:3100)
+            sample_rate: Keep 1 in N lines of each message below WARNING
+            sample_rates: Per-message overrides of sample_rate
+            rate_limit: Maximum lines per second kept for each message below
+                WARNING
+            sampler: Custom log sampler (overrides the sampling settings above)
         """
         self.service_name = service_name
         self.environment = environment
         self.version = version
         self.enable_trace_correlation = enable_trace_correlation
 
+        # Sampled records carry a sampled_rate field; without sampling every
+        # line is logged as before
+        if sampler is None and (sample_rate > 1 or sample_rates or rate_limit):
+            sampler = LogSampler(
+                sample_rate,
+                sample_rates,
+                rate_limit,
+                metrics_collector=metrics_collector,
+            )
+        self.sampler = sampler
+
         # Set up logger
         self.logger = logging.getLogger(service_name)
         self.logger.setLevel(getattr(logging, log_level.upper()))
 
-        # Remove existing handlers
-        self.logger.handlers = []
+        # Remove existing handlers, stopping the writer threads of any set up
+        # by an earlier StructuredLogger for the same service
+        for existing in self.logger.handlers[:]:
+            self.logger.removeHandler(existing)
+            if isinstance(existing, AsyncLogHandler):
+                existing.close()
 
         # Add console handler with JSON formatter
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(StructuredFormatter())
+        if async_output:
+            handler = AsyncLogHandler(
+                sys.stdout,
+                capacity=queue_size,
+                overflow_policy=overflow_policy,
+                metrics_collector=metrics_collector,
+            )
+        else:
+            handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(StructuredFormatter(encoder=encoder))
         self.logger.addHandler(handler)
 
+        # Optionally push straight to Loki
+        if loki_endpoint:
+            from .loki import LokiExporter
+
+            loki_handler = LokiExporter(
+                service_name,
+                environment,
+                version,
+                endpoint=loki_endpoint,
+                metrics_collector=metrics_collector,
+            )
+            loki_handler.setFormatter(StructuredFormatter(encoder=encoder))
+            self.logger.addHandler(loki_handler)
+
         # Prevent propagation to root logger
         self.logger.propagate = False
 
@@ -58,19 +171,13 @@ class StructuredLogger:
             return {}
 
         try:
-            from opentelemetry import trace
-
-            span = trace.get_current_span()
-            if span:
-                span_context = span.get_span_context()
-                return {
-                    "trace_id": format(span_context.trace_id, "032x"),
-                    "span_id": format(span_context.span_id, "016x"),
-                }
+            return _current_trace_context()
         except Exception:
-            pass
+            return {}
 
-        return {}
+    def is_enabled_for(self, level: int) -> bool:
+        """Check whether messages at a level would be logged."""
+        return self.logger.isEnabledFor(level)
 
     def _log(
         self,
@@ -78,8 +185,18 @@ class StructuredLogger:
         message: str,
         extra: Optional[Dict[str, Any]] = None,
         exc_info: Optional[Any] = None,
+        sampler: Optional[LogSampler] = None,
     ):
         """Internal logging method with structured data."""
+        if not self.logger.isEnabledFor(level):
+            return
+
+        sampler = sampler or self.sampler
+        if sampler is not None:
+            sampled_rate = sampler.sample(level, message)
+            if not sampled_rate:
+                return
+
         log_data = {
             "service": self.service_name,
             "environment": self.environment,
@@ -95,7 +212,13 @@ class StructuredLogger:
         if extra:
             log_data.update(extra)
 
-        self.logger.log(level, json.dumps(log_data), exc_info=exc_info)
+        if sampler is not None:
+            log_data[SAMPLED_RATE_FIELD] = sampled_rate
+
+        # Carry the dict on the record; the formatter serializes it exactly once
+        self.logger.log(
+            level, message, exc_info=exc_info, extra={STRUCTURED_ATTR: log_data}
+        )
 
     def debug(self, message: str, **kwargs):
         """Log debug message."""
@@ -117,54 +240,102 @@ class StructuredLogger:
         """Log critical message."""
         self._log(logging.CRITICAL, message, kwargs, exc_info=True)
 
-    def with_fields(self, **fields) -> "LogContext":
-        """Create a log context with additional fields."""
-        return LogContext(self, fields)
+    def with_fields(
+        self, sampler: Optional[LogSampler] = None, **fields
+    ) -> "LogContext":
+        """Create a log context with additional fields and an optional sampler."""
+        return LogContext(self, fields, sampler=sampler)
 
 
 class LogContext:
     """Context manager for adding fields to all logs."""
 
-    def __init__(self, logger: StructuredLogger, fields: Dict[str, Any]):
+    def __init__(
+        self,
+        logger: StructuredLogger,
+        fields: Dict[str, Any],
+        sampler: Optional[LogSampler] = None,
+    ):
+        """
+        Initialize log context.
+
+        Args:
+            logger: Logger that writes the lines
+            fields: Fields added to every line
+            sampler: Log sampler for this context (default: the logger's)
+        """
         self.logger = logger
         self.fields = fields
+        self.sampler = sampler
 
     def debug(self, message: str, **kwargs):
         """Log debug message with context fields."""
-        self.logger.debug(message, **{**self.fields, **kwargs})
+        self.logger._log(
+            logging.DEBUG, message, {**self.fields, **kwargs}, sampler=self.sampler
+        )
 
     def info(self, message: str, **kwargs):
         """Log info message with context fields."""
-        self.logger.info(message, **{**self.fields, **kwargs})
+        self.logger._log(
+            logging.INFO, message, {**self.fields, **kwargs}, sampler=self.sampler
+        )
 
     def warning(self, message: str, **kwargs):
         """Log warning message with context fields."""
-        self.logger.warning(message, **{**self.fields, **kwargs})
+        self.logger._log(
+            logging.WARNING, message, {**self.fields, **kwargs}, sampler=self.sampler
+        )
 
     def error(self, message: str, **kwargs):
         """Log error message with context fields."""
-        self.logger.error(message, **{**self.fields, **kwargs})
+        self.logger._log(
+            logging.ERROR,
+            message,
+            {**self.fields, **kwargs},
+            exc_info=True,
+            sampler=self.sampler,
+        )
 
     def critical(self, message: str, **kwargs):
         """Log critical message with context fields."""
-        self.logger.critical(message, **{**self.fields, **kwargs})
+        self.logger._log(
+            logging.CRITICAL,
+            message,
+            {**self.fields, **kwargs},
+            exc_info=True,
+            sampler=self.sampler,
+        )
 
 
 class StructuredFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
 
+    def __init__(self, encoder: Union[str, Encoder, None] = "auto"):
+        """
+        Initialize structured formatter.
+
+        Args:
+            encoder: JSON encoder ("auto", "json", "orjson", "msgspec" or a callable)
+        """
+        super().__init__()
+        self.encode = get_encoder(encoder)
+
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
-        # If the message is already JSON, return it
-        try:
-            json.loads(record.getMessage())
-            return record.getMessage()
-        except (json.JSONDecodeError, ValueError):
-            pass
-
-        # Otherwise, create structured log
+        structured = getattr(record, STRUCTURED_ATTR, None)
+        if structured is not None:
+            log_data = {
+                "timestamp": _format_timestamp(record.created),
+                "level": record.levelname,
+            }
+            log_data.update(structured)
+            if record.exc_info and record.exc_info[0] is not None:
+                log_data["exception"] = self.formatException(record.exc_info)
+            return self.encode(log_data)
+
+        # Otherwise, create structured log from a plain record
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": _format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -176,30 +347,53 @@ class StructuredFormatter(logging.Formatter):
 
         # Add extra fields from record
         for key, value in record.__dict__.items():
-            if key not in [
-                "name",
-                "msg",
-                "args",
-                "created",
-                "filename",
-                "funcName",
-                "levelname",
-                "levelno",
-                "lineno",
-                "module",
-                "msecs",
-                "message",
-                "pathname",
-                "process",
-                "processName",
-                "relativeCreated",
-                "thread",
-                "threadName",
-                "exc_info",
-                "exc_text",
-                "stack_info",
-            ]:
+            if key not in _RESERVED_RECORD_ATTRS:
                 log_data[key] = value
 
-        return json.dumps(log_data)
-
+        return self.encode(log_data)
+
+
+_RESERVED_RECORD_ATTRS = frozenset(
+    [
+        "name",
+        "msg",
+        "args",
+        "created",
+        "filename",
+        "funcName",
+        "levelname",
+        "levelno",
+        "lineno",
+        "module",
+        "msecs",
+        "message",
+        "pathname",
+        "process",
+        "processName",
+        "relativeCreated",
+        "thread",
+        "threadName",
+        "taskName",
+        "exc_info",
+        "exc_text",
+        "stack_info",
+    ]
+)
+
+
+# (second, "YYYY-MM-DDTHH:MM:SS") of the last formatted timestamp
+_timestamp_cache = (0, "")
+
+
+def _format_timestamp(created: float) -> str:
+    """Format a LogRecord creation time as an ISO 8601 UTC timestamp."""
+    global _timestamp_cache
+
+    second = int(created)
+    cached_second, prefix = _timestamp_cache
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second, timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%S"
+        )
+        _timestamp_cache = (second, prefix)
+    return "%s.%06dZ" % (prefix, int((created - second) * 1_000_000))
@@ -0,0 +1,194 @@
+"""
+Direct log shipping to Loki over the HTTP push API.
+"""
+
+import gzip
+import http.client
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .handlers import AsyncLogHandler, DROP_OLDEST
+
+PUSH_PATH = "/loki/api/v1/push"
+
+# Responses worth retrying; anything else is a permanent rejection
+RETRYABLE_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class LokiExporter(AsyncLogHandler):
+    """
+    Log handler that batches records and pushes them straight to Loki.
+
+    Records are grouped into streams by a fixed label set (service,
+    environment, version, level), gzip-compressed as JSON and POSTed to
+    ``/loki/api/v1/push`` over a single keep-alive connection owned by the
+    writer thread.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        environment: str = "production",
+        version: str = "unknown",
+        endpoint: str = "http://localhost:3100",
+        capacity: int = 10000,
+        overflow_policy: str = DROP_OLDEST,
+        batch_size: int = 1000,
+        batch_wait: float = 1.0,
+        max_retries: int = 5,
+        min_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 10.0,
+        compress: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        metrics_collector: Optional[Any] = None,
+        install_signal_handlers: bool = True,
+    ):
+        """
+        Initialize Loki exporter.
+
+        Args:
+            service_name: Name of the service
+            environment: Environment (production, staging, development)
+            version: Service version
+            endpoint: Loki base URL (default: http://localhost:3100)
+            capacity: Maximum number of records buffered in memory
+            overflow_policy: What to do when the buffer is full
+                (drop_oldest, drop_newest, block)
+            batch_size: Maximum number of records per push request
+            batch_wait: Maximum seconds a record waits before being pushed
+            max_retries: Retries for a batch on connection errors, 429 and 5xx
+            min_backoff: Initial retry delay in seconds (each delay is
+                randomized between half and all of its nominal value)
+            max_backoff: Maximum retry delay in seconds
+            timeout: Socket timeout for push requests in seconds
+            compress: Gzip-compress request bodies
+            headers: Extra request headers (e.g. X-Scope-OrgID, Authorization)
+            metrics_collector: Optional MetricsCollector for dropped-line counters
+            install_signal_handlers: Flush on SIGTERM/SIGINT (main thread only)
+        """
+        url = urlsplit(endpoint)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported Loki endpoint scheme: {endpoint!r}")
+
+        self.base_labels = {
+            "service": service_name,
+            "environment": environment,
+            "version": version,
+        }
+        self.endpoint = endpoint
+        self.max_retries = max_retries
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.compress = compress
+
+        self._scheme = url.scheme
+        self._netloc = url.netloc
+        self._path = url.path.rstrip("/") + PUSH_PATH
+        self._headers = {
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        }
+        if compress:
+            self._headers["Content-Encoding"] = "gzip"
+        self._headers.update(headers or {})
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+        super().__init__(
+            capacity=capacity,
+            overflow_policy=overflow_policy,
+            batch_size=batch_size,
+            flush_interval=batch_wait,
+            metrics_collector=metrics_collector,
+            install_signal_handlers=install_signal_handlers,
+        )
+
+    def _write(self, batch: List[logging.LogRecord]):
+        streams: Dict[str, List[Tuple[str, str]]] = {}
+        for record in batch:
+            try:
+                line = self.format(record)
+            except Exception:
+                self.handleError(record)
+                continue
+            timestamp = str(int(record.created * 1_000_000_000))
+            streams.setdefault(record.levelname.lower(), []).append((timestamp, line))
+
+        if not streams:
+            return
+
+        body = self._encode(streams)
+        count = sum(len(values) for values in streams.values())
+        if not self._push(body):
+            self._record_dropped(count, "push_failed")
+
+    def _encode(self, streams: Dict[str, List[Tuple[str, str]]]) -> bytes:
+        payload = {
+            "streams": [
+                {"stream": {**self.base_labels, "level": level}, "values": values}
+                for level, values in streams.items()
+            ]
+        }
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        if self.compress:
+            body = gzip.compress(body, compresslevel=6)
+        return body
+
+    def _push(self, body: bytes) -> bool:
+        """POST a payload with retry and jittered exponential backoff."""
+        backoff = self.min_backoff
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Jitter keeps workers that failed together (e.g. on a Loki
+                # restart) from retrying in lockstep
+                time.sleep(random.uniform(backoff / 2, backoff))
+                backoff = min(backoff * 2, self.max_backoff)
+
+            try:
+                status = self._post(body)
+            except (OSError, http.client.HTTPException):
+                self._close_connection()
+                continue
+
+            if 200 <= status < 300:
+                return True
+            if status not in RETRYABLE_STATUS_CODES:
+                return False
+        return False
+
+    def _post(self, body: bytes) -> int:
+        if self._connection is None:
+            connection_class = (
+                http.client.HTTPSConnection
+                if self._scheme == "https"
+                else http.client.HTTPConnection
+            )
+            self._connection = connection_class(self._netloc, timeout=self.timeout)
+
+        self._connection.request("POST", self._path, body=body, headers=self._headers)
+        response = self._connection.getresponse()
+        # Drain the body so the connection can be reused
+        response.read()
+        if response.will_close:
+            self._close_connection()
+        return response.status
+
+    def _close_connection(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _after_fork_in_child(self):
+        # The socket is shared with the parent; drop it without closing
+        self._connection = None
+        super()._after_fork_in_child()
+
+    def _writer_stopped(self):
+        # The connection is only ever used by the writer thread, so it is
+        # closed there: close() may time out while a push is still retrying
+        self._close_connection()
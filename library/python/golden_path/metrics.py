@@ -2,11 +2,83 @@
 Metrics collection using Prometheus client library.
 """
 
-from typing import Dict, Optional, Any
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Any, Set, Tuple
 from prometheus_client import Counter, Histogram, Gauge, Info, generate_latest
 from prometheus_client.core import CollectorRegistry
+from prometheus_client.exposition import (
+    CONTENT_TYPE_LATEST,
+    choose_encoder,
+    gzip_accepted,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+import functools
+import gzip
+import threading
 import time
 
+from .callbacks import GaugeCallback
+from .exposition import Encoder, ScrapeCache
+from .fork import register_after_fork
+from .server import MetricsServer
+from .sharded import ShardedCounter, ShardedHistogram
+from .sketch import SketchHistogram
+from .multiprocess import (
+    cleanup_dead_processes,
+    enable_multiprocess,
+    get_multiprocess_dir,
+)
+
+# Label value that excess values are folded into once a limit is reached
+OVERFLOW_LABEL_VALUE = "__overflow__"
+
+# Optional metric groups, registered on first use
+TAIL_SAMPLING_METRICS = "tail_sampling"
+SPAN_EXPORT_METRICS = "span_export"
+RUNTIME_METRICS = "runtime"
+
+CLASSIC = "classic"
+SKETCH = "sketch"
+HISTOGRAM_TYPES = (CLASSIC, SKETCH)
+
+
+class CardinalityLimiter:
+    """
+    Caps the number of distinct values a label may take.
+
+    Values seen before the limit is reached pass through unchanged; any new
+    value after that is folded into OVERFLOW_LABEL_VALUE.
+    """
+
+    def __init__(self, max_values: int):
+        """
+        Initialize cardinality limiter.
+
+        Args:
+            max_values: Maximum number of distinct label values to keep
+        """
+        self.max_values = max_values
+        self.folded = 0
+        self._seen: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def limit(self, value: str) -> str:
+        """Return the value, or OVERFLOW_LABEL_VALUE if over the limit."""
+        if value in self._seen:
+            return value
+
+        with self._lock:
+            if value in self._seen:
+                return value
+            if len(self._seen) < self.max_values:
+                self._seen.add(value)
+                return value
+            self.folded += 1
+            return OVERFLOW_LABEL_VALUE
+
+    def _after_fork_in_child(self):
+        self._lock = threading.Lock()
+
 
 class MetricsCollector:
     """
@@ -19,6 +91,16 @@ class MetricsCollector:
         environment: str = "production",
         version: str = "unknown",
         registry: Optional[CollectorRegistry] = None,
+        max_label_values: Optional[int] = 1000,
+        http_child_cache_size: int = 1024,
+        multiprocess_dir: Optional[str] = None,
+        gauge_multiprocess_mode: str = "livesum",
+        scrape_cache_ttl: Optional[float] = None,
+        histogram_type: str = "classic",
+        sketch_relative_accuracy: float = 0.01,
+        sketch_max_bins: int = 2048,
+        sharded: bool = False,
+        gauge_callback_timeout: Optional[float] = 1.0,
     ):
         """
         Initialize metrics collector.
@@ -28,11 +110,60 @@ class MetricsCollector:
             environment: Environment (production, staging, development)
             version: Service version
             registry: Optional Prometheus registry
+            max_label_values: Maximum distinct endpoint/operation label values per
+                metric before folding into "__overflow__" (None disables the limit)
+            http_child_cache_size: Number of pre-bound HTTP metric children kept in
+                an LRU cache keyed on (method, endpoint, status_code); 0 disables it
+            multiprocess_dir: Directory for aggregating metrics across worker
+                processes (default: $PROMETHEUS_MULTIPROC_DIR; unset disables it)
+            gauge_multiprocess_mode: How gauges are aggregated across workers
+                (livesum, livemax, livemin, max, min, sum, all, liveall)
+            scrape_cache_ttl: Maximum staleness in seconds of a cached /metrics
+                body shared across scrapes (None renders on every scrape)
+            histogram_type: "classic" for fixed-bucket histograms, or "sketch" for
+                HTTP and business durations backed by DDSketch sketches (exported
+                as the same buckets plus <name>_quantile gauges)
+            sketch_relative_accuracy: Maximum relative error of sketch quantiles
+            sketch_max_bins: Maximum bins per sketch series (bounds memory)
+            sharded: Give each thread its own shard of the HTTP and business
+                counters and classic histograms, merged at scrape time, so
+                threads recording the same series do not contend on a lock
+            gauge_callback_timeout: Maximum seconds a scrape waits for each
+                gauge callback (None calls callbacks inline without a limit)
         """
+        if histogram_type not in HISTOGRAM_TYPES:
+            raise ValueError(
+                f"Unknown histogram type {histogram_type!r}; "
+                f"expected one of {HISTOGRAM_TYPES}"
+            )
         self.service_name = service_name
         self.environment = environment
         self.version = version
         self.registry = registry or CollectorRegistry()
+        self.gauge_multiprocess_mode = gauge_multiprocess_mode
+        self.histogram_type = histogram_type
+        self.sketch_relative_accuracy = sketch_relative_accuracy
+        self.sketch_max_bins = sketch_max_bins
+        self.sharded = sharded
+        self.gauge_callback_timeout = gauge_callback_timeout
+
+        # Multi-process mode: values live in per-process mmap files and scrapes
+        # aggregate every worker's files through a dedicated registry
+        self.multiprocess_dir = multiprocess_dir or get_multiprocess_dir()
+        self._multiprocess_registry: Optional[CollectorRegistry] = None
+        if self.multiprocess_dir:
+            if histogram_type == SKETCH:
+                raise ValueError("Sketch histograms do not support multi-process mode")
+            if sharded:
+                raise ValueError("Sharded metrics do not support multi-process mode")
+            enable_multiprocess(self.multiprocess_dir)
+            self._multiprocess_registry = CollectorRegistry()
+            MultiProcessCollector(self._multiprocess_registry, self.multiprocess_dir)
+
+        # Rendered exposition shared across concurrent and repeated scrapes
+        self.scrape_cache: Optional[ScrapeCache] = None
+        if scrape_cache_ttl is not None:
+            self.scrape_cache = ScrapeCache(self._render, scrape_cache_ttl)
 
         # Standard labels for all metrics
         self.common_labels = {
@@ -42,34 +173,52 @@ class MetricsCollector:
         }
 
         # HTTP request metrics
-        self.http_requests_total = Counter(
+        self.http_requests_total = self._hot_counter(
             "http_requests_total",
             "Total number of HTTP requests",
             ["method", "endpoint", "status_code"],
             registry=self.registry,
         )
 
-        self.http_request_duration_seconds = Histogram(
+        http_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+        self.http_request_duration_seconds = self._duration_histogram(
             "http_request_duration_seconds",
             "HTTP request duration in seconds",
             ["method", "endpoint", "status_code"],
             registry=self.registry,
-            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+            buckets=http_buckets,
+        )
+
+        self.http_request_ttfb_seconds = self._duration_histogram(
+            "http_request_ttfb_seconds",
+            "Time from request start to the first response byte in seconds",
+            ["method", "endpoint", "status_code"],
+            registry=self.registry,
+            buckets=http_buckets,
+        )
+
+        self.http_request_handler_duration_seconds = self._duration_histogram(
+            "http_request_handler_duration_seconds",
+            "Time spent in the request handler in seconds",
+            ["method", "endpoint", "status_code"],
+            registry=self.registry,
+            buckets=http_buckets,
         )
 
         # Business metrics
-        self.business_operations_total = Counter(
+        self.business_operations_total = self._hot_counter(
             "business_operations_total",
             "Total number of business operations",
             ["operation", "status"],
             registry=self.registry,
         )
 
-        self.business_operation_duration_seconds = Histogram(
+        self.business_operation_duration_seconds = self._duration_histogram(
             "business_operation_duration_seconds",
             "Business operation duration in seconds",
             ["operation"],
             registry=self.registry,
+            buckets=Histogram.DEFAULT_BUCKETS,
         )
 
         # System metrics
@@ -77,6 +226,7 @@ class MetricsCollector:
             "active_connections",
             "Number of active connections",
             registry=self.registry,
+            multiprocess_mode=gauge_multiprocess_mode,
         )
 
         self.queue_size = Gauge(
@@ -84,15 +234,245 @@ class MetricsCollector:
             "Size of processing queue",
             ["queue_name"],
             registry=self.registry,
+            multiprocess_mode=gauge_multiprocess_mode,
+        )
+
+        self.gauge_callback_errors_total = Counter(
+            "gauge_callback_errors_total",
+            "Total number of gauge callbacks that failed or timed out at scrape time",
+            ["gauge", "reason"],
+            registry=self.registry,
+        )
+
+        # Logging pipeline metrics
+        self.log_lines_dropped_total = Counter(
+            "log_lines_dropped_total",
+            "Total number of log lines dropped by the async log writer",
+            ["reason"],
+            registry=self.registry,
         )
 
-        # Service info
-        self.service_info = Info(
-            "service_info",
-            "Service information",
+        self.log_lines_suppressed_total = Counter(
+            "log_lines_suppressed_total",
+            "Total number of log lines suppressed by log sampling",
+            ["reason"],
             registry=self.registry,
         )
-        self.service_info.info(self.common_labels)
+
+        # Tracing pipeline and runtime metrics are only registered once the
+        # component recording them is set up (see the enable_*_metrics
+        # methods), so a default scrape does not carry their empty series
+        self.tail_sampling_buffered_spans: Optional[Gauge] = None
+        self.tail_sampling_spans_total: Optional[Counter] = None
+        self.span_export_queue_depth: Optional[Gauge] = None
+        self.span_export_duration_seconds: Optional[Histogram] = None
+        self.span_export_batch_size: Optional[Histogram] = None
+        self.span_export_dropped_spans_total: Optional[Counter] = None
+        self.span_export_errors_total: Optional[Counter] = None
+        self.gc_pause_seconds: Optional[Histogram] = None
+        self.event_loop_lag_seconds: Optional[Histogram] = None
+        self.slow_callback_duration_seconds: Optional[Histogram] = None
+        self.executor_queue_depth: Optional[Gauge] = None
+        self.executor_utilization: Optional[Gauge] = None
+        self._metric_groups: Set[str] = set()
+        self._metric_groups_lock = threading.Lock()
+
+        # Cardinality guard for unbounded labels
+        self.max_label_values = max_label_values
+        self.label_values_folded_total = Counter(
+            "metric_label_values_folded_total",
+            "Total number of label values folded into the overflow bucket",
+            ["metric", "label"],
+            registry=self.registry,
+        )
+        self._label_limiters: Dict[str, CardinalityLimiter] = {}
+        if max_label_values is not None:
+            self._label_limiters = {
+                "http_requests_total": CardinalityLimiter(max_label_values),
+                "business_operations_total": CardinalityLimiter(max_label_values),
+            }
+
+        # LRU of pre-bound children for record_http_request: counter, duration,
+        # TTFB and handler histograms (the last two bound on first use), labels
+        self.http_child_cache_size = http_child_cache_size
+        self._http_children: "OrderedDict[Tuple[str, str, int], List[Any]]" = (
+            OrderedDict()
+        )
+        self._http_children_lock = threading.Lock()
+
+        # Service info (Info metrics cannot be aggregated across processes, so
+        # multi-process mode exposes the same series as a gauge, named after
+        # the service_info_info sample that Info exposes)
+        if self.multiprocess_dir:
+            self.service_info = Gauge(
+                "service_info_info",
+                "Service information",
+                list(self.common_labels),
+                registry=self.registry,
+                multiprocess_mode="max",
+            )
+            self.service_info.labels(**self.common_labels).set(1)
+        else:
+            self.service_info = Info(
+                "service_info",
+                "Service information",
+                registry=self.registry,
+            )
+            self.service_info.info(self.common_labels)
+
+        register_after_fork(self)
+
+    def _after_fork_in_child(self):
+        """Reset per-process state inherited from the parent process."""
+        self._http_children_lock = threading.Lock()
+        self._metric_groups_lock = threading.Lock()
+        for limiter in self._label_limiters.values():
+            limiter._after_fork_in_child()
+        if self.scrape_cache is not None:
+            self.scrape_cache._after_fork_in_child()
+
+    def enable_tail_sampling_metrics(self):
+        """Register the tail_sampling_* metrics (called by the tail sampler)."""
+        with self._metric_groups_lock:
+            if TAIL_SAMPLING_METRICS in self._metric_groups:
+                return
+            self.tail_sampling_buffered_spans = Gauge(
+                "tail_sampling_buffered_spans",
+                "Number of spans buffered awaiting a tail-sampling decision",
+                registry=self.registry,
+                multiprocess_mode=self.gauge_multiprocess_mode,
+            )
+
+            self.tail_sampling_spans_total = Counter(
+                "tail_sampling_spans_total",
+                "Total number of spans by tail-sampling decision",
+                ["decision"],
+                registry=self.registry,
+            )
+            self._metric_groups.add(TAIL_SAMPLING_METRICS)
+
+    def enable_span_export_metrics(self):
+        """Register the span_export_* metrics (called by the export pipeline)."""
+        with self._metric_groups_lock:
+            if SPAN_EXPORT_METRICS in self._metric_groups:
+                return
+            self.span_export_queue_depth = Gauge(
+                "span_export_queue_depth",
+                "Number of spans queued for export",
+                registry=self.registry,
+                multiprocess_mode=self.gauge_multiprocess_mode,
+            )
+
+            self.span_export_duration_seconds = Histogram(
+                "span_export_duration_seconds",
+                "Span export request duration in seconds",
+                registry=self.registry,
+                buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+            )
+
+            self.span_export_batch_size = Histogram(
+                "span_export_batch_size",
+                "Number of spans per export request",
+                registry=self.registry,
+                buckets=(1, 8, 32, 64, 128, 256, 512, 1024, 2048),
+            )
+
+            self.span_export_dropped_spans_total = Counter(
+                "span_export_dropped_spans_total",
+                "Total number of spans dropped because the export queue was full",
+                registry=self.registry,
+            )
+
+            self.span_export_errors_total = Counter(
+                "span_export_errors_total",
+                "Total number of failed span export requests",
+                registry=self.registry,
+            )
+            self._metric_groups.add(SPAN_EXPORT_METRICS)
+
+    def enable_runtime_metrics(self):
+        """Register the runtime metrics (called by RuntimeCollector)."""
+        with self._metric_groups_lock:
+            if RUNTIME_METRICS in self._metric_groups:
+                return
+            self.gc_pause_seconds = Histogram(
+                "python_gc_pause_seconds",
+                "Garbage collection pause duration in seconds",
+                ["generation"],
+                registry=self.registry,
+                buckets=(
+                    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0
+                ),
+            )
+
+            self.event_loop_lag_seconds = Histogram(
+                "asyncio_event_loop_lag_seconds",
+                "Delay of the event loop lag probe past its scheduled time "
+                "in seconds",
+                registry=self.registry,
+                buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+            )
+
+            self.slow_callback_duration_seconds = Histogram(
+                "asyncio_slow_callback_duration_seconds",
+                "Duration of event loop callbacks over the slow-callback threshold",
+                registry=self.registry,
+                buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+            )
+
+            self.executor_queue_depth = Gauge(
+                "executor_queue_depth",
+                "Number of tasks waiting for a worker thread",
+                ["executor"],
+                registry=self.registry,
+                multiprocess_mode=self.gauge_multiprocess_mode,
+            )
+
+            self.executor_utilization = Gauge(
+                "executor_utilization",
+                "Fraction of an executor's maximum workers that are busy",
+                ["executor"],
+                registry=self.registry,
+                multiprocess_mode=self.gauge_multiprocess_mode,
+            )
+            self._metric_groups.add(RUNTIME_METRICS)
+
+    def _hot_counter(
+        self,
+        name: str,
+        description: str,
+        labels: list,
+        registry: CollectorRegistry,
+    ) -> Any:
+        """Create a counter recorded on every request, sharded if configured."""
+        if self.sharded:
+            return ShardedCounter(name, description, labels, registry=registry)
+        return Counter(name, description, labels, registry=registry)
+
+    def _duration_histogram(
+        self,
+        name: str,
+        description: str,
+        labels: list,
+        registry: CollectorRegistry,
+        buckets: tuple,
+    ) -> Any:
+        """Create a duration histogram of the configured histogram type."""
+        if self.histogram_type == SKETCH:
+            return SketchHistogram(
+                name,
+                description,
+                labels,
+                registry=registry,
+                buckets=buckets,
+                relative_accuracy=self.sketch_relative_accuracy,
+                max_bins=self.sketch_max_bins,
+            )
+        if self.sharded:
+            return ShardedHistogram(
+                name, description, labels, registry=registry, buckets=buckets
+            )
+        return Histogram(name, description, labels, registry=registry, buckets=buckets)
 
     def record_http_request(
         self,
@@ -100,19 +480,86 @@ class MetricsCollector:
         endpoint: str,
         status_code: int,
         duration: float,
+        ttfb: Optional[float] = None,
+        handler_duration: Optional[float] = None,
     ):
         """
         Record an HTTP request.
 
         Args:
             method: HTTP method (GET, POST, etc.)
-            endpoint: Request endpoint
+            endpoint: Request endpoint (route template, e.g. /orders/{id})
             status_code: HTTP status code
-            duration: Request duration in seconds
+            duration: Total request duration in seconds
+            ttfb: Optional time to the first response byte in seconds
+            handler_duration: Optional time spent in the request handler in seconds
         """
-        labels = [method, endpoint, str(status_code)]
-        self.http_requests_total.labels(*labels).inc()
-        self.http_request_duration_seconds.labels(*labels).observe(duration)
+        key = (method, endpoint, status_code)
+        children = self._http_children.get(key)
+        if children is None:
+            children = self._bind_http_children(key)
+        else:
+            try:
+                self._http_children.move_to_end(key)
+            except KeyError:
+                pass  # evicted concurrently
+
+        children[0].inc()
+        children[1].observe(duration)
+        if ttfb is not None:
+            histogram = children[2]
+            if histogram is None:
+                histogram = self.http_request_ttfb_seconds.labels(*children[4])
+                children[2] = histogram
+            histogram.observe(ttfb)
+        if handler_duration is not None:
+            histogram = children[3]
+            if histogram is None:
+                histogram = self.http_request_handler_duration_seconds.labels(
+                    *children[4]
+                )
+                children[3] = histogram
+            histogram.observe(handler_duration)
+
+    def _bind_http_children(self, key: Tuple[str, str, int]) -> List[Any]:
+        """Resolve HTTP metric children for a label key and cache them."""
+        method, endpoint, status_code = key
+        limited = self._limit_label("http_requests_total", "endpoint", endpoint)
+        labels = (method, limited, str(status_code))
+        children = [
+            self.http_requests_total.labels(*labels),
+            self.http_request_duration_seconds.labels(*labels),
+            None,
+            None,
+            labels,
+        ]
+
+        # Folded keys stay uncached so every overflow is counted
+        if self.http_child_cache_size > 0 and limited is not OVERFLOW_LABEL_VALUE:
+            with self._http_children_lock:
+                self._http_children[key] = children
+                while len(self._http_children) > self.http_child_cache_size:
+                    self._http_children.popitem(last=False)
+        return children
+
+    def prebind_http_routes(
+        self,
+        routes: Iterable[Tuple[str, str]],
+        status_codes: Iterable[int] = (200,),
+    ):
+        """
+        Eagerly bind HTTP metric children for known routes.
+
+        Args:
+            routes: (method, endpoint) pairs, e.g. from the app's route table
+            status_codes: Status codes to bind for each route
+        """
+        status_codes = tuple(status_codes)
+        for method, endpoint in routes:
+            for status_code in status_codes:
+                key = (method, endpoint, status_code)
+                if key not in self._http_children:
+                    self._bind_http_children(key)
 
     def record_business_operation(
         self,
@@ -128,12 +575,46 @@ class MetricsCollector:
             status: Operation status (success, error, etc.)
             duration: Optional operation duration in seconds
         """
+        operation = self._limit_label(
+            "business_operations_total", "operation", operation
+        )
         self.business_operations_total.labels(operation=operation, status=status).inc()
         if duration is not None:
             self.business_operation_duration_seconds.labels(operation=operation).observe(
                 duration
             )
 
+    def bind_business_operation(self, operation: str) -> Tuple[Any, Any, Any]:
+        """
+        Bind business metric children for an operation ahead of time.
+
+        Args:
+            operation: Operation name
+
+        Returns:
+            Success counter, error counter and duration histogram children
+        """
+        operation = self._limit_label(
+            "business_operations_total", "operation", operation
+        )
+        counter = self.business_operations_total
+        return (
+            counter.labels(operation=operation, status="success"),
+            counter.labels(operation=operation, status="error"),
+            self.business_operation_duration_seconds.labels(operation=operation),
+        )
+
+    def _limit_label(self, metric: str, label: str, value: str) -> str:
+        """Fold a label value into the overflow bucket once over the limit."""
+        limiter = self._label_limiters.get(metric)
+        if limiter is None:
+            return value
+
+        limited = limiter.limit(value)
+        if limited is OVERFLOW_LABEL_VALUE:
+            self.label_values_folded_total.labels(metric=metric, label=label).inc()
+        return limited
+
     def set_active_connections(self, count: int):
         """Set the number of active connections."""
         self.active_connections.set(count)
@@ -142,9 +623,245 @@ class MetricsCollector:
         """Set the size of a processing queue."""
         self.queue_size.labels(queue_name=queue_name).set(size)
 
+    def set_active_connections_callback(
+        self,
+        func: Callable[..., float],
+        obj: Any = None,
+    ) -> GaugeCallback:
+        """
+        Compute active_connections with a function evaluated at scrape time.
+
+        Replaces values set with set_active_connections() and the
+        middleware's in-flight count.
+
+        Args:
+            func: Function returning the number of connections; called as
+                func(obj) when obj is given
+            obj: Optional object passed to func (e.g. a connection pool),
+                held by weak reference
+
+        Returns:
+            Registered callback
+        """
+        return self.set_gauge_callback(self.active_connections, func, obj=obj)
+
+    def set_queue_size_callback(
+        self,
+        queue_name: str,
+        func: Callable[..., float],
+        obj: Any = None,
+    ) -> GaugeCallback:
+        """
+        Compute a queue's size with a function evaluated at scrape time.
+
+        Args:
+            queue_name: Queue name label
+            func: Function returning the queue size, e.g. lambda: len(queue),
+                or a function called as func(obj) when obj is given
+            obj: Optional object passed to func (e.g. the queue), held by weak
+                reference; the series is removed once it is garbage collected
+
+        Returns:
+            Registered callback
+        """
+        return self.set_gauge_callback(
+            self.queue_size, func, {"queue_name": queue_name}, obj
+        )
+
+    def set_gauge_callback(
+        self,
+        gauge: Gauge,
+        func: Callable[..., float],
+        labels: Optional[Dict[str, str]] = None,
+        obj: Any = None,
+    ) -> GaugeCallback:
+        """
+        Compute a gauge series with a function evaluated at scrape time.
+
+        The function runs with gauge_callback_timeout; if it raises or times
+        out, the series reports NaN for that scrape and
+        gauge_callback_errors_total is incremented.
+
+        Args:
+            gauge: Gauge of this collector, e.g. from create_custom_gauge()
+            func: Function returning the value; called as func(obj) when obj
+                is given, otherwise without arguments
+            labels: Label values of the series (for labelled gauges)
+            obj: Optional object passed to func, held by weak reference; a
+                labelled series is removed once it is garbage collected
+
+        Returns:
+            Registered callback
+        """
+        if self.multiprocess_dir:
+            raise ValueError("Gauge callbacks are not supported in multi-process mode")
+
+        on_release = None
+        child = gauge
+        if labels:
+            labelvalues = [labels[name] for name in gauge._labelnames]
+            child = gauge.labels(*labelvalues)
+            on_release = functools.partial(gauge.remove, *labelvalues)
+
+        callback = GaugeCallback(
+            func,
+            gauge._name,
+            obj=obj,
+            timeout=self.gauge_callback_timeout,
+            metrics_collector=self,
+            on_release=on_release,
+        )
+        child.set_function(callback)
+        return callback
+
+    def record_gauge_callback_error(self, gauge: str, reason: str = "error"):
+        """
+        Record a gauge callback that failed at scrape time.
+
+        Args:
+            gauge: Gauge name
+            reason: Why no value was produced (error, timeout)
+        """
+        self.gauge_callback_errors_total.labels(gauge=gauge, reason=reason).inc()
+
+    def record_log_lines_dropped(self, count: int = 1, reason: str = "overflow"):
+        """
+        Record log lines dropped by the async log writer.
+
+        Args:
+            count: Number of dropped lines
+            reason: Why the lines were dropped (drop_oldest, drop_newest, closed)
+        """
+        self.log_lines_dropped_total.labels(reason=reason).inc(count)
+
+    def record_log_lines_suppressed(self, count: int = 1, reason: str = "sampled"):
+        """
+        Record log lines suppressed by log sampling.
+
+        Args:
+            count: Number of suppressed lines
+            reason: Why the lines were suppressed (sampled, rate_limited)
+        """
+        self.log_lines_suppressed_total.labels(reason=reason).inc(count)
+
+    def record_tail_sampling(self, decision: str, count: int = 1):
+        """
+        Record spans resolved by the tail sampler.
+
+        Args:
+            decision: Outcome (kept, dropped, evicted)
+            count: Number of spans
+        """
+        if TAIL_SAMPLING_METRICS not in self._metric_groups:
+            self.enable_tail_sampling_metrics()
+        self.tail_sampling_spans_total.labels(decision=decision).inc(count)
+
+    def record_span_export(
+        self,
+        batch_size: int,
+        duration: float,
+        success: bool = True,
+    ):
+        """
+        Record a span export request.
+
+        Args:
+            batch_size: Number of spans in the request
+            duration: Request duration in seconds
+            success: Whether the exporter reported success
+        """
+        if SPAN_EXPORT_METRICS not in self._metric_groups:
+            self.enable_span_export_metrics()
+        self.span_export_batch_size.observe(batch_size)
+        self.span_export_duration_seconds.observe(duration)
+        if not success:
+            self.span_export_errors_total.inc()
+
+    def record_spans_dropped(self, count: int = 1):
+        """Record spans dropped because the export queue was full."""
+        if SPAN_EXPORT_METRICS not in self._metric_groups:
+            self.enable_span_export_metrics()
+        self.span_export_dropped_spans_total.inc(count)
+
+    def record_gc_pause(self, generation: int, duration: float):
+        """
+        Record a garbage collection pause.
+
+        Args:
+            generation: Collected generation (0, 1 or 2)
+            duration: Pause duration in seconds
+        """
+        if RUNTIME_METRICS not in self._metric_groups:
+            self.enable_runtime_metrics()
+        self.gc_pause_seconds.labels(generation=str(generation)).observe(duration)
+
+    def record_event_loop_lag(self, lag: float):
+        """Record how late the event loop ran a scheduled probe, in seconds."""
+        if RUNTIME_METRICS not in self._metric_groups:
+            self.enable_runtime_metrics()
+        self.event_loop_lag_seconds.observe(lag)
+
+    def record_slow_callback(self, duration: float):
+        """Record an event loop callback that ran over the slow threshold."""
+        if RUNTIME_METRICS not in self._metric_groups:
+            self.enable_runtime_metrics()
+        self.slow_callback_duration_seconds.observe(duration)
+
     def get_metrics(self) -> bytes:
         """Get Prometheus metrics in text format."""
-        return generate_latest(self.registry)
+        if self.scrape_cache is not None:
+            return self.scrape_cache.get(generate_latest, CONTENT_TYPE_LATEST)
+        return self._render(generate_latest)
+
+    def render_metrics(
+        self,
+        accept: Optional[str] = None,
+        accept_encoding: Optional[str] = None,
+    ) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Render metrics for a scrape, negotiating format and compression.
+
+        Args:
+            accept: Request Accept header (selects Prometheus text or OpenMetrics)
+            accept_encoding: Request Accept-Encoding header (enables gzip)
+
+        Returns:
+            Tuple of (response body, response headers)
+        """
+        encoder, content_type = choose_encoder(accept or "")
+        compress = gzip_accepted(accept_encoding or "")
+
+        if self.scrape_cache is not None:
+            body = self.scrape_cache.get(encoder, content_type, compress)
+        else:
+            body = self._render(encoder)
+            if compress:
+                body = gzip.compress(body)
+
+        headers = {"Content-Type": content_type}
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+        return body, headers
+
+    def serve(self, port: int = 9464, addr: str = "0.0.0.0") -> MetricsServer:
+        """
+        Serve /metrics and /health from a dedicated background thread.
+
+        Args:
+            port: Port to listen on (0 picks a free port)
+            addr: Address to bind
+
+        Returns:
+            Running MetricsServer; call shutdown() to stop it
+        """
+        return MetricsServer(self, port=port, addr=addr)
+
+    def _render(self, encoder: Encoder) -> bytes:
+        """Render the exposition of this collector's registry."""
+        if self._multiprocess_registry is not None:
+            cleanup_dead_processes(self.multiprocess_dir)
+            return encoder(self._multiprocess_registry)
+        return encoder(self.registry)
 
     def create_custom_counter(
         self,
@@ -188,5 +905,6 @@ class MetricsCollector:
             description,
             labels or [],
             registry=self.registry,
+            multiprocess_mode=self.gauge_multiprocess_mode,
         )
 
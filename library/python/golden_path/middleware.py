@@ -2,13 +2,23 @@
 HTTP middleware for automatic observability instrumentation.
 """
 
+import inspect
+import logging
 import time
 from typing import Callable, Optional
 from functools import wraps
+from opentelemetry import trace
 from .metrics import MetricsCollector
 from .tracing import TracingCollector
 from .logging import StructuredLogger
 
+# WSGI environ key holding the request start time in perf_counter_ns units
+WSGI_START_TIME_KEY = "golden_path.start_time_ns"
+
+# Endpoint label of requests that matched no route (404s, scanners), which
+# would otherwise add a series per raw path
+UNMATCHED_ROUTE = "<unmatched>"
+
 
 class ObservabilityMiddleware:
     """
@@ -23,6 +33,7 @@ class ObservabilityMiddleware:
         metrics_collector: Optional[MetricsCollector] = None,
         tracing_collector: Optional[TracingCollector] = None,
         logger: Optional[StructuredLogger] = None,
+        track_active_connections: bool = True,
     ):
         """
         Initialize observability middleware.
@@ -34,6 +45,8 @@ class ObservabilityMiddleware:
             metrics_collector: Optional metrics collector (creates one if not provided)
             tracing_collector: Optional tracing collector (creates one if not provided)
             logger: Optional logger (creates one if not provided)
+            track_active_connections: Keep the active_connections gauge at the
+                number of in-flight requests
         """
         self.service_name = service_name
         self.environment = environment
@@ -46,8 +59,9 @@ class ObservabilityMiddleware:
             service_name, environment, version
         )
         self.logger = logger or StructuredLogger(
-            service_name, environment, version
+            service_name, environment, version, metrics_collector=self.metrics
         )
+        self.track_active_connections = track_active_connections
 
     def flask_middleware(self, app):
         """
@@ -58,28 +72,65 @@ class ObservabilityMiddleware:
         """
         from flask import request, g
 
+        # Total time starts when the WSGI server hands over the request, before
+        # Flask pushes its contexts and runs the before_request hooks
+        wsgi_app = app.wsgi_app
+        active_connections = self.metrics.active_connections
+
+        def timed_wsgi_app(environ, start_response):
+            environ[WSGI_START_TIME_KEY] = time.perf_counter_ns()
+            return wsgi_app(environ, start_response)
+
+        def tracked_wsgi_app(environ, start_response):
+            environ[WSGI_START_TIME_KEY] = time.perf_counter_ns()
+            active_connections.inc()
+            try:
+                return wsgi_app(environ, start_response)
+            finally:
+                active_connections.dec()
+
+        if self.track_active_connections:
+            app.wsgi_app = tracked_wsgi_app
+        else:
+            app.wsgi_app = timed_wsgi_app
+
         @app.before_request
         def before_request():
-            g.start_time = time.time()
+            g.start_time_ns = time.perf_counter_ns()
             g.trace_id = self.tracing.get_trace_id()
 
         @app.after_request
         def after_request(response):
-            duration = time.time() - g.start_time
+            end_time_ns = time.perf_counter_ns()
+            handler_ns = end_time_ns - g.start_time_ns
+            duration_ns = end_time_ns - request.environ.get(
+                WSGI_START_TIME_KEY, g.start_time_ns
+            )
             method = request.method
-            endpoint = request.endpoint or request.path
+            # Route template keeps label cardinality bounded (/orders/<id>)
+            url_rule = request.url_rule
+            endpoint = url_rule.rule if url_rule is not None else UNMATCHED_ROUTE
             status_code = response.status_code
 
             # Record metrics
-            self.metrics.record_http_request(method, endpoint, status_code, duration)
+            self.metrics.record_http_request(
+                method,
+                endpoint,
+                status_code,
+                duration_ns / 1e9,
+                handler_duration=handler_ns / 1e9,
+            )
 
-            # Log request
-            self.logger.info(
+            # Log request; server errors are logged as warnings so that log
+            # sampling never drops them
+            log = self.logger.info if status_code < 500 else self.logger.warning
+            log(
                 "HTTP request completed",
                 method=method,
                 endpoint=endpoint,
                 status_code=status_code,
-                duration_ms=duration * 1000,
+                duration_ms=duration_ns / 1e6,
+                handler_ms=handler_ns / 1e6,
                 trace_id=g.trace_id,
             )
 
@@ -94,98 +145,257 @@ class ObservabilityMiddleware:
         Args:
             app: FastAPI application instance
         """
-        from fastapi import Request
-        from starlette.middleware.base import BaseHTTPMiddleware
-        from starlette.responses import Response
-
-        # Capture outer self for use in inner class
-        observability = self
-
-        class ObservabilityHTTPMiddleware(BaseHTTPMiddleware):
-            async def dispatch(self, request: Request, call_next):
-                start_time = time.time()
-                trace_id = observability.tracing.get_trace_id()
-
-                # Create span for request
-                from opentelemetry import trace
-                with observability.tracing.span(
-                    f"{request.method} {request.url.path}",
-                    attributes={
-                        "http.method": request.method,
-                        "http.url": str(request.url),
-                        "http.route": request.url.path,
-                    },
-                    kind=trace.SpanKind.SERVER,
-                ):
-                    response = await call_next(request)
-                    duration = time.time() - start_time
-
-                    # Record metrics
-                    observability.metrics.record_http_request(
-                        request.method,
-                        request.url.path,
-                        response.status_code,
-                        duration,
-                    )
-
-                    # Log request
-                    observability.logger.info(
-                        "HTTP request completed",
-                        method=request.method,
-                        endpoint=request.url.path,
-                        status_code=response.status_code,
-                        duration_ms=duration * 1000,
-                        trace_id=trace_id,
-                    )
-
-                    return response
-
-        app.add_middleware(ObservabilityHTTPMiddleware)
+        app.add_middleware(ObservabilityASGIMiddleware, observability=self)
         return app
 
+    def prebind_routes(self, app, status_codes=(200,)):
+        """
+        Warm the HTTP metric child cache from an app's route table.
+
+        Call after all routes have been registered.
+
+        Args:
+            app: Flask or FastAPI application instance
+            status_codes: Status codes to bind for each route
+        """
+        routes = []
+        if hasattr(app, "url_map"):
+            for rule in app.url_map.iter_rules():
+                routes.extend((method, rule.rule) for method in rule.methods or ())
+        else:
+            for route in app.routes:
+                methods = getattr(route, "methods", None) or ()
+                routes.extend((method, route.path) for method in methods)
+
+        self.metrics.prebind_http_routes(routes, status_codes)
+
     def decorator(self, func: Callable) -> Callable:
         """
         Decorator for instrumenting functions.
 
+        Plain functions, coroutine functions, generators and async generators
+        are supported; coroutines and generators are timed until they finish,
+        not until they are created.
+
         Args:
             func: Function to instrument
 
         Returns:
             Instrumented function
         """
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            func_name = f"{func.__module__}.{func.__name__}"
-            start_time = time.time()
+        # Everything that does not change between calls is resolved once here
+        func_name = f"{func.__module__}.{func.__name__}"
+        attributes = {"function.name": func.__name__}
+        calling_message = f"Calling {func_name}"
+        completed_message = f"{func_name} completed"
+        failed_message = f"{func_name} failed"
+        success_counter, error_counter, histogram = (
+            self.metrics.bind_business_operation(func_name)
+        )
+        tracing = self.tracing
+        logger = self.logger
+
+        def on_start():
+            if logger.is_enabled_for(logging.DEBUG):
+                logger.debug(calling_message)
+
+        def on_success(start_time_ns: int):
+            duration_ns = time.perf_counter_ns() - start_time_ns
+            success_counter.inc()
+            histogram.observe(duration_ns / 1e9)
+            if logger.is_enabled_for(logging.DEBUG):
+                logger.debug(completed_message, duration_ms=duration_ns / 1e6)
+
+        def on_error(error: Exception, start_time_ns: int):
+            duration_ns = time.perf_counter_ns() - start_time_ns
+            error_counter.inc()
+            histogram.observe(duration_ns / 1e9)
+            logger.error(
+                failed_message, error=str(error), duration_ms=duration_ns / 1e6
+            )
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def coroutine_wrapper(*args, **kwargs):
+                start_time_ns = time.perf_counter_ns()
+                with tracing.span(func_name, attributes=attributes):
+                    on_start()
+                    try:
+                        result = await func(*args, **kwargs)
+                    except Exception as e:
+                        on_error(e, start_time_ns)
+                        raise
+                    on_success(start_time_ns)
+                    return result
+
+            return coroutine_wrapper
 
-            with self.tracing.span(
+        if inspect.isasyncgenfunction(func) or inspect.isgeneratorfunction(func):
+
+            def on_generator_start() -> int:
+                start_time_ns = time.perf_counter_ns()
+                on_start()
+                return start_time_ns
+
+            def on_generator_finish(start_time_ns: int, error: Optional[Exception]):
+                if error is None:
+                    on_success(start_time_ns)
+                else:
+                    on_error(error, start_time_ns)
+
+            # The span is current only while the generator runs, not while it
+            # is suspended in the consumer
+            return tracing.wrap_generator_function(
+                func,
                 func_name,
-                attributes={"function.name": func.__name__},
-            ):
-                self.logger.debug(f"Calling {func_name}")
+                attributes,
+                on_start=on_generator_start,
+                on_finish=on_generator_finish,
+            )
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time_ns = time.perf_counter_ns()
+            with tracing.span(func_name, attributes=attributes):
+                on_start()
                 try:
                     result = func(*args, **kwargs)
-                    duration = time.time() - start_time
-
-                    self.metrics.record_business_operation(
-                        func_name, "success", duration
-                    )
-                    self.logger.debug(
-                        f"{func_name} completed",
-                        duration_ms=duration * 1000,
-                    )
-                    return result
                 except Exception as e:
-                    duration = time.time() - start_time
-                    self.metrics.record_business_operation(
-                        func_name, "error", duration
-                    )
-                    self.logger.error(
-                        f"{func_name} failed",
-                        error=str(e),
-                        duration_ms=duration * 1000,
-                    )
+                    on_error(e, start_time_ns)
                     raise
+                on_success(start_time_ns)
+                return result
 
         return wrapper
 
+
+class ObservabilityASGIMiddleware:
+    """
+    Pure ASGI middleware that instruments HTTP and websocket scopes.
+
+    Wraps ``send`` to capture the response status and time-to-first-byte
+    instead of buffering the response, so streaming responses and
+    contextvars pass through untouched.
+    """
+
+    def __init__(self, app, observability: ObservabilityMiddleware):
+        """
+        Initialize ASGI middleware.
+
+        Args:
+            app: Downstream ASGI application
+            observability: Observability middleware providing the collectors
+        """
+        self.app = app
+        self.observability = observability
+        self.active_connections = None
+        if observability.track_active_connections:
+            self.active_connections = observability.metrics.active_connections
+
+    async def __call__(self, scope, receive, send):
+        scope_type = scope["type"]
+        if scope_type != "http" and scope_type != "websocket":
+            await self.app(scope, receive, send)
+            return
+
+        observability = self.observability
+        method = scope.get("method", "GET") if scope_type == "http" else "WEBSOCKET"
+        path = scope["path"]
+        start_time_ns = time.perf_counter_ns()
+        status_code = 500
+        first_byte_time_ns = 0
+        active_connections = self.active_connections
+
+        async def send_wrapper(message):
+            nonlocal status_code, first_byte_time_ns
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                status_code = message["status"]
+                first_byte_time_ns = time.perf_counter_ns()
+            elif message_type == "websocket.accept":
+                status_code = 101
+                first_byte_time_ns = time.perf_counter_ns()
+            elif message_type == "websocket.close" and not first_byte_time_ns:
+                status_code = 403
+                first_byte_time_ns = time.perf_counter_ns()
+            await send(message)
+
+        # Named after the method until the route is known; samplers match
+        # on the http.target attribute
+        with observability.tracing.span(
+            method,
+            attributes={
+                "http.method": method,
+                "http.target": path,
+            },
+            kind=trace.SpanKind.SERVER,
+        ) as span:
+            if active_connections is not None:
+                active_connections.inc()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if active_connections is not None:
+                    active_connections.dec()
+                end_time_ns = time.perf_counter_ns()
+                duration_ns = end_time_ns - start_time_ns
+                ttfb_ns = (first_byte_time_ns or end_time_ns) - start_time_ns
+
+                # The router stores the matched route on the scope
+                route_path = getattr(scope.get("route"), "path", None)
+                endpoint = route_path or UNMATCHED_ROUTE
+                if span.is_recording():
+                    # One attribute update (and lock) instead of one per key
+                    span.update_name(f"{method} {endpoint}")
+                    attributes = {
+                        "http.url": _scope_url(scope),
+                        "http.status_code": status_code,
+                    }
+                    if route_path:
+                        attributes["http.route"] = route_path
+                    span.set_attributes(attributes)
+                    if status_code >= 500:
+                        span.set_status(trace.Status(trace.StatusCode.ERROR))
+
+                # Record metrics
+                observability.metrics.record_http_request(
+                    method,
+                    endpoint,
+                    status_code,
+                    duration_ns / 1e9,
+                    ttfb=ttfb_ns / 1e9,
+                )
+
+                # Log request; server errors are logged as warnings so that log
+                # sampling never drops them. The line is logged in the span,
+                # so trace correlation adds its trace id
+                logger = observability.logger
+                log = logger.info if status_code < 500 else logger.warning
+                log(
+                    "HTTP request completed",
+                    method=method,
+                    endpoint=endpoint,
+                    status_code=status_code,
+                    duration_ms=duration_ns / 1e6,
+                    ttfb_ms=ttfb_ns / 1e6,
+                )
+
+
+def _scope_url(scope) -> str:
+    """Rebuild the request URL from an ASGI scope."""
+    scheme = scope.get("scheme", "http")
+    host = None
+    for key, value in scope.get("headers", ()):
+        if key == b"host":
+            host = value.decode("latin-1")
+            break
+    if host is None:
+        server = scope.get("server")
+        host = f"{server[0]}:{server[1]}" if server else "localhost"
+
+    url = f"{scheme}://{host}{scope['path']}"
+    query_string = scope.get("query_string")
+    if query_string:
+        url += "?" + query_string.decode("latin-1")
+    return url
@@ -0,0 +1,104 @@
+"""
+Multi-process metrics support for pre-fork servers (gunicorn, uvicorn workers).
+
+Each worker writes its metric values to mmap-backed files in a shared
+directory, and every scrape aggregates the files of all workers, so
+/metrics reports the whole server rather than whichever worker answered.
+"""
+
+import glob
+import os
+import re
+from typing import Optional
+
+from prometheus_client import multiprocess, values
+
+ENV_VAR = "PROMETHEUS_MULTIPROC_DIR"
+
+# Files whose values belong to live processes only: gauge_live<mode>_<pid>.db
+_LIVE_GAUGE_FILE = re.compile(r"^gauge_live[a-z]+_(\d+)\.db$")
+
+
+def enable_multiprocess(path: str) -> str:
+    """
+    Switch prometheus_client to mmap-backed values stored under a directory.
+
+    Must be called before any metric is created in the process; metrics
+    created earlier keep their in-memory values and are not aggregated.
+
+    Args:
+        path: Directory shared by all worker processes
+
+    Returns:
+        The multiprocess directory
+    """
+    os.makedirs(path, exist_ok=True)
+    os.environ[ENV_VAR] = path
+    if not getattr(values.ValueClass, "_multiprocess", False):
+        values.ValueClass = values.MultiProcessValue()
+    return path
+
+
+def get_multiprocess_dir() -> Optional[str]:
+    """Get the multiprocess directory from the environment, if configured."""
+    return os.environ.get(ENV_VAR) or os.environ.get(ENV_VAR.lower())
+
+
+def prepare_multiprocess_dir(path: str):
+    """
+    Create the multiprocess directory and remove files from previous runs.
+
+    Call once in the server master before workers start (e.g. gunicorn's
+    ``on_starting`` hook), never from a worker.
+
+    Args:
+        path: Directory shared by all worker processes
+    """
+    os.makedirs(path, exist_ok=True)
+    for filename in glob.glob(os.path.join(path, "*.db")):
+        os.remove(filename)
+
+
+def mark_process_dead(pid: int, path: Optional[str] = None):
+    """
+    Remove the live-gauge files of a worker that has exited.
+
+    Counter and histogram files are kept so totals never go backwards.
+
+    Args:
+        pid: Process ID of the exited worker
+        path: Multiprocess directory (default: from the environment)
+    """
+    multiprocess.mark_process_dead(pid, path or get_multiprocess_dir())
+
+
+def cleanup_dead_processes(path: str) -> int:
+    """
+    Remove live-gauge files left behind by workers that are no longer running.
+
+    Args:
+        path: Multiprocess directory
+
+    Returns:
+        Number of dead processes cleaned up
+    """
+    pids = set()
+    for filename in os.listdir(path):
+        match = _LIVE_GAUGE_FILE.match(filename)
+        if match:
+            pids.add(int(match.group(1)))
+
+    dead = [pid for pid in pids if not _pid_alive(pid)]
+    for pid in dead:
+        multiprocess.mark_process_dead(pid, path)
+    return len(dead)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,287 @@
+"""
+Opt-in runtime metrics: GC pauses, event loop lag, slow callbacks and
+thread pool saturation.
+
+These explain latency regressions that HTTP metrics only show as slower
+requests. Every probe is cheap enough to leave on in production; see
+benchmarks/bench_runtime.py.
+"""
+
+import asyncio
+import contextvars
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .callbacks import GaugeCallback
+    from .logging import StructuredLogger
+    from .metrics import MetricsCollector
+
+# RuntimeCollector whose slow-callback hook currently patches Handle._run
+_slow_callback_hook_owner: Optional["RuntimeCollector"] = None
+_slow_callback_hook_lock = threading.Lock()
+
+
+class RuntimeCollector:
+    """
+    Records runtime performance metrics into a MetricsCollector.
+
+    - GC pauses per generation, timed with gc.callbacks
+    - Event loop lag, sampled by a low-frequency probe task
+    - Slow event loop callbacks, recorded with a span event on the trace
+      that was active in the callback (and a warning log, if a logger is
+      given)
+    - Thread pool queue depth and utilization, evaluated at scrape time
+
+    Nothing is recorded until start() (GC pauses, slow callbacks),
+    monitor_event_loop() or monitor_executor() is called.
+    """
+
+    def __init__(
+        self,
+        metrics_collector: "MetricsCollector",
+        logger: Optional["StructuredLogger"] = None,
+        gc_pauses: bool = True,
+        slow_callbacks: bool = True,
+        slow_callback_threshold: float = 0.1,
+        loop_lag_interval: float = 1.0,
+    ):
+        """
+        Initialize runtime collector.
+
+        Args:
+            metrics_collector: Metrics collector holding the runtime metrics
+            logger: Optional logger for slow-callback warnings
+            gc_pauses: Time garbage collection pauses
+            slow_callbacks: Time event loop callbacks and report slow ones
+                (stdlib asyncio event loops only; uvloop is not covered)
+            slow_callback_threshold: Callbacks running at least this many
+                seconds are reported as slow
+            loop_lag_interval: Seconds between event loop lag probes
+        """
+        self.metrics_collector = metrics_collector
+        self.logger = logger
+        self.gc_pauses = gc_pauses
+        self.slow_callbacks = slow_callbacks
+        self.slow_callback_threshold = slow_callback_threshold
+        self.loop_lag_interval = loop_lag_interval
+
+        # GC runs with the GIL held and is not reentrant, so one start time
+        # is enough
+        self._gc_start_ns = 0
+        self._gc_pause_histograms: List[Any] = []
+
+        self._original_handle_run: Optional[Callable[[Any], None]] = None
+        self._probes: List[asyncio.Task] = []
+        self._executor_callbacks: List["GaugeCallback"] = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self) -> "RuntimeCollector":
+        """
+        Install the GC and slow-callback hooks.
+
+        Raises:
+            RuntimeError: If another started collector owns the slow-callback
+                hook, which patches the event loop process-wide
+        """
+        with self._lock:
+            if self._started:
+                return self
+            if self.slow_callbacks:
+                self._install_slow_callback_hook()
+            self._started = True
+
+            self.metrics_collector.enable_runtime_metrics()
+            if self.gc_pauses:
+                # Children are bound up front: observing them only takes their
+                # value locks, which are never held across an allocation that
+                # could trigger a collection
+                gc_pause_seconds = self.metrics_collector.gc_pause_seconds
+                self._gc_pause_histograms = [
+                    gc_pause_seconds.labels(generation=str(generation))
+                    for generation in range(3)
+                ]
+                gc.callbacks.append(self._on_gc)
+        return self
+
+    def close(self):
+        """Remove the hooks, stop the event loop probes and executor series."""
+        with self._lock:
+            if self._started:
+                self._started = False
+                if self._on_gc in gc.callbacks:
+                    gc.callbacks.remove(self._on_gc)
+                self._remove_slow_callback_hook()
+            probes, self._probes = self._probes, []
+            callbacks, self._executor_callbacks = self._executor_callbacks, []
+
+        for callback in callbacks:
+            callback.release()
+        for probe in probes:
+            loop = probe.get_loop()
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(probe.cancel)
+
+    def _on_gc(self, phase: str, info: Dict[str, int]):
+        if phase == "start":
+            self._gc_start_ns = time.perf_counter_ns()
+            return
+
+        start_ns = self._gc_start_ns
+        if start_ns:
+            self._gc_start_ns = 0
+            self._gc_pause_histograms[info["generation"]].observe(
+                (time.perf_counter_ns() - start_ns) / 1e9
+            )
+
+    def _install_slow_callback_hook(self):
+        global _slow_callback_hook_owner
+
+        # Every ready callback of the stdlib event loop (task steps, timers,
+        # call_soon) is run through Handle._run. The patch is process-wide,
+        # so only one collector may own it at a time.
+        with _slow_callback_hook_lock:
+            if _slow_callback_hook_owner is not None:
+                raise RuntimeError(
+                    "The slow-callback hook is already installed by another "
+                    "RuntimeCollector; close() it first or pass "
+                    "slow_callbacks=False"
+                )
+            _slow_callback_hook_owner = self
+
+        handle_class = asyncio.events.Handle
+        original_run = handle_class._run
+        threshold_ns = int(self.slow_callback_threshold * 1e9)
+        report = self._report_slow_callback
+        perf_counter_ns = time.perf_counter_ns
+
+        def timed_run(handle):
+            start_ns = perf_counter_ns()
+            original_run(handle)
+            duration_ns = perf_counter_ns() - start_ns
+            if duration_ns >= threshold_ns:
+                # The handle's context holds the span the callback ran under
+                handle._context.run(report, handle, duration_ns)
+
+        self._original_handle_run = original_run
+        handle_class._run = timed_run
+
+    def _remove_slow_callback_hook(self):
+        global _slow_callback_hook_owner
+
+        if self._original_handle_run is not None:
+            asyncio.events.Handle._run = self._original_handle_run
+            self._original_handle_run = None
+            with _slow_callback_hook_lock:
+                _slow_callback_hook_owner = None
+
+    def _report_slow_callback(self, handle: asyncio.Handle, duration_ns: int):
+        self.metrics_collector.record_slow_callback(duration_ns / 1e9)
+
+        callback = _describe_callback(handle)
+        duration_ms = duration_ns / 1e6
+
+        from opentelemetry import trace
+
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.add_event(
+                "asyncio.slow_callback",
+                {"callback": callback, "duration_ms": duration_ms},
+            )
+        if self.logger is not None:
+            self.logger.warning(
+                "Slow event loop callback",
+                callback=callback,
+                duration_ms=duration_ms,
+            )
+
+    def monitor_event_loop(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> asyncio.Task:
+        """
+        Start an event loop lag probe.
+
+        The probe sleeps for loop_lag_interval and records how much later
+        than scheduled it woke up, which is how long ready callbacks kept
+        the loop busy.
+
+        Args:
+            loop: Loop to probe (default: the running loop)
+
+        Returns:
+            Probe task, cancelled by close()
+        """
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        self.metrics_collector.enable_runtime_metrics()
+
+        # Created in an empty context so that the probe is not attributed to
+        # whatever trace is active at the call site
+        probe = contextvars.Context().run(loop.create_task, self._probe_loop(loop))
+        with self._lock:
+            self._probes.append(probe)
+        return probe
+
+    async def _probe_loop(self, loop: asyncio.AbstractEventLoop):
+        interval = self.loop_lag_interval
+        record_event_loop_lag = self.metrics_collector.record_event_loop_lag
+        while True:
+            scheduled = loop.time() + interval
+            await asyncio.sleep(interval)
+            record_event_loop_lag(max(loop.time() - scheduled, 0.0))
+
+    def monitor_executor(self, executor: ThreadPoolExecutor, name: str):
+        """
+        Report a thread pool's queue depth and utilization at scrape time.
+
+        The executor is held by weak reference; its series are removed once
+        it is garbage collected, or when this collector is closed.
+
+        Args:
+            executor: Thread pool to monitor
+            name: Executor name label
+        """
+        metrics = self.metrics_collector
+        metrics.enable_runtime_metrics()
+        labels = {"executor": name}
+        callbacks = [
+            metrics.set_gauge_callback(
+                metrics.executor_queue_depth, _executor_queue_depth, labels, executor
+            ),
+            metrics.set_gauge_callback(
+                metrics.executor_utilization, _executor_utilization, labels, executor
+            ),
+        ]
+        with self._lock:
+            self._executor_callbacks.extend(callbacks)
+
+
+def _describe_callback(handle: asyncio.Handle) -> str:
+    """Name the function a handle runs (the coroutine, for task steps)."""
+    callback = handle._callback
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coroutine = owner.get_coro()
+        name = getattr(coroutine, "__qualname__", None) or repr(coroutine)
+        return f"{owner.get_name()} {name}"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+# ThreadPoolExecutor keeps its queue and worker bookkeeping private; these
+# attributes have been stable since Python 3.8
+
+
+def _executor_queue_depth(executor: ThreadPoolExecutor) -> float:
+    return executor._work_queue.qsize()
+
+
+def _executor_utilization(executor: ThreadPoolExecutor) -> float:
+    idle = executor._idle_semaphore._value
+    busy = max(len(executor._threads) - idle, 0)
+    return busy / executor._max_workers
@@ -0,0 +1,199 @@
+"""
+Head sampling strategies for OpenTelemetry tracing.
+"""
+
+import fnmatch
+import re
+import threading
+import time
+from typing import Dict, Optional, Sequence, Union
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_OFF,
+    ALWAYS_ON,
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import Link, SpanKind, get_current_span
+from opentelemetry.trace.span import TraceState
+from opentelemetry.util.types import Attributes
+
+from .fork import register_after_fork
+
+# Span attributes consulted, in order, when matching sampling rules
+ROUTE_ATTRIBUTES = ("http.route", "http.target")
+
+
+def _drop(parent_context: Optional[Context]) -> SamplingResult:
+    trace_state = get_current_span(parent_context).get_span_context().trace_state
+    return SamplingResult(Decision.DROP, None, trace_state)
+
+
+def ratio_sampler(ratio: float) -> Sampler:
+    """Get a sampler that keeps the given fraction of traces."""
+    if ratio >= 1.0:
+        return ALWAYS_ON
+    if ratio <= 0.0:
+        return ALWAYS_OFF
+    return TraceIdRatioBased(ratio)
+
+
+class RateLimitingSampler(Sampler):
+    """
+    Caps the number of sampled traces per second using a token bucket.
+
+    The delegate sampler decides first; a trace it keeps is only sampled if
+    a token is available.
+    """
+
+    def __init__(self, traces_per_second: float, delegate: Sampler = ALWAYS_ON):
+        """
+        Initialize rate-limiting sampler.
+
+        Args:
+            traces_per_second: Maximum sustained sampled traces per second
+            delegate: Sampler consulted before the rate limit
+        """
+        self.traces_per_second = traces_per_second
+        self.delegate = delegate
+        self._capacity = max(traces_per_second, 1.0)
+        self._tokens = self._capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork_in_child(self):
+        self._lock = threading.Lock()
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state: Optional[TraceState] = None,
+    ) -> SamplingResult:
+        result = self.delegate.should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+        if result.decision is Decision.DROP or self._take_token():
+            return result
+        return _drop(parent_context)
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity,
+                self._tokens + (now - self._last_refill) * self.traces_per_second,
+            )
+            self._last_refill = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def get_description(self) -> str:
+        return (
+            f"RateLimitingSampler{{{self.traces_per_second}/s,"
+            f"{self.delegate.get_description()}}}"
+        )
+
+
+class RuleBasedSampler(Sampler):
+    """
+    Chooses a sampler per route using glob rules.
+
+    Rules are matched in order against the span's http.route or
+    http.target attribute (falling back to the span name); the first match
+    wins and unmatched spans use the default sampler.
+    """
+
+    def __init__(
+        self,
+        rules: Dict[str, Union[float, Sampler]],
+        default: Sampler = ALWAYS_ON,
+    ):
+        """
+        Initialize rule-based sampler.
+
+        Args:
+            rules: Mapping of route glob (e.g. "/health", "/orders/*") to a
+                sampling ratio or a sampler
+            default: Sampler for spans matching no rule
+        """
+        self.default = default
+        self.rules = [
+            (
+                re.compile(fnmatch.translate(pattern)),
+                ratio_sampler(rule) if isinstance(rule, (int, float)) else rule,
+            )
+            for pattern, rule in rules.items()
+        ]
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state: Optional[TraceState] = None,
+    ) -> SamplingResult:
+        route = name
+        if attributes:
+            for key in ROUTE_ATTRIBUTES:
+                value = attributes.get(key)
+                if value:
+                    route = value
+                    break
+
+        sampler = self.default
+        for pattern, rule_sampler in self.rules:
+            if pattern.match(route):
+                sampler = rule_sampler
+                break
+
+        return sampler.should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+
+    def get_description(self) -> str:
+        return (
+            f"RuleBasedSampler{{{len(self.rules)} rules,"
+            f"{self.default.get_description()}}}"
+        )
+
+
+def build_sampler(
+    sample_ratio: float = 1.0,
+    max_traces_per_second: Optional[float] = None,
+    sampling_rules: Optional[Dict[str, Union[float, Sampler]]] = None,
+) -> Sampler:
+    """
+    Build a parent-based sampler from simple settings.
+
+    Root spans are sampled by route rules, then the ratio, then the rate
+    limit; child spans follow their parent's decision.
+
+    Args:
+        sample_ratio: Fraction of root traces to keep (0.0 - 1.0)
+        max_traces_per_second: Optional per-process cap on sampled traces
+        sampling_rules: Optional mapping of route glob to ratio or sampler
+
+    Returns:
+        Sampler for the TracerProvider
+    """
+    root = ratio_sampler(sample_ratio)
+    if sampling_rules:
+        root = RuleBasedSampler(sampling_rules, default=root)
+    if max_traces_per_second is not None:
+        root = RateLimitingSampler(max_traces_per_second, delegate=root)
+    return ParentBased(root=root)
@@ -0,0 +1,137 @@
+"""
+Dedicated HTTP server for Prometheus scrapes.
+"""
+
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Optional, Set
+
+if TYPE_CHECKING:
+    from .metrics import MetricsCollector
+
+METRICS_PATH = "/metrics"
+HEALTH_PATHS = ("/health", "/healthz")
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves /metrics and a health endpoint over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "golden-path-metrics"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == METRICS_PATH:
+            body, headers = self.server.metrics.render_metrics(
+                self.headers.get("Accept"),
+                self.headers.get("Accept-Encoding"),
+            )
+            self._respond(200, body, headers)
+        elif path in HEALTH_PATHS:
+            self._respond(200, b"OK\n", {"Content-Type": "text/plain; charset=utf-8"})
+        else:
+            self._respond(404, b"Not Found\n", {"Content-Type": "text/plain"})
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def _respond(self, status: int, body: bytes, headers: dict):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes are too frequent to log
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, metrics: "MetricsCollector"):
+        self.metrics = metrics
+        # Open client sockets, so that keep-alive connections can be ended
+        # on shutdown instead of being served until the client hangs up
+        self._connections: Set[socket.socket] = set()
+        self._connections_lock = threading.Lock()
+        super().__init__(address, _MetricsRequestHandler)
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            self._connections.add(request)
+        super().process_request(request, client_address)
+
+    def shutdown_request(self, request):
+        with self._connections_lock:
+            self._connections.discard(request)
+        super().shutdown_request(request)
+
+    def handle_error(self, request, client_address):
+        # Scrapers hanging up, or connections ended by shutdown, are routine
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def close_connections(self):
+        """Shut down every open client connection."""
+        with self._connections_lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                # The handler's next read sees end-of-stream and returns
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class MetricsServer:
+    """
+    Minimal HTTP server exposing a MetricsCollector on a background thread.
+
+    Scrapes are served by their own threads, independent of the
+    application's worker pool or event loop.
+    """
+
+    def __init__(
+        self,
+        metrics: "MetricsCollector",
+        port: int = 9464,
+        addr: str = "0.0.0.0",
+    ):
+        """
+        Initialize and start the metrics server.
+
+        Args:
+            metrics: Metrics collector to expose
+            port: Port to listen on (0 picks a free port)
+            addr: Address to bind
+        """
+        self._server = _Server((addr, port), metrics)
+        self.addr, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            target=self._server.serve_forever,
+            name="golden-path-metrics-server",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def shutdown(self, timeout: Optional[float] = 5.0):
+        """
+        Stop accepting scrapes, end open keep-alive connections and close
+        the listening socket.
+
+        Args:
+            timeout: Maximum seconds to wait for the server thread
+        """
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.close_connections()
+        self._server.server_close()
+        self._thread.join(timeout)
+        self._thread = None
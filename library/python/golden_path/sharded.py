@@ -0,0 +1,271 @@
+"""
+Per-thread sharded counters and histograms for multi-threaded servers.
+
+prometheus_client guards every child value with a lock, so threads
+recording the same series contend on each increment. Sharded metrics give
+each thread its own cell per series, which only that thread writes, and
+sum the cells when the registry is scraped. Recording takes no lock; the
+cost moves to scrapes, which are rare.
+"""
+
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from prometheus_client import REGISTRY
+from prometheus_client.core import (
+    CollectorRegistry,
+    CounterMetricFamily,
+    HistogramMetricFamily,
+)
+from prometheus_client.utils import floatToGoString
+
+from .fork import register_after_fork
+
+INF = float("inf")
+
+
+class _ShardedChild:
+    """
+    Value of one label set, split into one cell per recording thread.
+
+    A cell is a list of floats owned by a single thread. Cells of threads
+    that have exited are folded into a retired cell at scrape time, so
+    thread churn does not grow the shard list.
+    """
+
+    __slots__ = ("_size", "_local", "_shards", "_retired", "_lock", "__weakref__")
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[Tuple[weakref.ref, List[float]]] = []
+        self._retired = [0.0] * size
+        self._lock = threading.Lock()
+
+    def _cell(self) -> List[float]:
+        """Get the calling thread's cell, creating it on first use."""
+        try:
+            return self._local.cell
+        except AttributeError:
+            pass
+
+        cell = [0.0] * self._size
+        self._local.cell = cell
+        with self._lock:
+            self._shards.append((weakref.ref(threading.current_thread()), cell))
+        return cell
+
+    def _merged(self) -> List[float]:
+        """Sum every thread's cell."""
+        with self._lock:
+            live = []
+            for shard in self._shards:
+                thread = shard[0]()
+                if thread is None or not thread.is_alive():
+                    # Dead threads no longer write, so their cells are final
+                    self._retired = [a + b for a, b in zip(self._retired, shard[1])]
+                else:
+                    live.append(shard)
+            self._shards = live
+            totals = list(self._retired)
+
+        for _, cell in live:
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+    def _after_fork_in_child(self):
+        self._lock = threading.Lock()
+
+
+class ShardedCounterChild(_ShardedChild):
+    """Counter value of one label set."""
+
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1):
+        """Increment by the given amount (must not be negative)."""
+        if amount < 0:
+            raise ValueError(
+                "Counters can only be incremented by non-negative amounts."
+            )
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        cell[0] += amount
+
+    def get(self) -> float:
+        """Get the current value summed across threads."""
+        return self._merged()[0]
+
+
+class ShardedHistogramChild(_ShardedChild):
+    """
+    Histogram value of one label set.
+
+    A cell holds the sum of observed values followed by the (non-cumulative)
+    count of each bucket.
+    """
+
+    __slots__ = ("_upper_bounds",)
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        super().__init__(len(upper_bounds) + 1)
+        self._upper_bounds = upper_bounds
+
+    def observe(self, amount: float):
+        """Observe a value."""
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        cell[0] += amount
+        cell[bisect_left(self._upper_bounds, amount) + 1] += 1
+
+
+class _ShardedMetric:
+    """Labelled collection of sharded children, registered as a collector."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: Optional[CollectorRegistry] = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._children: Dict[Tuple[str, ...], _ShardedChild] = {}
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+        if registry is not None:
+            registry.register(self)
+
+    def _after_fork_in_child(self):
+        self._lock = threading.Lock()
+        for child in self._children.values():
+            child._after_fork_in_child()
+
+    def _new_child(self) -> _ShardedChild:
+        raise NotImplementedError
+
+    def labels(self, *labelvalues, **labelkwargs):
+        """Get the child for a set of label values."""
+        if labelkwargs:
+            labelvalues = tuple(str(labelkwargs[name]) for name in self.labelnames)
+        else:
+            labelvalues = tuple(str(value) for value in labelvalues)
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"Incorrect label count for {self.name}")
+
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.get(labelvalues)
+                if child is None:
+                    child = self._new_child()
+                    self._children[labelvalues] = child
+        return child
+
+    def _snapshot(self) -> List[Tuple[Tuple[str, ...], List[float]]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [(labelvalues, child._merged()) for labelvalues, child in children]
+
+
+class ShardedCounter(_ShardedMetric):
+    """
+    Counter with per-thread shards.
+
+    Drop-in replacement for prometheus_client's Counter for the calls this
+    library makes: labels() returns a child with inc().
+    """
+
+    def _new_child(self) -> ShardedCounterChild:
+        return ShardedCounterChild()
+
+    def inc(self, amount: float = 1):
+        """Increment a metric without labels."""
+        self.labels().inc(amount)
+
+    def describe(self):
+        return [
+            CounterMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        ]
+
+    def collect(self):
+        counter = CounterMetricFamily(
+            self.name, self.documentation, labels=self.labelnames
+        )
+        for labelvalues, totals in self._snapshot():
+            counter.add_metric(list(labelvalues), totals[0])
+        return [counter]
+
+
+class ShardedHistogram(_ShardedMetric):
+    """
+    Histogram with per-thread shards.
+
+    Drop-in replacement for prometheus_client's Histogram for the calls this
+    library makes: labels() returns a child with observe().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: Optional[CollectorRegistry] = REGISTRY,
+        buckets: Sequence[float] = (
+            0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+        ),
+    ):
+        """
+        Initialize sharded histogram.
+
+        Args:
+            name: Metric name
+            documentation: Metric help text
+            labelnames: Label names
+            registry: Registry to register with (None to skip registration)
+            buckets: Bucket upper bounds (+Inf is added if missing)
+        """
+        upper_bounds = sorted(float(b) for b in buckets)
+        if not upper_bounds or upper_bounds[-1] != INF:
+            upper_bounds.append(INF)
+        self.upper_bounds = tuple(upper_bounds)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> ShardedHistogramChild:
+        return ShardedHistogramChild(self.upper_bounds)
+
+    def observe(self, amount: float):
+        """Observe a value on a metric without labels."""
+        self.labels().observe(amount)
+
+    def describe(self):
+        return [
+            HistogramMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        ]
+
+    def collect(self):
+        histogram = HistogramMetricFamily(
+            self.name, self.documentation, labels=self.labelnames
+        )
+        for labelvalues, totals in self._snapshot():
+            buckets = []
+            cumulative = 0.0
+            for bound, count in zip(self.upper_bounds, totals[1:]):
+                cumulative += count
+                buckets.append((floatToGoString(bound), cumulative))
+            histogram.add_metric(list(labelvalues), buckets, totals[0])
+        return [histogram]
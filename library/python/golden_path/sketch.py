@@ -0,0 +1,308 @@
+"""
+High-resolution latency histograms backed by DDSketch-style sketches.
+
+A sketch maps each positive value to a logarithmic bin so that every
+quantile it reports is within a fixed relative error of the true value,
+using memory bounded by a maximum number of bins. Sketches are mergeable
+and are exported as classic Prometheus histogram buckets (computed at
+scrape time) plus quantile gauges, so no native-histogram support is
+needed on the scraper.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from prometheus_client import REGISTRY
+from prometheus_client.core import (
+    CollectorRegistry,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+)
+from prometheus_client.utils import floatToGoString
+
+from .fork import register_after_fork
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class DDSketch:
+    """
+    Mergeable quantile sketch with a relative-error guarantee.
+
+    Values in (gamma^(k-1), gamma^k] are counted in bin k, with
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy). Once more
+    than max_bins bins are in use, the lowest bins are collapsed together,
+    which only affects the accuracy of the smallest values.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        max_bins: int = 2048,
+        min_value: float = 1e-9,
+    ):
+        """
+        Initialize sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of reported quantiles
+            max_bins: Maximum number of bins kept (bounds memory)
+            min_value: Values at or below this are counted as zero
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Add a value (e.g. a duration in seconds) to the sketch."""
+        if value > self.min_value:
+            index = math.ceil(math.log(value) / self._log_gamma)
+        else:
+            index = None
+
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            if index is None:
+                self.zero_count += 1
+                return
+            bins = self.bins
+            bins[index] = bins.get(index, 0) + 1
+            if len(bins) > self.max_bins:
+                self._collapse()
+
+    def _after_fork_in_child(self):
+        self._lock = threading.Lock()
+
+    def _collapse(self):
+        indexes = sorted(self.bins)
+        excess = len(indexes) - self.max_bins
+        target = indexes[excess]
+        for index in indexes[:excess]:
+            self.bins[target] += self.bins.pop(index)
+
+    def merge(self, other: "DDSketch"):
+        """Add the values of another sketch with the same accuracy."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+
+        count, total, zero_count, bins = other.snapshot()
+        with self._lock:
+            self.count += count
+            self.sum += total
+            self.zero_count += zero_count
+            for index, bin_count in bins:
+                self.bins[index] = self.bins.get(index, 0) + bin_count
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+
+    def snapshot(self) -> Tuple[int, float, int, List[Tuple[int, int]]]:
+        """Get (count, sum, zero count, sorted (bin index, count) pairs)."""
+        with self._lock:
+            return self.count, self.sum, self.zero_count, sorted(self.bins.items())
+
+    def value_of(self, index: int) -> float:
+        """Representative value of a bin, within relative_accuracy of its values."""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value, or None if the sketch is empty
+        """
+        return self.quantiles((q,))[0]
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """Estimate several quantiles from one snapshot."""
+        count, _, zero_count, bins = self.snapshot()
+        return _quantiles(self, count, zero_count, bins, qs)
+
+    def cumulative_counts(self, bounds: Sequence[float]) -> List[int]:
+        """Count values at or below each of the sorted upper bounds."""
+        _, _, zero_count, bins = self.snapshot()
+        return _cumulative_counts(self, zero_count, bins, bounds)
+
+    def __len__(self) -> int:
+        return len(self.bins)
+
+
+def _quantiles(
+    sketch: DDSketch,
+    count: int,
+    zero_count: int,
+    bins: List[Tuple[int, int]],
+    qs: Sequence[float],
+) -> List[Optional[float]]:
+    if not count:
+        return [None] * len(qs)
+
+    results = []
+    for q in qs:
+        rank = q * (count - 1)
+        seen = zero_count
+        value = 0.0
+        if rank >= seen:
+            for index, bin_count in bins:
+                seen += bin_count
+                if seen > rank:
+                    value = sketch.value_of(index)
+                    break
+        results.append(value)
+    return results
+
+
+def _cumulative_counts(
+    sketch: DDSketch,
+    zero_count: int,
+    bins: List[Tuple[int, int]],
+    bounds: Sequence[float],
+) -> List[int]:
+    counts = []
+    cumulative = zero_count
+    position = 0
+    for bound in bounds:
+        while position < len(bins) and sketch.value_of(bins[position][0]) <= bound:
+            cumulative += bins[position][1]
+            position += 1
+        counts.append(cumulative)
+    return counts
+
+
+class SketchHistogram:
+    """
+    Histogram metric keeping a DDSketch per label set.
+
+    Drop-in replacement for prometheus_client's Histogram for observing
+    durations: labels() returns a child with observe(). Scrapes export
+    classic histogram buckets computed from each sketch, plus a
+    <name>_quantile gauge with the configured quantiles.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: Optional[CollectorRegistry] = REGISTRY,
+        buckets: Sequence[float] = (
+            0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+        ),
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        relative_accuracy: float = 0.01,
+        max_bins: int = 2048,
+    ):
+        """
+        Initialize sketch histogram.
+
+        Args:
+            name: Metric name
+            documentation: Metric help text
+            labelnames: Label names
+            registry: Registry to register with (None to skip registration)
+            buckets: Upper bounds of the exported classic buckets
+            quantiles: Quantiles exported as <name>_quantile gauges
+            relative_accuracy: Maximum relative error of each sketch
+            max_bins: Maximum bins per sketch (bounds memory per series)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != float("inf")))
+        self.quantiles = tuple(quantiles)
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+
+        self._children: Dict[Tuple[str, ...], DDSketch] = {}
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+        if registry is not None:
+            registry.register(self)
+
+    def _after_fork_in_child(self):
+        self._lock = threading.Lock()
+        for child in self._children.values():
+            child._after_fork_in_child()
+
+    def labels(self, *labelvalues, **labelkwargs) -> DDSketch:
+        """Get the sketch for a set of label values."""
+        if labelkwargs:
+            labelvalues = tuple(str(labelkwargs[name]) for name in self.labelnames)
+        else:
+            labelvalues = tuple(str(value) for value in labelvalues)
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"Incorrect label count for {self.name}")
+
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.get(labelvalues)
+                if child is None:
+                    child = DDSketch(self.relative_accuracy, self.max_bins)
+                    self._children[labelvalues] = child
+        return child
+
+    def observe(self, value: float):
+        """Observe a value on a metric without labels."""
+        self.labels().observe(value)
+
+    def describe(self):
+        return [
+            HistogramMetricFamily(
+                self.name, self.documentation, labels=self.labelnames
+            ),
+            GaugeMetricFamily(
+                f"{self.name}_quantile",
+                f"{self.documentation} (quantile estimate)",
+                labels=self.labelnames + ("quantile",),
+            ),
+        ]
+
+    def collect(self):
+        histogram = HistogramMetricFamily(
+            self.name, self.documentation, labels=self.labelnames
+        )
+        quantile_gauge = GaugeMetricFamily(
+            f"{self.name}_quantile",
+            f"{self.documentation} (quantile estimate)",
+            labels=self.labelnames + ("quantile",),
+        )
+
+        with self._lock:
+            children = list(self._children.items())
+
+        for labelvalues, sketch in children:
+            count, total, zero_count, bins = sketch.snapshot()
+            cumulative = _cumulative_counts(sketch, zero_count, bins, self.buckets)
+            buckets = [
+                (floatToGoString(bound), value)
+                for bound, value in zip(self.buckets, cumulative)
+            ]
+            buckets.append(("+Inf", count))
+            histogram.add_metric(list(labelvalues), buckets, total)
+
+            estimates = _quantiles(sketch, count, zero_count, bins, self.quantiles)
+            for q, estimate in zip(self.quantiles, estimates):
+                if estimate is not None:
+                    quantile_gauge.add_metric(
+                        list(labelvalues) + [floatToGoString(q)], estimate
+                    )
+
+        return [histogram, quantile_gauge]
@@ -0,0 +1,181 @@
+"""
+Tail-based sampling of traces before export.
+"""
+
+import fnmatch
+import re
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.trace import StatusCode
+
+from .fork import register_after_fork
+from .sampling import ROUTE_ATTRIBUTES
+
+if TYPE_CHECKING:
+    from .metrics import MetricsCollector
+
+_TRACE_ID_MASK = (1 << 64) - 1
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Buffers each trace's spans until its local root ends, then keeps or drops
+    the whole trace.
+
+    A trace is kept if any of its spans has an error status, if the root
+    span took longer than the latency threshold for its route, or if it
+    falls within the baseline ratio. Kept spans are forwarded to the next
+    processor (typically a BatchSpanProcessor).
+    """
+
+    def __init__(
+        self,
+        next_processor: SpanProcessor,
+        baseline_ratio: float = 0.1,
+        latency_threshold: float = 1.0,
+        latency_thresholds: Optional[Dict[str, float]] = None,
+        max_traces: int = 10000,
+        max_spans_per_trace: int = 1000,
+        metrics_collector: Optional["MetricsCollector"] = None,
+    ):
+        """
+        Initialize tail-sampling span processor.
+
+        Args:
+            next_processor: Processor that receives the spans of kept traces
+            baseline_ratio: Fraction of ordinary traces to keep (0.0 - 1.0)
+            latency_threshold: Root span duration in seconds above which a trace
+                is always kept
+            latency_thresholds: Per-route overrides, mapping route glob to seconds
+            max_traces: Maximum number of traces buffered; the oldest is evicted
+            max_spans_per_trace: Child spans beyond this per trace are dropped;
+                the local root span is always kept
+            metrics_collector: Optional metrics collector for buffer statistics
+        """
+        self.next_processor = next_processor
+        self.baseline_ratio = baseline_ratio
+        self.latency_threshold = latency_threshold
+        self.latency_thresholds = [
+            (re.compile(fnmatch.translate(pattern)), seconds)
+            for pattern, seconds in (latency_thresholds or {}).items()
+        ]
+        self.max_traces = max_traces
+        self.max_spans_per_trace = max_spans_per_trace
+        self.metrics_collector = metrics_collector
+        if metrics_collector is not None:
+            metrics_collector.enable_tail_sampling_metrics()
+
+        ratio = max(0.0, min(baseline_ratio, 1.0))
+        self._ratio_bound = int(ratio * (_TRACE_ID_MASK + 1))
+        self._traces: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        self._buffered = 0
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork_in_child(self):
+        # Buffered traces belong to the parent, which exports them
+        self._traces = OrderedDict()
+        self._buffered = 0
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None):
+        self.next_processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan):
+        if not span.context.trace_flags.sampled:
+            return
+
+        trace_id = span.context.trace_id
+        parent = span.parent
+        is_local_root = parent is None or parent.is_remote
+
+        dropped = 0
+        evicted = 0
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            if spans is None:
+                spans = []
+                if not is_local_root:
+                    self._traces[trace_id] = spans
+                    while len(self._traces) > self.max_traces:
+                        _, old = self._traces.popitem(last=False)
+                        evicted += len(old)
+                        self._buffered -= len(old)
+
+            if is_local_root:
+                self._traces.pop(trace_id, None)
+                self._buffered -= len(spans)
+            elif len(spans) < self.max_spans_per_trace:
+                spans.append(span)
+                self._buffered += 1
+            else:
+                dropped += 1
+            buffered = self._buffered
+
+        if is_local_root:
+            # The root is never subject to the per-trace cap: it carries the
+            # decision and, if kept, is exported with the children buffered
+            spans.append(span)
+
+            if self._should_keep(span, spans):
+                for buffered_span in spans:
+                    self.next_processor.on_end(buffered_span)
+                self._record("kept", len(spans))
+            else:
+                self._record("dropped", len(spans))
+
+        if dropped:
+            self._record("dropped", dropped)
+        if evicted:
+            self._record("evicted", evicted)
+        if self.metrics_collector is not None:
+            self.metrics_collector.tail_sampling_buffered_spans.set(buffered)
+
+    def _should_keep(self, root: ReadableSpan, spans: List[ReadableSpan]) -> bool:
+        if root.status.status_code is StatusCode.ERROR:
+            return True
+
+        if root.end_time is not None and root.start_time is not None:
+            duration = (root.end_time - root.start_time) / 1e9
+            if duration > self._threshold_for(root):
+                return True
+
+        for span in spans:
+            if span.status.status_code is StatusCode.ERROR:
+                return True
+
+        return (root.context.trace_id & _TRACE_ID_MASK) < self._ratio_bound
+
+    def _threshold_for(self, root: ReadableSpan) -> float:
+        if not self.latency_thresholds:
+            return self.latency_threshold
+
+        route = root.name
+        attributes = root.attributes or {}
+        for key in ROUTE_ATTRIBUTES:
+            value = attributes.get(key)
+            if value:
+                route = value
+                break
+
+        for pattern, seconds in self.latency_thresholds:
+            if pattern.match(route):
+                return seconds
+        return self.latency_threshold
+
+    def _record(self, decision: str, count: int):
+        if self.metrics_collector is not None and count:
+            self.metrics_collector.record_tail_sampling(decision, count)
+
+    def shutdown(self):
+        with self._lock:
+            self._traces.clear()
+            self._buffered = 0
+        self.next_processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.next_processor.force_flush(timeout_millis)
@@ -2,16 +2,19 @@
 Distributed tracing using OpenTelemetry.
 """
 
-from typing import Optional, Dict, Any
-from contextlib import contextmanager
-from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.resources import Resource
+import inspect
+import threading
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, Optional, Dict, Any, Union
+from opentelemetry import context, trace
 from opentelemetry.trace import Span, Tracer
-from opentelemetry.instrumentation.requests import RequestsInstrumentor
-from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+# The SDK, OTLP exporter and instrumentors are imported when a collector is
+# created, so importing this module stays cheap for processes that only log
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace.export import SpanExporter
+    from opentelemetry.sdk.trace.sampling import Sampler
+    from .metrics import MetricsCollector
 
 
 class TracingCollector:
@@ -25,6 +28,23 @@ class TracingCollector:
         environment: str = "production",
         version: str = "unknown",
         tempo_endpoint: Optional[str] = None,
+        transport: str = "grpc",
+        exporter: Optional["SpanExporter"] = None,
+        export_file: Optional[str] = None,
+        sample_ratio: float = 1.0,
+        max_traces_per_second: Optional[float] = None,
+        sampling_rules: Optional[Dict[str, Union[float, "Sampler"]]] = None,
+        sampler: Optional["Sampler"] = None,
+        tail_sampling: bool = False,
+        tail_sampling_ratio: float = 0.1,
+        latency_threshold: float = 1.0,
+        latency_thresholds: Optional[Dict[str, float]] = None,
+        metrics_collector: Optional["MetricsCollector"] = None,
+        max_queue_size: Optional[int] = None,
+        max_export_batch_size: Optional[int] = None,
+        schedule_delay_millis: Optional[float] = None,
+        export_timeout_millis: Optional[float] = None,
+        compression: Optional[str] = None,
     ):
         """
         Initialize tracing collector.
@@ -33,12 +53,57 @@ class TracingCollector:
             service_name: Name of the service
             environment: Environment (production, staging, development)
             version: Service version
-            tempo_endpoint: Tempo OTLP endpoint (default: http://localhost:4317)
+            tempo_endpoint: Tempo OTLP endpoint (default: http://localhost:4317
+                for grpc, http://localhost:4318/v1/traces for http/protobuf)
+            transport: Span export transport (grpc, http/protobuf, file, memory,
+                none)
+            exporter: Custom span exporter (overrides transport)
+            export_file: Output path for the file transport (default: stdout)
+            sample_ratio: Fraction of root traces to sample (0.0 - 1.0)
+            max_traces_per_second: Optional per-process cap on sampled traces
+            sampling_rules: Optional mapping of route glob to sampling ratio or
+                sampler, e.g. {"/health": 0.0, "/checkout/*": 1.0}
+            sampler: Custom sampler (overrides the sampling settings above)
+            tail_sampling: Buffer each trace and export it only if it has an
+                error, is slow, or falls within tail_sampling_ratio
+            tail_sampling_ratio: Fraction of ordinary traces kept by tail sampling
+            latency_threshold: Root span duration in seconds above which tail
+                sampling always keeps a trace
+            latency_thresholds: Per-route latency thresholds (route glob to seconds)
+            metrics_collector: Optional metrics collector for pipeline statistics
+                (export queue depth, latency, batch sizes, drops and errors)
+            max_queue_size: Maximum spans queued for export before dropping
+                (default: OTEL_BSP_MAX_QUEUE_SIZE or 2048)
+            max_export_batch_size: Maximum spans per export request
+                (default: OTEL_BSP_MAX_EXPORT_BATCH_SIZE or 512)
+            schedule_delay_millis: Delay between exports in milliseconds
+                (default: OTEL_BSP_SCHEDULE_DELAY or 5000)
+            export_timeout_millis: Export timeout in milliseconds
+                (default: OTEL_BSP_EXPORT_TIMEOUT or 30000)
+            compression: Exporter compression ("gzip", "none" or None for
+                OTEL_EXPORTER_OTLP_COMPRESSION; gzip for http/protobuf when
+                that is unset)
         """
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.id_generator import RandomIdGenerator
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.instrumentation.requests import RequestsInstrumentor
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+        from .export import (
+            DEFAULT_ENDPOINTS,
+            InstrumentedBatchSpanProcessor,
+            create_span_exporter,
+        )
+        from .sampling import build_sampler
+        from .tail_sampling import TailSamplingSpanProcessor
+
         self.service_name = service_name
         self.environment = environment
         self.version = version
-        self.tempo_endpoint = tempo_endpoint or "http://localhost:4317"
+        self.transport = transport
+        self.tempo_endpoint = tempo_endpoint or DEFAULT_ENDPOINTS.get(transport)
 
         # Create resource with service information
         resource = Resource.create(
@@ -49,18 +114,53 @@ class TracingCollector:
             }
         )
 
-        # Set up tracer provider
-        provider = TracerProvider(resource=resource)
+        # Set up tracer provider; child spans follow their parent's decision.
+        # Root spans are sampled by span() itself, which hands the decision
+        # (and the trace id it was taken for) to the SDK through _DecidedRoot
+        self._decided_root = _DecidedRoot(RandomIdGenerator())
+        self.sampler = sampler or build_sampler(
+            sample_ratio, max_traces_per_second, sampling_rules
+        )
+        provider = TracerProvider(
+            resource=resource,
+            sampler=self._decided_root,
+            id_generator=self._decided_root,
+        )
         trace.set_tracer_provider(provider)
 
-        # Add OTLP exporter
-        otlp_exporter = OTLPSpanExporter(
+        # Add span exporter
+        self.exporter = exporter or create_span_exporter(
+            transport,
             endpoint=self.tempo_endpoint,
-            insecure=True,  # Set to False for production with TLS
+            compression=compression,
+            export_file=export_file,
         )
-        provider.add_span_processor(BatchSpanProcessor(otlp_exporter))
+        batch_options = {
+            "max_queue_size": max_queue_size,
+            "max_export_batch_size": max_export_batch_size,
+            "schedule_delay_millis": schedule_delay_millis,
+            "export_timeout_millis": export_timeout_millis,
+        }
+        if metrics_collector is not None:
+            span_processor = InstrumentedBatchSpanProcessor(
+                self.exporter, metrics_collector, **batch_options
+            )
+        else:
+            span_processor = BatchSpanProcessor(self.exporter, **batch_options)
+        if tail_sampling:
+            span_processor = TailSamplingSpanProcessor(
+                span_processor,
+                baseline_ratio=tail_sampling_ratio,
+                latency_threshold=latency_threshold,
+                latency_thresholds=latency_thresholds,
+                metrics_collector=metrics_collector,
+            )
+        provider.add_span_processor(span_processor)
 
-        self.tracer: Tracer = trace.get_tracer(__name__)
+        # The global provider can only be set once per process; a collector
+        # created later still traces through its own provider and exporter
+        self.tracer_provider = provider
+        self.tracer: Tracer = provider.get_tracer(__name__)
 
         # Auto-instrument HTTP libraries
         RequestsInstrumentor().instrument()
@@ -69,11 +169,23 @@ class TracingCollector:
         except Exception:
             pass  # httpx may not be installed
 
+    @property
+    def sampler(self) -> "Sampler":
+        """Head sampler deciding which root spans are sampled."""
+        return self._decided_root.sampler
+
+    @sampler.setter
+    def sampler(self, sampler: "Sampler"):
+        self._decided_root.sampler = sampler
+        self._root_sampler = _root_sampler(sampler)
+        # With the default parent-based sampling, a child of an unsampled span
+        # is never sampled, so span() can skip creating it altogether
+        self._skip_unsampled_children = _drops_unsampled_children(sampler)
+
     def get_tracer(self) -> Tracer:
         """Get the OpenTelemetry tracer."""
         return self.tracer
 
-    @contextmanager
     def span(
         self,
         name: str,
@@ -83,30 +195,250 @@ class TracingCollector:
         """
         Create a span context manager.
 
+        The span is made current while the block runs, so nested spans are
+        parented to it and logs are correlated with it. An unsampled root
+        is a bare non-recording span carrying the trace id, so the spans
+        nested in it are not sampled either; inside such a trace, no span is
+        created and the block runs under the current (non-recording) span.
+
         Args:
             name: Span name
-            attributes: Optional span attributes
+            attributes: Optional span attributes, visible to samplers
             kind: Optional span kind (SERVER, CLIENT, etc.)
 
-        Yields:
-            Span object
+        Returns:
+            Context manager yielding the span
+        """
+        span_context = trace.get_current_span().get_span_context()
+        if not span_context.is_valid:
+            return _SpanScope(self._start_root_span, name, attributes, kind)
+        if self._skip_unsampled_children and not span_context.trace_flags.sampled:
+            return _NON_RECORDING_SCOPE
+
+        return _SpanScope(self.tracer.start_span, name, attributes, kind)
+
+    def detached_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: Optional[trace.SpanKind] = None,
+    ) -> "DetachedSpan":
+        """
+        Start a span without making it current.
+
+        The span is parented to the current span and is only made current
+        for the calls run through DetachedSpan.call(); end() ends it. Inside
+        a trace that is not sampled, no span is created.
+
+        Args:
+            name: Span name
+            attributes: Optional span attributes, visible to samplers
+            kind: Optional span kind (SERVER, CLIENT, etc.)
+
+        Returns:
+            Detached span
+        """
+        span_context = trace.get_current_span().get_span_context()
+        if not span_context.is_valid:
+            start_span = self._start_root_span
+        elif self._skip_unsampled_children and not span_context.trace_flags.sampled:
+            return DetachedSpan(None)
+        else:
+            start_span = self.tracer.start_span
+
+        return DetachedSpan(
+            start_span(
+                name, kind=kind or trace.SpanKind.INTERNAL, attributes=attributes
+            )
+        )
+
+    def _start_root_span(
+        self,
+        name: str,
+        kind: trace.SpanKind = trace.SpanKind.INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Span:
+        """
+        Start a span with no parent, sampling it before anything is built.
+
+        A dropped root becomes a bare NonRecordingSpan instead of going
+        through the SDK; a recorded one is started by the SDK with the trace
+        id and decision already taken, so the sampler runs once per root.
         """
-        span = self.tracer.start_span(
-            name,
-            kind=kind or trace.SpanKind.INTERNAL,
+        decided = self._decided_root
+        trace_id = decided.generate_trace_id()
+        result = self._root_sampler.should_sample(
+            None, trace_id, name, kind, attributes
         )
-        if attributes:
-            for key, value in attributes.items():
-                span.set_attribute(key, value)
+        if not result.decision.is_recording():
+            return trace.NonRecordingSpan(
+                trace.SpanContext(
+                    trace_id,
+                    decided.generate_span_id(),
+                    is_remote=False,
+                    trace_flags=decided.unsampled_flags,
+                    trace_state=result.trace_state,
+                )
+            )
 
+        decided.decision.trace_id = trace_id
+        decided.decision.result = result
         try:
-            yield span
-        except Exception as e:
-            span.record_exception(e)
-            span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
-            raise
+            return self.tracer.start_span(name, kind=kind, attributes=attributes)
         finally:
-            span.end()
+            decided.decision.trace_id = None
+            decided.decision.result = None
+
+    def wrap_generator_function(
+        self,
+        func: Callable,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: Optional[trace.SpanKind] = None,
+        on_start: Optional[Callable[[], Any]] = None,
+        on_finish: Optional[Callable[[Any, Optional[Exception]], None]] = None,
+    ) -> Callable:
+        """
+        Trace a generator or async generator function.
+
+        The span starts on the first iteration and ends when the generator
+        finishes, fails or is closed. It is current only while the generator
+        runs a step, never while it is suspended at a yield, so it does not
+        leak into the consumer's context.
+
+        Args:
+            func: Generator or async generator function
+            name: Span name
+            attributes: Optional span attributes
+            kind: Optional span kind
+            on_start: Optional hook run in the span on the first iteration;
+                its return value is passed to on_finish
+            on_finish: Optional hook run in the span with on_start's value
+                and the exception (None on success or early close)
+
+        Returns:
+            Wrapped generator function
+        """
+        if inspect.isasyncgenfunction(func):
+
+            @wraps(func)
+            async def async_generator_wrapper(*args, **kwargs):
+                scope = self.detached_span(name, attributes, kind)
+                state = scope.call(on_start) if on_start is not None else None
+                generator = func(*args, **kwargs)
+                completed = False
+                error = None
+                try:
+                    try:
+                        item = await scope.call_async(generator.__anext__)
+                        while True:
+                            try:
+                                sent = yield item
+                            except GeneratorExit:
+                                # Closed early by the consumer
+                                await scope.call_async(generator.aclose)
+                                raise
+                            except BaseException as e:
+                                item = await scope.call_async(generator.athrow, e)
+                            else:
+                                item = await scope.call_async(generator.asend, sent)
+                    except StopAsyncIteration:
+                        completed = True
+                except GeneratorExit:
+                    completed = True
+                    raise
+                except Exception as e:
+                    error = e
+                    raise
+                finally:
+                    if on_finish is not None and (completed or error is not None):
+                        scope.call(on_finish, state, error)
+                    scope.end(error)
+
+            return async_generator_wrapper
+
+        @wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            scope = self.detached_span(name, attributes, kind)
+            state = scope.call(on_start) if on_start is not None else None
+            generator = func(*args, **kwargs)
+            completed = False
+            error = None
+            try:
+                try:
+                    item = scope.call(next, generator)
+                    while True:
+                        try:
+                            sent = yield item
+                        except GeneratorExit:
+                            # Closed early by the consumer
+                            scope.call(generator.close)
+                            raise
+                        except BaseException as e:
+                            item = scope.call(generator.throw, e)
+                        else:
+                            item = scope.call(generator.send, sent)
+                except StopIteration as stop:
+                    completed = True
+                    return stop.value
+            except GeneratorExit:
+                completed = True
+                raise
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                if on_finish is not None and (completed or error is not None):
+                    scope.call(on_finish, state, error)
+                scope.end(error)
+
+        return generator_wrapper
+
+    def traced(
+        self,
+        name: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: Optional[trace.SpanKind] = None,
+    ) -> Callable[[Callable], Callable]:
+        """
+        Decorator running a function inside span().
+
+        Coroutine functions are traced until the coroutine finishes;
+        generator and async generator functions are traced with
+        wrap_generator_function().
+
+        Args:
+            name: Span name (default: the function's qualified name)
+            attributes: Optional span attributes
+            kind: Optional span kind
+
+        Returns:
+            Decorator
+        """
+
+        def decorate(func: Callable) -> Callable:
+            span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+            if inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func):
+                return self.wrap_generator_function(func, span_name, attributes, kind)
+
+            if inspect.iscoroutinefunction(func):
+
+                @wraps(func)
+                async def coroutine_wrapper(*args, **kwargs):
+                    with self.span(span_name, attributes, kind):
+                        return await func(*args, **kwargs)
+
+                return coroutine_wrapper
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, attributes, kind):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
 
     def add_event(self, span: Span, name: str, attributes: Optional[Dict[str, Any]] = None):
         """Add an event to a span."""
@@ -121,16 +453,196 @@ class TracingCollector:
         return trace.get_current_span()
 
     def get_trace_id(self) -> Optional[str]:
-        """Get the current trace ID as a hex string."""
-        span = self.get_current_span()
-        if span:
-            return format(span.get_span_context().trace_id, "032x")
+        """Get the current trace ID as a hex string (None outside a span)."""
+        span_context = trace.get_current_span().get_span_context()
+        if span_context.is_valid:
+            return format(span_context.trace_id, "032x")
         return None
 
     def get_span_id(self) -> Optional[str]:
-        """Get the current span ID as a hex string."""
-        span = self.get_current_span()
-        if span:
-            return format(span.get_span_context().span_id, "016x")
+        """Get the current span ID as a hex string (None outside a span)."""
+        span_context = trace.get_current_span().get_span_context()
+        if span_context.is_valid:
+            return format(span_context.span_id, "016x")
         return None
 
+
+class _SpanScope:
+    """Starts a span on enter and makes it current until exit."""
+
+    __slots__ = ("_start_span", "_name", "_attributes", "_kind", "_span", "_token")
+
+    def __init__(
+        self,
+        start_span: Callable[..., Span],
+        name: str,
+        attributes: Optional[Dict[str, Any]],
+        kind: Optional[trace.SpanKind],
+    ):
+        self._start_span = start_span
+        self._name = name
+        self._attributes = attributes
+        self._kind = kind
+
+    def __enter__(self) -> Span:
+        # Attributes are passed at creation so samplers can see them
+        span = self._start_span(
+            self._name,
+            kind=self._kind or trace.SpanKind.INTERNAL,
+            attributes=self._attributes,
+        )
+        self._span = span
+        self._token = context.attach(trace.set_span_in_context(span))
+        return span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        span = self._span
+        try:
+            if isinstance(exc, Exception) and span.is_recording():
+                span.record_exception(exc)
+                span.set_status(trace.Status(trace.StatusCode.ERROR, str(exc)))
+        finally:
+            context.detach(self._token)
+            span.end()
+        return False
+
+
+class DetachedSpan:
+    """
+    Span that is made current only around the calls run through it.
+
+    Used for generators, whose frames are suspended with the consumer's
+    context current: attaching the span for the generator's whole lifetime
+    would parent the consumer's spans to it and could leave it current after
+    it has ended.
+    """
+
+    __slots__ = ("span", "_context")
+
+    def __init__(self, span: Optional[Span]):
+        """
+        Initialize detached span.
+
+        Args:
+            span: Started span, or None to run calls in the current context
+        """
+        self.span = span
+        self._context = trace.set_span_in_context(span) if span is not None else None
+
+    def call(self, func: Callable, *args) -> Any:
+        """Call a function with the span current."""
+        if self._context is None:
+            return func(*args)
+        token = context.attach(self._context)
+        try:
+            return func(*args)
+        finally:
+            context.detach(token)
+
+    async def call_async(self, func: Callable, *args) -> Any:
+        """Await the result of a function with the span current."""
+        if self._context is None:
+            return await func(*args)
+        token = context.attach(self._context)
+        try:
+            return await func(*args)
+        finally:
+            context.detach(token)
+
+    def end(self, error: Optional[BaseException] = None):
+        """End the span, recording an exception if one is given."""
+        span = self.span
+        if span is None:
+            return
+        if isinstance(error, Exception) and span.is_recording():
+            span.record_exception(error)
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+        span.end()
+
+
+class _NonRecordingScope:
+    """Shared scope for spans that would not be sampled; allocates nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> Span:
+        return trace.get_current_span()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NON_RECORDING_SCOPE = _NonRecordingScope()
+
+
+class _Decision(threading.local):
+    """Root sampling decision handed from span() to the SDK, per thread."""
+
+    trace_id: Optional[int] = None
+    result: Any = None
+
+
+class _DecidedRoot:
+    """
+    Sampler and id generator for the SDK that replay span()'s root decision.
+
+    While TracingCollector starts a root span it has already sampled, the SDK
+    gets the trace id the decision was taken for and the decision itself, so
+    ratio and rate-limiting samplers run exactly once per root. All other
+    calls are passed through.
+    """
+
+    def __init__(self, id_generator: Any):
+        self.sampler: Optional["Sampler"] = None
+        self.decision = _Decision()
+        self._id_generator = id_generator
+        self.generate_span_id = id_generator.generate_span_id
+
+        # Same flags the SDK gives an unsampled root
+        flags = trace.TraceFlags.DEFAULT
+        if self.is_trace_id_random():
+            flags |= getattr(trace.TraceFlags, "RANDOM_TRACE_ID", 0)
+        self.unsampled_flags = trace.TraceFlags(flags)
+
+    def generate_trace_id(self) -> int:
+        trace_id = self.decision.trace_id
+        if trace_id is not None:
+            return trace_id
+        return self._id_generator.generate_trace_id()
+
+    def is_trace_id_random(self) -> bool:
+        is_random = getattr(self._id_generator, "is_trace_id_random", None)
+        return bool(is_random and is_random())
+
+    def should_sample(self, parent_context, trace_id, name, *args, **kwargs):
+        decision = self.decision
+        if decision.result is not None and decision.trace_id == trace_id:
+            result = decision.result
+            decision.result = None
+            return result
+        return self.sampler.should_sample(
+            parent_context, trace_id, name, *args, **kwargs
+        )
+
+    def get_description(self) -> str:
+        return self.sampler.get_description()
+
+
+def _root_sampler(sampler: Any) -> Any:
+    """Return the sampler a parent-based sampler defers to for root spans."""
+    from opentelemetry.sdk.trace.sampling import ParentBased
+
+    if isinstance(sampler, ParentBased):
+        return getattr(sampler, "_root", sampler)
+    return sampler
+
+
+def _drops_unsampled_children(sampler: Any) -> bool:
+    """Check whether a sampler never samples a child of an unsampled span."""
+    from opentelemetry.sdk.trace.sampling import ALWAYS_OFF, ParentBased
+
+    return (
+        isinstance(sampler, ParentBased)
+        and getattr(sampler, "_local_parent_not_sampled", None) is ALWAYS_OFF
+        and getattr(sampler, "_remote_parent_not_sampled", None) is ALWAYS_OFF
+    )
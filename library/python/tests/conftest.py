@@ -0,0 +1,92 @@
+"""
+Shared fixtures: a local stand-in HTTP server for OTLP and Loki tests.
+"""
+
+import gzip
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple
+
+import pytest
+
+# Make golden_path importable when pytest is run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Request(NamedTuple):
+    """A request received by the stand-in server."""
+
+    path: str
+    headers: Dict[str, str]
+    body: bytes
+
+    def decoded_body(self) -> bytes:
+        """Body with any gzip Content-Encoding removed."""
+        if self.headers.get("content-encoding") == "gzip":
+            return gzip.decompress(self.body)
+        return self.body
+
+
+class RecordingServer:
+    """
+    HTTP server recording every POST and answering with scripted statuses.
+
+    Statuses queued with respond_with() are used in order; once they run
+    out, requests get default_status.
+    """
+
+    def __init__(self, default_status: int = 200):
+        self.default_status = default_status
+        self.requests: List[Request] = []
+        self._statuses: List[int] = []
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so clients reuse pooled connections as with a real
+            # collector
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                headers = {key.lower(): value for key, value in self.headers.items()}
+                with server._lock:
+                    server.requests.append(Request(self.path, headers, body))
+                    status = (
+                        server._statuses.pop(0)
+                        if server._statuses
+                        else server.default_status
+                    )
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+
+    def respond_with(self, *statuses: int):
+        """Queue response statuses for the next requests."""
+        with self._lock:
+            self._statuses.extend(statuses)
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def http_server():
+    server = RecordingServer()
+    yield server
+    server.close()
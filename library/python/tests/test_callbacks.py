@@ -0,0 +1,99 @@
+"""
+Tests for scrape-time gauge callbacks.
+"""
+
+import gc
+import math
+import threading
+
+from golden_path.metrics import MetricsCollector
+
+
+class _Pool:
+    size = 3
+
+
+def _callback_threads():
+    return [
+        thread
+        for thread in threading.enumerate()
+        if thread.name == "golden-path-gauge-callback"
+    ]
+
+
+def _value(metrics, name, **labels):
+    return metrics.registry.get_sample_value(name, labels)
+
+
+def _errors(metrics, reason):
+    return _value(
+        metrics, "gauge_callback_errors_total", gauge="pool_size", reason=reason
+    )
+
+
+def test_failing_callback_reports_nan_and_counts_an_error():
+    metrics = MetricsCollector("callbacks-test")
+    gauge = metrics.create_custom_gauge("pool_size", "Pool size")
+
+    def fail():
+        raise RuntimeError("pool is gone")
+
+    metrics.set_gauge_callback(gauge, fail)
+
+    assert math.isnan(_value(metrics, "pool_size"))
+    assert _errors(metrics, "error") == 1
+    assert _errors(metrics, "timeout") is None
+
+
+def test_slow_callback_times_out_and_is_not_restarted():
+    metrics = MetricsCollector("callbacks-test", gauge_callback_timeout=0.05)
+    gauge = metrics.create_custom_gauge("pool_size", "Pool size")
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return 7
+
+    metrics.set_gauge_callback(gauge, slow)
+    try:
+        assert math.isnan(_value(metrics, "pool_size"))
+        assert math.isnan(_value(metrics, "pool_size"))
+        assert _errors(metrics, "timeout") == 2
+    finally:
+        release.set()
+
+    # The evaluation still pending from the first scrape delivers the value
+    assert _value(metrics, "pool_size") == 7
+    assert len(calls) == 1
+
+
+def test_scrapes_reuse_the_worker_thread():
+    metrics = MetricsCollector("callbacks-test", gauge_callback_timeout=1.0)
+    gauge = metrics.create_custom_gauge("pool_size", "Pool size")
+    metrics.set_gauge_callback(gauge, lambda: 3)
+
+    assert _value(metrics, "pool_size") == 3
+    threads = _callback_threads()
+    for _ in range(20):
+        assert _value(metrics, "pool_size") == 3
+
+    assert _callback_threads() == threads
+    assert len(threads) >= 1
+
+
+def test_series_is_removed_once_its_object_is_collected():
+    metrics = MetricsCollector("callbacks-test")
+    gauge = metrics.create_custom_gauge("pool_size", "Pool size", ["pool"])
+    pool = _Pool()
+    metrics.set_gauge_callback(gauge, lambda p: p.size, {"pool": "db"}, obj=pool)
+
+    assert _value(metrics, "pool_size", pool="db") == 3
+
+    del pool
+    gc.collect()
+    # The scrape noticing the release reports NaN, later scrapes drop the series
+    assert math.isnan(_value(metrics, "pool_size", pool="db"))
+    assert _value(metrics, "pool_size", pool="db") is None
+    assert _errors(metrics, "error") is None
@@ -0,0 +1,25 @@
+"""
+Tests for the structured log encoders.
+"""
+
+import json
+
+import pytest
+
+from golden_path.encoding import get_encoder
+
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec"])
+def test_fast_encoder_falls_back_to_json_for_big_ints(name):
+    pytest.importorskip(name)
+    encode = get_encoder(name)
+
+    line = encode({"message": "big", "value": 2**70})
+
+    assert json.loads(line) == {"message": "big", "value": 2**70}
+
+
+def test_auto_encoder_encodes_big_ints():
+    line = get_encoder("auto")({"value": 2**70})
+
+    assert json.loads(line) == {"value": 2**70}
@@ -0,0 +1,141 @@
+"""
+Tests for the OTLP span export transports.
+"""
+
+import json
+import threading
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+
+from golden_path.export import (
+    FILE,
+    HTTP_PROTOBUF,
+    InstrumentedBatchSpanProcessor,
+    create_span_exporter,
+)
+from golden_path.metrics import MetricsCollector
+
+pytest.importorskip("opentelemetry.exporter.otlp.proto.http")
+trace_service_pb2 = pytest.importorskip(
+    "opentelemetry.proto.collector.trace.v1.trace_service_pb2"
+)
+
+
+def _export_one_span(url, **kwargs):
+    exporter = create_span_exporter(HTTP_PROTOBUF, f"{url}/v1/traces", **kwargs)
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    provider.get_tracer(__name__).start_span("checkout").end()
+    provider.shutdown()
+
+
+def _span_names(request):
+    message = trace_service_pb2.ExportTraceServiceRequest()
+    message.ParseFromString(request.decoded_body())
+    return [
+        span.name
+        for resource_spans in message.resource_spans
+        for scope_spans in resource_spans.scope_spans
+        for span in scope_spans.spans
+    ]
+
+
+def test_http_protobuf_gzips_by_default(http_server, monkeypatch):
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_COMPRESSION", raising=False)
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_TRACES_COMPRESSION", raising=False)
+
+    _export_one_span(http_server.url)
+
+    (request,) = http_server.requests
+    assert request.path == "/v1/traces"
+    assert request.headers["content-type"] == "application/x-protobuf"
+    assert request.headers["content-encoding"] == "gzip"
+    assert _span_names(request) == ["checkout"]
+
+
+def test_http_protobuf_compression_follows_environment(http_server, monkeypatch):
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_COMPRESSION", "none")
+
+    _export_one_span(http_server.url)
+
+    (request,) = http_server.requests
+    assert "content-encoding" not in request.headers
+    assert _span_names(request) == ["checkout"]
+
+
+def test_http_protobuf_explicit_compression_wins(http_server, monkeypatch):
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_COMPRESSION", "gzip")
+
+    _export_one_span(http_server.url, compression="none")
+
+    (request,) = http_server.requests
+    assert "content-encoding" not in request.headers
+
+
+class _BlockingExporter(SpanExporter):
+    """Exporter that holds the export thread until released."""
+
+    def __init__(self):
+        self.exporting = threading.Event()
+        self.release = threading.Event()
+
+    def export(self, spans):
+        self.exporting.set()
+        self.release.wait(5)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        self.release.set()
+
+
+def test_batch_processor_reports_queue_depth_and_drops():
+    metrics = MetricsCollector("export-test")
+    exporter = _BlockingExporter()
+    processor = InstrumentedBatchSpanProcessor(
+        exporter,
+        metrics,
+        max_queue_size=4,
+        max_export_batch_size=4,
+        schedule_delay_millis=60_000,
+    )
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer(__name__)
+    try:
+        # A full batch wakes the export thread, which then blocks in export
+        for _ in range(4):
+            tracer.start_span("first").end()
+        assert exporter.exporting.wait(5)
+
+        for _ in range(6):
+            tracer.start_span("second").end()
+
+        registry = metrics.registry
+        assert registry.get_sample_value("span_export_queue_depth") == 4
+        assert registry.get_sample_value("span_export_dropped_spans_total") == 2
+    finally:
+        exporter.release.set()
+        provider.shutdown()
+
+
+def test_file_exporter_closes_its_file_on_shutdown(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = create_span_exporter(FILE, export_file=str(path))
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer(__name__)
+    tracer.start_span("checkout").end()
+    tracer.start_span("payment").end()
+
+    provider.shutdown()
+
+    assert exporter.out.closed
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["checkout", "payment"]
+    assert exporter.export([]) == SpanExportResult.FAILURE
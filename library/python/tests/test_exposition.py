@@ -0,0 +1,85 @@
+"""
+Tests for the cached /metrics exposition.
+"""
+
+import gzip
+import threading
+import types
+
+from golden_path import exposition
+from golden_path.exposition import ScrapeCache
+
+TEXT = "text/plain; version=0.0.4"
+OPENMETRICS = "application/openmetrics-text; version=1.0.0"
+
+
+class _Renderer:
+    """Render callable counting its calls, optionally blocking until released."""
+
+    def __init__(self, block: bool = False):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self, encoder):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return encoder(self.calls)
+
+
+def _encoder(calls):
+    return f"render {calls}".encode()
+
+
+def test_bodies_are_reused_until_stale(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(
+        exposition, "time", types.SimpleNamespace(monotonic=lambda: now[0])
+    )
+    render = _Renderer()
+    cache = ScrapeCache(render, max_staleness=15.0)
+
+    assert cache.get(_encoder, TEXT) == b"render 1"
+    now[0] += 15.0
+    assert cache.get(_encoder, TEXT) == b"render 1"
+    # Each content type is rendered and cached on its own
+    assert cache.get(_encoder, OPENMETRICS) == b"render 2"
+
+    now[0] += 0.1
+    assert cache.get(_encoder, TEXT) == b"render 3"
+    assert render.calls == 3
+
+    cache.invalidate()
+    assert cache.get(_encoder, OPENMETRICS) == b"render 4"
+
+
+def test_concurrent_scrapes_share_one_render():
+    render = _Renderer(block=True)
+    cache = ScrapeCache(render, max_staleness=60.0)
+    bodies = []
+
+    def scrape():
+        bodies.append(cache.get(_encoder, TEXT))
+
+    threads = [threading.Thread(target=scrape) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    assert render.started.wait(5)
+    render.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert render.calls == 1
+    assert bodies == [b"render 1"] * 5
+
+
+def test_gzipped_body_is_compressed_once():
+    cache = ScrapeCache(_Renderer(), max_staleness=60.0)
+
+    compressed = cache.get(_encoder, TEXT, compress=True)
+
+    assert gzip.decompress(compressed) == b"render 1"
+    assert cache.get(_encoder, TEXT, compress=True) is compressed
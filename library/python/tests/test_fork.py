@@ -0,0 +1,80 @@
+"""
+Tests for fork safety of the tracing pipeline.
+"""
+
+import gc
+import os
+
+import pytest
+
+from golden_path import fork
+from golden_path.tracing import TracingCollector
+
+pytest.importorskip("opentelemetry.exporter.otlp.proto.http")
+trace_service_pb2 = pytest.importorskip(
+    "opentelemetry.proto.collector.trace.v1.trace_service_pb2"
+)
+
+WORKERS = 4
+
+
+def _exported_worker_pids(requests):
+    pids = set()
+    for request in requests:
+        message = trace_service_pb2.ExportTraceServiceRequest()
+        message.ParseFromString(request.decoded_body())
+        for resource_spans in message.resource_spans:
+            for scope_spans in resource_spans.scope_spans:
+                for span in scope_spans.spans:
+                    for attribute in span.attributes:
+                        if attribute.key == "worker.pid":
+                            pids.add(attribute.value.int_value)
+    return pids
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_forked_workers_export_spans(http_server):
+    tracing = TracingCollector(
+        "fork-test",
+        transport="http/protobuf",
+        tempo_endpoint=f"{http_server.url}/v1/traces",
+        schedule_delay_millis=50,
+    )
+
+    # Use the exporter in the master first, as a preloaded app would
+    with tracing.span("master"):
+        pass
+    assert tracing.tracer_provider.force_flush(5000)
+
+    pids = []
+    for _ in range(WORKERS):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                with tracing.span("worker", attributes={"worker.pid": os.getpid()}):
+                    pass
+                code = 0 if tracing.tracer_provider.force_flush(5000) else 1
+            finally:
+                os._exit(code)
+        pids.append(pid)
+
+    for pid in pids:
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+    assert _exported_worker_pids(http_server.requests) == set(pids)
+
+
+def test_register_after_fork_holds_objects_weakly():
+    class Component:
+        def _after_fork_in_child(self):
+            pass
+
+    component = Component()
+    fork.register_after_fork(component)
+    assert component in fork._registered
+
+    del component
+    gc.collect()
+    assert not any(isinstance(obj, Component) for obj in fork._registered)
@@ -0,0 +1,77 @@
+"""
+Tests for the async log handler.
+"""
+
+import gc
+import io
+import logging
+import signal
+import time
+import weakref
+
+from golden_path import handlers
+from golden_path.handlers import BLOCK, AsyncLogHandler
+from golden_path.logging import StructuredLogger
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
+def test_full_buffer_is_written_without_waiting_for_flush_interval():
+    stream = io.StringIO()
+    handler = AsyncLogHandler(
+        stream,
+        capacity=4,
+        overflow_policy=BLOCK,
+        batch_size=512,
+        flush_interval=30.0,
+        install_signal_handlers=False,
+    )
+    try:
+        assert handler.batch_size == 4
+
+        start = time.monotonic()
+        for i in range(12):
+            handler.emit(_record(f"line {i}"))
+        handler.flush(timeout=5.0)
+
+        assert time.monotonic() - start < 5.0
+        assert stream.getvalue().splitlines() == [f"line {i}" for i in range(12)]
+    finally:
+        handler.close()
+
+
+def test_replacing_logger_closes_async_handlers():
+    first = StructuredLogger("handler-replace-test", async_output=True)
+    (old_handler,) = first.logger.handlers
+
+    second = StructuredLogger("handler-replace-test", async_output=True)
+    try:
+        assert old_handler not in second.logger.handlers
+        assert old_handler._closed
+        assert not old_handler._writer.is_alive()
+    finally:
+        for handler in second.logger.handlers:
+            handler.close()
+
+
+def test_signal_handler_is_shared_and_holds_handlers_weakly():
+    created = [AsyncLogHandler(io.StringIO()) for _ in range(3)]
+    installed = signal.getsignal(signal.SIGTERM)
+    assert installed is handlers._flush_and_forward
+    assert all(handler in handlers._flush_on_signal for handler in created)
+
+    closed = created.pop()
+    closed.close()
+    assert closed not in handlers._flush_on_signal
+
+    ref = weakref.ref(closed)
+    del closed
+    gc.collect()
+    assert ref() is None
+
+    AsyncLogHandler(io.StringIO()).close()
+    assert signal.getsignal(signal.SIGTERM) is installed
+    for handler in created:
+        handler.close()
@@ -0,0 +1,72 @@
+"""
+Tests for the cold import cost of golden_path.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+LIBRARY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Statement -> budget in milliseconds, as in benchmarks/bench_import_time.py
+BUDGETS_MS = {
+    "import golden_path": 10.0,
+    "from golden_path import StructuredLogger": 30.0,
+}
+
+# Heavy dependencies that "import golden_path" must not load eagerly
+DEFERRED_MODULES = ("opentelemetry", "prometheus_client", "flask", "fastapi")
+
+
+def _top_level_imports(statement: str) -> dict:
+    """Run a statement under -X importtime and return top-level import times."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [LIBRARY_DIR, env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; only top-level entries are summed
+        if not name.startswith("  "):
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def _import_ms(statement: str, baseline: dict) -> float:
+    imports = _top_level_imports(statement)
+    return (
+        sum(cumulative for name, cumulative in imports.items() if name not in baseline)
+        / 1000
+    )
+
+
+def test_import_golden_path_defers_heavy_dependencies():
+    imports = _top_level_imports("import golden_path")
+
+    loaded = [name for name in imports if name.split(".")[0] in DEFERRED_MODULES]
+    assert loaded == []
+
+
+@pytest.mark.parametrize("statement, budget_ms", list(BUDGETS_MS.items()))
+def test_import_within_budget(statement, budget_ms):
+    baseline = _top_level_imports("pass")
+    # Warm-up: the first import after a change also writes .pyc files
+    _top_level_imports(statement)
+
+    # Best of three, so that one slow interpreter start does not fail the run
+    best_ms = min(_import_ms(statement, baseline) for _ in range(3))
+
+    assert best_ms <= budget_ms
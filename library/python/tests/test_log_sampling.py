@@ -0,0 +1,101 @@
+"""
+Tests for log sampling and rate limiting.
+"""
+
+import io
+import json
+import logging
+import types
+
+from golden_path import log_sampling
+from golden_path.log_sampling import RATE_LIMITED, SAMPLED, LogSampler
+from golden_path.logging import StructuredLogger
+from golden_path.metrics import MetricsCollector
+
+MESSAGE = "HTTP request completed"
+
+
+def _suppressed(metrics, reason):
+    return metrics.registry.get_sample_value(
+        "log_lines_suppressed_total", {"reason": reason}
+    )
+
+
+def test_sampled_rates_add_up_to_the_lines_logged(monkeypatch):
+    # A frozen clock keeps the token bucket from refilling mid-test
+    monkeypatch.setattr(
+        log_sampling, "time", types.SimpleNamespace(monotonic=lambda: 100.0)
+    )
+    metrics = MetricsCollector("log-sampling-test")
+    sampler = LogSampler(
+        sample_rate=7, rate_limit=1.0, burst=5, metrics_collector=metrics
+    )
+    logger = StructuredLogger(
+        "log-sampling-test", enable_trace_correlation=False, sampler=sampler
+    )
+    stream = io.StringIO()
+    logger.logger.handlers[0].stream = stream
+
+    lines = 1000
+    for _ in range(lines):
+        logger.info(MESSAGE)
+    logger.warning(MESSAGE)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    *info, warning = records
+    trailing = sampler._state[MESSAGE][3]
+
+    assert warning["sampled_rate"] == 1
+    assert len(info) == 5
+    assert sum(record["sampled_rate"] for record in info) + trailing == lines
+
+    # 1 in 7 lines passes sampling, and only the burst passes the rate limit
+    passed_sampling = -(-lines // 7)
+    assert _suppressed(metrics, SAMPLED) == lines - passed_sampling
+    assert _suppressed(metrics, RATE_LIMITED) == passed_sampling - len(info)
+
+
+def test_least_recently_used_keys_are_evicted():
+    sampler = LogSampler(sample_rate=2, max_keys=2)
+
+    assert sampler.sample(logging.INFO, "a") == 1
+    assert sampler.sample(logging.INFO, "b") == 1
+    assert sampler.sample(logging.INFO, "a") == 0
+    assert sampler.sample(logging.INFO, "c") == 1
+
+    assert list(sampler._state) == ["a", "c"]
+    # An evicted key starts over, so its next line is kept
+    assert sampler.sample(logging.INFO, "b") == 1
+    assert list(sampler._state) == ["c", "b"]
+
+
+def test_log_contexts_sample_with_their_own_sampler():
+    logger = StructuredLogger(
+        "log-sampling-test", enable_trace_correlation=False, sample_rate=2
+    )
+    stream = io.StringIO()
+    logger.logger.handlers[0].stream = stream
+    context = logger.with_fields(sampler=LogSampler(sample_rate=3), job="export")
+
+    for _ in range(6):
+        logger.info(MESSAGE)
+        context.info(MESSAGE)
+    context.error(MESSAGE)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    by_logger = [record for record in records if "job" not in record]
+    by_context = [record for record in records if "job" in record]
+    assert [record["sampled_rate"] for record in by_logger] == [1, 2, 2]
+    # Errors are kept on top of the sampled lines and stand only for themselves
+    assert [record["sampled_rate"] for record in by_context] == [1, 3, 1]
+    assert by_context[-1]["level"] == "ERROR"
+
+
+def test_unsampled_logger_adds_no_sampled_rate():
+    logger = StructuredLogger("log-sampling-test", enable_trace_correlation=False)
+    stream = io.StringIO()
+    logger.logger.handlers[0].stream = stream
+
+    logger.info(MESSAGE)
+
+    assert "sampled_rate" not in json.loads(stream.getvalue())
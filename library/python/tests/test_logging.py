@@ -0,0 +1,54 @@
+"""
+Tests for trace correlation in StructuredLogger.
+"""
+
+import io
+import json
+
+from opentelemetry.sdk.trace import TracerProvider
+
+from golden_path.logging import StructuredLogger, _current_trace_context
+
+
+def _ids(span):
+    span_context = span.get_span_context()
+    return {
+        "trace_id": format(span_context.trace_id, "032x"),
+        "span_id": format(span_context.span_id, "016x"),
+    }
+
+
+def test_cached_trace_context_follows_the_current_span():
+    tracer = TracerProvider().get_tracer(__name__)
+
+    assert _current_trace_context() == {}
+    with tracer.start_as_current_span("outer") as outer:
+        first = _current_trace_context()
+        assert first == _ids(outer)
+        assert _current_trace_context() is first
+
+        with tracer.start_as_current_span("inner") as inner:
+            assert _current_trace_context() == _ids(inner)
+
+        assert _current_trace_context() == _ids(outer)
+    assert _current_trace_context() == {}
+
+
+def test_log_lines_carry_the_ids_of_the_span_they_are_logged_in():
+    tracer = TracerProvider().get_tracer(__name__)
+    logger = StructuredLogger("logging-test")
+    stream = io.StringIO()
+    logger.logger.handlers[0].stream = stream
+
+    with tracer.start_as_current_span("first") as first:
+        logger.info("in first")
+    with tracer.start_as_current_span("second") as second:
+        logger.info("in second")
+    logger.info("outside")
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    logged = [
+        {key: record[key] for key in ("trace_id", "span_id") if key in record}
+        for record in records
+    ]
+    assert logged == [_ids(first), _ids(second), {}]
@@ -0,0 +1,119 @@
+"""
+Tests for the Loki push exporter against a local stand-in server.
+"""
+
+import json
+import logging
+
+import pytest
+
+from golden_path.loki import PUSH_PATH, LokiExporter
+
+
+@pytest.fixture
+def exporter(http_server):
+    handler = LokiExporter(
+        "loki-test",
+        environment="test",
+        version="1.2.3",
+        endpoint=http_server.url,
+        batch_wait=0.01,
+        max_retries=3,
+        min_backoff=0.001,
+        max_backoff=0.01,
+        install_signal_handlers=False,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    yield handler
+    handler.close()
+
+
+def _log(handler: LokiExporter, *records):
+    for level, message in records:
+        handler.emit(logging.LogRecord("test", level, __file__, 0, message, None, None))
+    handler.flush()
+
+
+def _streams(request):
+    payload = json.loads(request.decoded_body())
+    return {
+        stream["stream"]["level"]: (
+            stream["stream"],
+            [line for _, line in stream["values"]],
+        )
+        for stream in payload["streams"]
+    }
+
+
+def test_push_groups_records_into_streams_by_level(http_server, exporter):
+    _log(
+        exporter,
+        (logging.INFO, "first"),
+        (logging.ERROR, "failed"),
+        (logging.INFO, "second"),
+    )
+
+    (request,) = http_server.requests
+    assert request.path == PUSH_PATH
+    assert request.headers["content-type"] == "application/json"
+    assert request.headers["content-encoding"] == "gzip"
+
+    streams = _streams(request)
+    labels, lines = streams["info"]
+    assert labels == {
+        "service": "loki-test",
+        "environment": "test",
+        "version": "1.2.3",
+        "level": "info",
+    }
+    assert lines == ["first", "second"]
+    assert streams["error"][1] == ["failed"]
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_push_retries_throttling_and_server_errors(http_server, exporter, status):
+    http_server.respond_with(status, status)
+
+    _log(exporter, (logging.INFO, "retried"))
+
+    assert len(http_server.requests) == 3
+    assert len({request.body for request in http_server.requests}) == 1
+    assert exporter.dropped == 0
+
+
+def test_push_drops_batch_rejected_by_loki(http_server, exporter):
+    http_server.respond_with(400)
+
+    _log(exporter, (logging.INFO, "bad"), (logging.WARNING, "worse"))
+
+    assert len(http_server.requests) == 1
+    assert exporter.dropped == 2
+
+
+def test_push_drops_batch_after_exhausting_retries(http_server, exporter):
+    http_server.respond_with(503, 503, 503, 503)
+
+    _log(exporter, (logging.INFO, "lost"))
+
+    assert len(http_server.requests) == exporter.max_retries + 1
+    assert exporter.dropped == 1
+
+
+def test_close_pushes_queued_records_and_writer_closes_connection(http_server):
+    http_server.respond_with(503, 503)
+    handler = LokiExporter(
+        "loki-test",
+        endpoint=http_server.url,
+        batch_wait=10.0,
+        min_backoff=0.01,
+        max_backoff=0.01,
+        install_signal_handlers=False,
+    )
+    handler.emit(logging.LogRecord("test", logging.INFO, __file__, 0, "x", None, None))
+
+    handler.close()
+
+    assert not handler._writer.is_alive()
+    assert handler._connection is None
+    assert len(http_server.requests) == 3
+    assert handler.dropped == 0
@@ -0,0 +1,117 @@
+"""
+Tests for the metrics registered by MetricsCollector.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from prometheus_client.parser import text_string_to_metric_families
+
+from golden_path.export import InstrumentedBatchSpanProcessor, NullSpanExporter
+from golden_path.metrics import MetricsCollector
+from golden_path.runtime import RuntimeCollector
+from golden_path.tail_sampling import TailSamplingSpanProcessor
+
+
+def _family_names(metrics: MetricsCollector):
+    return {
+        family.name
+        for family in text_string_to_metric_families(metrics.get_metrics().decode())
+    }
+
+
+def test_default_scrape_has_no_pipeline_or_runtime_series():
+    metrics = MetricsCollector("metrics-test")
+
+    names = _family_names(metrics)
+
+    assert not any(name.startswith(("span_export", "tail_sampling")) for name in names)
+    assert not any(name.startswith(("python_gc", "asyncio_")) for name in names)
+
+
+def test_pipeline_metrics_are_registered_by_their_components():
+    metrics = MetricsCollector("metrics-test")
+
+    processor = InstrumentedBatchSpanProcessor(NullSpanExporter(), metrics)
+    TailSamplingSpanProcessor(
+        SimpleSpanProcessor(NullSpanExporter()), metrics_collector=metrics
+    )
+    processor.shutdown()
+
+    names = _family_names(metrics)
+    assert "span_export_duration_seconds" in names
+    assert "tail_sampling_buffered_spans" in names
+
+
+def test_record_methods_register_their_metrics():
+    metrics = MetricsCollector("metrics-test")
+
+    metrics.record_event_loop_lag(0.01)
+
+    assert "asyncio_event_loop_lag_seconds" in _family_names(metrics)
+
+
+def test_slow_callback_hook_has_a_single_owner():
+    metrics = MetricsCollector("metrics-test")
+    first = RuntimeCollector(metrics, gc_pauses=False).start()
+    try:
+        with pytest.raises(RuntimeError):
+            RuntimeCollector(metrics, gc_pauses=False).start()
+    finally:
+        first.close()
+
+    second = RuntimeCollector(metrics, gc_pauses=False).start()
+    second.close()
+
+
+def _http_count(metrics: MetricsCollector, endpoint: str, status_code: str = "200"):
+    return metrics.registry.get_sample_value(
+        "http_requests_total",
+        {"method": "GET", "endpoint": endpoint, "status_code": status_code},
+    )
+
+
+def test_http_children_are_evicted_least_recently_used_first():
+    metrics = MetricsCollector("metrics-test", http_child_cache_size=2)
+
+    for endpoint in ("/a", "/b", "/a", "/c"):
+        metrics.record_http_request("GET", endpoint, 200, 0.01)
+
+    assert list(metrics._http_children) == [("GET", "/a", 200), ("GET", "/c", 200)]
+
+    # An evicted key is bound again and keeps counting on the same series
+    metrics.record_http_request("GET", "/b", 200, 0.01)
+    assert list(metrics._http_children) == [("GET", "/c", 200), ("GET", "/b", 200)]
+    assert _http_count(metrics, "/a") == 2
+    assert _http_count(metrics, "/b") == 2
+
+
+def test_prebound_routes_are_exposed_and_reused():
+    metrics = MetricsCollector("metrics-test")
+
+    metrics.prebind_http_routes([("GET", "/a"), ("GET", "/b")], status_codes=(200, 500))
+
+    assert len(metrics._http_children) == 4
+    assert _http_count(metrics, "/a") == 0
+    assert _http_count(metrics, "/b", "500") == 0
+
+    children = metrics._http_children[("GET", "/a", 200)]
+    metrics.record_http_request("GET", "/a", 200, 0.01)
+    assert metrics._http_children[("GET", "/a", 200)] is children
+    assert _http_count(metrics, "/a") == 1
+
+
+def test_closing_the_runtime_collector_removes_executor_series():
+    metrics = MetricsCollector("metrics-test")
+    runtime = RuntimeCollector(metrics, gc_pauses=False, slow_callbacks=False)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        runtime.monitor_executor(executor, "io")
+        labels = {"executor": "io"}
+        assert metrics.registry.get_sample_value("executor_queue_depth", labels) == 0
+        assert metrics.registry.get_sample_value("executor_utilization", labels) == 0
+
+        runtime.close()
+
+        for name in ("executor_queue_depth", "executor_utilization"):
+            assert metrics.registry.get_sample_value(name, labels) is None
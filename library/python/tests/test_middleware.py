@@ -0,0 +1,171 @@
+"""
+Tests for the route labels recorded by the HTTP middleware and the decorator.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import time
+
+import pytest
+from opentelemetry import trace
+
+from golden_path.logging import StructuredLogger
+from golden_path.metrics import MetricsCollector
+from golden_path.middleware import UNMATCHED_ROUTE, ObservabilityMiddleware
+from golden_path.tracing import TracingCollector
+
+
+@pytest.fixture
+def middleware():
+    logging.getLogger("opentelemetry").setLevel(logging.CRITICAL)
+    metrics = MetricsCollector("middleware-test")
+    return ObservabilityMiddleware(
+        "middleware-test",
+        metrics_collector=metrics,
+        tracing_collector=TracingCollector("middleware-test", transport="none"),
+        logger=StructuredLogger("middleware-test", log_level="ERROR"),
+    )
+
+
+def _request_count(metrics: MetricsCollector, endpoint: str, status_code: str):
+    return metrics.registry.get_sample_value(
+        "http_requests_total",
+        {"method": "GET", "endpoint": endpoint, "status_code": status_code},
+    )
+
+
+def test_flask_labels_routes_and_unmatched_paths(middleware):
+    flask = pytest.importorskip("flask")
+    app = flask.Flask(__name__)
+
+    @app.route("/orders/<order_id>")
+    def get_order(order_id):
+        return order_id
+
+    middleware.flask_middleware(app)
+    client = app.test_client()
+    client.get("/orders/1")
+    client.get("/orders/2")
+    client.get("/wp-login.php")
+    client.get("/.env")
+
+    assert _request_count(middleware.metrics, "/orders/<order_id>", "200") == 2
+    assert _request_count(middleware.metrics, UNMATCHED_ROUTE, "404") == 2
+    assert _request_count(middleware.metrics, "/.env", "404") is None
+
+
+def test_asgi_labels_routes_and_unmatched_paths(middleware):
+    fastapi = pytest.importorskip("fastapi")
+    testclient = pytest.importorskip("fastapi.testclient")
+    app = fastapi.FastAPI()
+
+    @app.get("/orders/{order_id}")
+    def get_order(order_id: str):
+        return order_id
+
+    middleware.fastapi_middleware(app)
+    client = testclient.TestClient(app)
+    client.get("/orders/1")
+    client.get("/orders/2")
+    client.get("/wp-login.php")
+    client.get("/.env")
+
+    assert _request_count(middleware.metrics, "/orders/{order_id}", "200") == 2
+    assert _request_count(middleware.metrics, UNMATCHED_ROUTE, "404") == 2
+    assert _request_count(middleware.metrics, "/.env", "404") is None
+
+
+def test_asgi_span_is_named_after_the_route_and_correlated_with_the_log():
+    fastapi = pytest.importorskip("fastapi")
+    testclient = pytest.importorskip("fastapi.testclient")
+    tracing = TracingCollector("middleware-test", transport="memory")
+    logger = StructuredLogger("middleware-test")
+    stream = io.StringIO()
+    logger.logger.handlers[0].stream = stream
+    middleware = ObservabilityMiddleware(
+        "middleware-test",
+        metrics_collector=MetricsCollector("middleware-test"),
+        tracing_collector=tracing,
+        logger=logger,
+    )
+    app = fastapi.FastAPI()
+
+    @app.get("/orders/{order_id}")
+    def get_order(order_id: str):
+        return order_id
+
+    middleware.fastapi_middleware(app)
+    testclient.TestClient(app).get("/orders/1?expand=items")
+    tracing.tracer_provider.force_flush()
+
+    (span,) = [
+        span
+        for span in tracing.exporter.get_finished_spans()
+        if span.kind == trace.SpanKind.SERVER
+    ]
+    assert span.name == "GET /orders/{order_id}"
+    assert span.attributes["http.route"] == "/orders/{order_id}"
+    assert span.attributes["http.status_code"] == 200
+    assert span.attributes["http.url"] == "http://testserver/orders/1?expand=items"
+
+    (line,) = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert line["trace_id"] == format(span.context.trace_id, "032x")
+    tracing.tracer_provider.shutdown()
+
+
+def _operation(metrics: MetricsCollector, func, sample: str, **labels):
+    operation = f"{func.__module__}.{func.__name__}"
+    return metrics.registry.get_sample_value(
+        sample, {"operation": operation, **labels}
+    )
+
+
+def _assert_timed_until_finished(metrics: MetricsCollector, func, at_least: float):
+    successes = _operation(
+        metrics, func, "business_operations_total", status="success"
+    )
+    count = _operation(metrics, func, "business_operation_duration_seconds_count")
+    duration = _operation(metrics, func, "business_operation_duration_seconds_sum")
+    assert successes == 1
+    assert count == 1
+    assert duration >= at_least
+
+
+def test_decorator_times_coroutines_until_awaited(middleware):
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    decorated = middleware.decorator(fetch)
+    assert asyncio.run(decorated()) == "done"
+
+    _assert_timed_until_finished(middleware.metrics, fetch, 0.05)
+
+
+def test_decorator_times_generators_until_consumed(middleware):
+    def produce():
+        for item in range(3):
+            time.sleep(0.02)
+            yield item
+
+    decorated = middleware.decorator(produce)
+    assert list(decorated()) == [0, 1, 2]
+
+    _assert_timed_until_finished(middleware.metrics, produce, 0.06)
+
+
+def test_decorator_times_async_generators_until_consumed(middleware):
+    async def produce():
+        for item in range(3):
+            await asyncio.sleep(0.02)
+            yield item
+
+    async def consume(generator):
+        return [item async for item in generator]
+
+    decorated = middleware.decorator(produce)
+    assert asyncio.run(consume(decorated())) == [0, 1, 2]
+
+    _assert_timed_until_finished(middleware.metrics, produce, 0.06)
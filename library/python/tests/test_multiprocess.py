@@ -0,0 +1,150 @@
+"""
+Tests for multi-process metrics aggregation across forked workers.
+"""
+
+import os
+import pickle
+
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+from golden_path.metrics import MetricsCollector
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+
+WORKERS = 3
+REQUESTS_PER_WORKER = 5
+
+
+def _run_forked(func):
+    """
+    Run func in a forked process and return its result.
+
+    Multi-process mode switches prometheus_client to mmap-backed values for
+    the whole process, so it must not leak into the test runner.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            result = ("ok", func())
+        except BaseException as e:
+            result = ("error", repr(e))
+        with os.fdopen(write_fd, "wb") as fh:
+            pickle.dump(result, fh)
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as fh:
+        status, value = pickle.load(fh)
+    os.waitpid(pid, 0)
+    assert status == "ok", value
+    return value
+
+
+def _samples(metrics: MetricsCollector):
+    samples = {}
+    for family in text_string_to_metric_families(metrics.get_metrics().decode()):
+        for sample in family.samples:
+            labels = tuple(sorted(sample.labels.items()))
+            samples[(sample.name, labels)] = sample.value
+    return samples
+
+
+def _serve_with_workers(path: str):
+    metrics = MetricsCollector("multiprocess-test", multiprocess_dir=path)
+
+    ready_read, ready_write = os.pipe()
+    exit_read, exit_write = os.pipe()
+    pids = []
+    for _ in range(WORKERS):
+        pid = os.fork()
+        if pid == 0:
+            os.close(exit_write)
+            try:
+                for _ in range(REQUESTS_PER_WORKER):
+                    metrics.record_http_request("GET", "/orders/{id}", 200, 0.01)
+                metrics.set_active_connections(1)
+                os.write(ready_write, b"x")
+                os.read(exit_read, 1)  # returns once the master closes the pipe
+            finally:
+                os._exit(0)
+        pids.append(pid)
+
+    for _ in range(WORKERS):
+        os.read(ready_read, 1)
+    while_running = _samples(metrics)
+
+    os.close(exit_write)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    after_exit = _samples(metrics)
+    return while_running, after_exit
+
+
+def test_scrape_aggregates_workers_and_drops_dead_live_gauges(tmp_path):
+    while_running, after_exit = _run_forked(
+        lambda: _serve_with_workers(str(tmp_path))
+    )
+
+    requests_key = (
+        "http_requests_total",
+        (("endpoint", "/orders/{id}"), ("method", "GET"), ("status_code", "200")),
+    )
+    active_key = ("active_connections", ())
+
+    assert while_running[requests_key] == WORKERS * REQUESTS_PER_WORKER
+    assert while_running[active_key] == WORKERS
+
+    # Counters of exited workers are kept; their livesum gauges are not
+    assert after_exit[requests_key] == WORKERS * REQUESTS_PER_WORKER
+    assert after_exit.get(active_key, 0) == 0
+
+
+def _queue_depth_in_multiprocess_mode(path: str):
+    from opentelemetry.sdk.trace import TracerProvider
+
+    from golden_path.export import InstrumentedBatchSpanProcessor, NullSpanExporter
+
+    metrics = MetricsCollector("multiprocess-test", multiprocess_dir=path)
+    processor = InstrumentedBatchSpanProcessor(
+        NullSpanExporter(), metrics, schedule_delay_millis=60_000
+    )
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer(__name__)
+    for _ in range(3):
+        tracer.start_span("queued").end()
+
+    queued = _samples(metrics)[("span_export_queue_depth", ())]
+    provider.shutdown()
+    return queued, _samples(metrics)[("span_export_queue_depth", ())]
+
+
+def test_span_export_queue_depth_is_published_in_multiprocess_mode(tmp_path):
+    queued, exported = _run_forked(
+        lambda: _queue_depth_in_multiprocess_mode(str(tmp_path))
+    )
+
+    assert queued == 3
+    assert exported == 0
+
+
+def _service_info_samples(path=None):
+    metrics = MetricsCollector("multiprocess-test", multiprocess_dir=path)
+    return {
+        key: value
+        for key, value in _samples(metrics).items()
+        if key[0].startswith("service_info")
+    }
+
+
+def test_service_info_is_exposed_under_the_same_name_in_both_modes(tmp_path):
+    single_process = _service_info_samples()
+    multi_process = _run_forked(lambda: _service_info_samples(str(tmp_path)))
+
+    assert multi_process == single_process
+    ((name, labels),) = single_process
+    assert name == "service_info_info"
+    assert ("service", "multiprocess-test") in labels
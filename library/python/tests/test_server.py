@@ -0,0 +1,68 @@
+"""
+Tests for the dedicated metrics HTTP server.
+"""
+
+import gzip
+import http.client
+
+import pytest
+
+from golden_path.metrics import MetricsCollector
+
+
+@pytest.fixture
+def server():
+    metrics = MetricsCollector("server-test")
+    metrics.record_http_request("GET", "/orders/{id}", 200, 0.01)
+    server = metrics.serve(port=0, addr="127.0.0.1")
+    yield server
+    server.shutdown()
+
+
+def _get(connection, path, headers=None):
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    return response, response.read()
+
+
+def test_metrics_endpoint(server):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+
+    response, body = _get(connection, "/metrics")
+
+    assert response.status == 200
+    assert response.getheader("Content-Type").startswith("text/plain")
+    assert response.getheader("Content-Encoding") is None
+    assert b'http_requests_total{endpoint="/orders/{id}"' in body
+
+
+def test_metrics_endpoint_negotiates_gzip(server):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+
+    response, body = _get(connection, "/metrics", {"Accept-Encoding": "gzip"})
+
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert b"http_requests_total" in gzip.decompress(body)
+
+
+def test_health_and_unknown_paths(server):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+
+    response, body = _get(connection, "/health")
+    assert (response.status, body) == (200, b"OK\n")
+
+    response, _ = _get(connection, "/nope")
+    assert response.status == 404
+
+
+def test_shutdown_closes_keep_alive_connections():
+    server = MetricsCollector("server-test").serve(port=0, addr="127.0.0.1")
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    response, _ = _get(connection, "/health")
+    assert response.status == 200
+    assert not response.will_close
+
+    server.shutdown()
+
+    with pytest.raises((ConnectionError, http.client.HTTPException)):
+        _get(connection, "/health")
@@ -0,0 +1,97 @@
+"""
+Tests for per-thread sharded counters and histograms.
+"""
+
+import threading
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+from golden_path.sharded import ShardedCounter, ShardedHistogram
+
+BUCKETS = (0.01, 0.1, 1.0)
+# Values on, just below and just above each bound
+VALUES = (0.0, 0.005, 0.01, 0.0101, 0.1, 0.099, 0.5, 1.0, 1.0001, 7.0)
+
+
+def _samples(registry):
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for metric in registry.collect()
+        for sample in metric.samples
+        if not sample.name.endswith("_created")
+    }
+
+
+def _run_threads(target, count=8):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_multi_thread_totals_match_classic_metrics():
+    classic, sharded = CollectorRegistry(), CollectorRegistry()
+    metrics = [
+        (
+            Counter("requests", "Requests", ["route"], registry=classic),
+            Histogram(
+                "latency", "Latency", ["route"], registry=classic, buckets=BUCKETS
+            ),
+        ),
+        (
+            ShardedCounter("requests", "Requests", ["route"], registry=sharded),
+            ShardedHistogram(
+                "latency", "Latency", ["route"], registry=sharded, buckets=BUCKETS
+            ),
+        ),
+    ]
+
+    def record(thread_index):
+        route = f"/r{thread_index % 3}"
+        for _ in range(200):
+            for value in VALUES:
+                for counter, histogram in metrics:
+                    counter.labels(route).inc(2)
+                    histogram.labels(route=route).observe(value)
+
+    _run_threads(record)
+
+    expected = _samples(classic)
+    actual = _samples(sharded)
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        assert actual[key] == pytest.approx(value), key
+
+
+def test_dead_thread_cells_are_folded_into_retired():
+    counter = ShardedCounter("retired", "Retired", registry=None)
+    child = counter.labels()
+
+    _run_threads(lambda _: child.inc(5), count=4)
+    assert len(child._shards) == 4
+
+    assert child.get() == 20
+    assert child._shards == []
+    assert child._retired == [20.0]
+
+    child.inc()
+    assert child.get() == 21
+    assert len(child._shards) == 1
+    assert child._retired == [20.0]
+
+
+def test_buckets_follow_le_semantics():
+    histogram = ShardedHistogram("bounds", "Bounds", registry=None, buckets=BUCKETS)
+    for value in (0.01, 0.1, 0.10000001, 1.0, 2.0):
+        histogram.observe(value)
+
+    (family,) = histogram.collect()
+    buckets = {
+        sample.labels["le"]: sample.value
+        for sample in family.samples
+        if sample.name == "bounds_bucket"
+    }
+    # A value equal to a bound is counted in that bound's bucket
+    assert buckets == {"0.01": 1, "0.1": 2, "1.0": 4, "+Inf": 5}
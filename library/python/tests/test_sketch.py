@@ -0,0 +1,75 @@
+"""
+Tests for DDSketch and the sketch-backed histogram.
+"""
+
+import random
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from golden_path.sketch import DDSketch, SketchHistogram
+
+QUANTILES = (0.01, 0.25, 0.5, 0.9, 0.99, 0.999)
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_quantiles_are_within_relative_accuracy(relative_accuracy):
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(-5, 2) for _ in range(20_000))
+    sketch = DDSketch(relative_accuracy)
+    for value in values:
+        sketch.observe(value)
+
+    for q, estimate in zip(QUANTILES, sketch.quantiles(QUANTILES)):
+        expected = values[int(q * (len(values) - 1))]
+        assert abs(estimate - expected) <= relative_accuracy * expected * (1 + 1e-9)
+
+
+def test_lowest_bins_are_collapsed_at_max_bins():
+    sketch = DDSketch(0.01, max_bins=4)
+    values = [10.0 ** exponent for exponent in range(-3, 3)]
+    for value in values:
+        sketch.observe(value)
+
+    count, total, _, bins = sketch.snapshot()
+    assert len(bins) == 4
+    assert count == len(values) and total == pytest.approx(sum(values))
+    # The three lowest values now share the lowest kept bin
+    assert [bin_count for _, bin_count in bins] == [3, 1, 1, 1]
+    assert sketch.quantile(1.0) == pytest.approx(100.0, rel=0.01)
+
+
+def test_merge_adds_values_and_rejects_other_accuracy():
+    first, second = DDSketch(0.01), DDSketch(0.01)
+    first.observe(0.5)
+    second.observe(2.0)
+    second.observe(0.0)
+
+    first.merge(second)
+    assert (first.count, first.zero_count) == (3, 1)
+    assert first.quantile(1.0) == pytest.approx(2.0, rel=0.01)
+
+    with pytest.raises(ValueError):
+        first.merge(DDSketch(0.02))
+
+
+def test_exported_classic_buckets_match_observations():
+    registry = CollectorRegistry()
+    histogram = SketchHistogram(
+        "latency", "Latency", ["route"], registry=registry, buckets=(0.01, 0.1, 1.0)
+    )
+    # Values well away from the bucket bounds are counted exactly
+    values = [0.0, 0.005, 0.02, 0.05, 0.5, 0.9, 3.0]
+    for value in values:
+        histogram.labels("/a").observe(value)
+
+    def sample(name, **labels):
+        return registry.get_sample_value(name, {"route": "/a", **labels})
+
+    assert sample("latency_bucket", le="0.01") == 2
+    assert sample("latency_bucket", le="0.1") == 4
+    assert sample("latency_bucket", le="1.0") == 6
+    assert sample("latency_bucket", le="+Inf") == 7
+    assert sample("latency_count") == 7
+    assert sample("latency_sum") == pytest.approx(sum(values))
+    assert sample("latency_quantile", quantile="0.5") == pytest.approx(0.05, rel=0.01)
@@ -0,0 +1,149 @@
+"""
+Tests for tail-based trace sampling.
+"""
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import Status, StatusCode
+
+from golden_path.metrics import MetricsCollector
+from golden_path.tail_sampling import _TRACE_ID_MASK, TailSamplingSpanProcessor
+
+SECOND_NS = 1_000_000_000
+
+
+@pytest.fixture
+def pipeline():
+    """Build a tracer whose spans pass through a tail sampler."""
+    providers = []
+
+    def build(**kwargs):
+        exporter = InMemorySpanExporter()
+        metrics = MetricsCollector("tail-sampling-test")
+        processor = TailSamplingSpanProcessor(
+            SimpleSpanProcessor(exporter), metrics_collector=metrics, **kwargs
+        )
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        providers.append(provider)
+        return provider.get_tracer(__name__), exporter, metrics
+
+    yield build
+    for provider in providers:
+        provider.shutdown()
+
+
+def _trace(tracer, children=1, root_status=None, child_status=None, duration=0.0):
+    """Record a root span with children that end first, as in a request."""
+    start = 1_000 * SECOND_NS
+    root = tracer.start_span("GET /orders", start_time=start)
+    context = trace.set_span_in_context(root)
+    for _ in range(children):
+        child = tracer.start_span("db", context=context, start_time=start)
+        if child_status is not None:
+            child.set_status(Status(child_status))
+        child.end(end_time=start + 1)
+    if root_status is not None:
+        root.set_status(Status(root_status))
+    root.end(end_time=start + int(duration * SECOND_NS))
+    return root
+
+
+def _decisions(metrics, decision):
+    return metrics.registry.get_sample_value(
+        "tail_sampling_spans_total", {"decision": decision}
+    )
+
+
+def test_ordinary_trace_is_dropped(pipeline):
+    tracer, exporter, metrics = pipeline(baseline_ratio=0.0)
+
+    _trace(tracer, children=2)
+
+    assert exporter.get_finished_spans() == ()
+    assert _decisions(metrics, "dropped") == 3
+
+
+def test_trace_with_error_is_kept_whole(pipeline):
+    tracer, exporter, metrics = pipeline(baseline_ratio=0.0)
+
+    _trace(tracer, children=2, child_status=StatusCode.ERROR)
+
+    names = [span.name for span in exporter.get_finished_spans()]
+    assert names == ["db", "db", "GET /orders"]
+    assert _decisions(metrics, "kept") == 3
+
+
+def test_slow_root_is_kept(pipeline):
+    tracer, exporter, _ = pipeline(baseline_ratio=0.0, latency_threshold=1.0)
+
+    _trace(tracer, duration=0.5)
+    assert exporter.get_finished_spans() == ()
+
+    _trace(tracer, duration=1.5)
+    assert len(exporter.get_finished_spans()) == 2
+
+
+def test_baseline_ratio_keeps_traces_by_trace_id(pipeline):
+    tracer, exporter, _ = pipeline(baseline_ratio=0.5)
+
+    roots = [_trace(tracer, children=0) for _ in range(200)]
+
+    bound = int(0.5 * (_TRACE_ID_MASK + 1))
+    expected = {
+        root.context.trace_id
+        for root in roots
+        if (root.context.trace_id & _TRACE_ID_MASK) < bound
+    }
+    exported = {span.context.trace_id for span in exporter.get_finished_spans()}
+    assert exported == expected
+    assert 0 < len(exported) < len(roots)
+
+
+@pytest.mark.parametrize(
+    "root_status, duration",
+    [(StatusCode.ERROR, 0.0), (None, 5.0)],
+)
+def test_root_decides_at_span_cap(pipeline, root_status, duration):
+    tracer, exporter, metrics = pipeline(
+        baseline_ratio=0.0, latency_threshold=1.0, max_spans_per_trace=2
+    )
+
+    _trace(tracer, children=4, root_status=root_status, duration=duration)
+
+    names = [span.name for span in exporter.get_finished_spans()]
+    assert names == ["db", "db", "GET /orders"]
+    assert _decisions(metrics, "dropped") == 2
+    assert _decisions(metrics, "kept") == 3
+
+
+def test_oldest_trace_is_evicted_when_buffer_is_full(pipeline):
+    tracer, exporter, metrics = pipeline(baseline_ratio=1.0, max_traces=2)
+
+    roots = []
+    for _ in range(3):
+        root = tracer.start_span("GET /orders")
+        child = tracer.start_span("db", context=trace.set_span_in_context(root))
+        child.end()
+        roots.append(root)
+
+    assert _decisions(metrics, "evicted") == 1
+    assert metrics.registry.get_sample_value("tail_sampling_buffered_spans") == 2
+
+    for root in roots:
+        root.end()
+
+    exported = [
+        (span.name, span.context.trace_id) for span in exporter.get_finished_spans()
+    ]
+    first_trace = roots[0].context.trace_id
+    assert [name for name, trace_id in exported if trace_id == first_trace] == [
+        "GET /orders"
+    ]
+    assert len(exported) == 5
+    assert metrics.registry.get_sample_value("tail_sampling_buffered_spans") == 0
@@ -0,0 +1,128 @@
+"""
+Tests for span creation and parenting in TracingCollector.
+"""
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_OFF,
+    ALWAYS_ON,
+    ParentBased,
+    TraceIdRatioBased,
+)
+
+from golden_path.tracing import _NON_RECORDING_SCOPE, TracingCollector
+
+
+class _CountingSampler:
+    """Sampler recording the trace ids it was asked about."""
+
+    def __init__(self, sampler):
+        self.sampler = sampler
+        self.trace_ids = []
+
+    def should_sample(self, parent_context, trace_id, *args, **kwargs):
+        self.trace_ids.append(trace_id)
+        return self.sampler.should_sample(parent_context, trace_id, *args, **kwargs)
+
+    def get_description(self):
+        return "Counting"
+
+
+@pytest.fixture
+def collector():
+    """Build tracing collectors exporting to memory."""
+    collectors = []
+
+    def build(sampler):
+        tracing = TracingCollector("tracing-test", transport="memory", sampler=sampler)
+        collectors.append(tracing)
+        return tracing
+
+    yield build
+    for tracing in collectors:
+        tracing.tracer_provider.shutdown()
+
+
+def _finished(tracing):
+    tracing.tracer_provider.force_flush()
+    return {span.name: span for span in tracing.exporter.get_finished_spans()}
+
+
+def test_nested_spans_are_parented_to_the_enclosing_span(collector):
+    tracing = collector(ParentBased(ALWAYS_ON))
+
+    with tracing.span("root") as root:
+        trace_id = root.get_span_context().trace_id
+        assert tracing.get_trace_id() == format(trace_id, "032x")
+        with tracing.span("child") as child:
+            assert trace.get_current_span() is child
+        assert trace.get_current_span() is root
+
+    spans = _finished(tracing)
+    assert spans["root"].parent is None
+    assert spans["child"].parent.span_id == spans["root"].context.span_id
+    assert spans["child"].context.trace_id == spans["root"].context.trace_id
+
+
+def test_unsampled_root_is_non_recording_and_children_are_skipped(collector):
+    tracing = collector(ParentBased(ALWAYS_OFF))
+
+    with tracing.span("root") as root:
+        span_context = root.get_span_context()
+        assert not root.is_recording()
+        assert span_context.is_valid and not span_context.trace_flags.sampled
+        assert tracing.get_trace_id() == format(span_context.trace_id, "032x")
+
+        assert tracing.span("child") is _NON_RECORDING_SCOPE
+        with tracing.span("child") as child:
+            assert child is root
+
+        detached = tracing.detached_span("generator")
+        assert detached.span is None
+
+    assert tracing.get_trace_id() is None
+    assert _finished(tracing) == {}
+
+
+def test_root_sampler_runs_once_for_the_exported_trace_id(collector):
+    sampler = _CountingSampler(TraceIdRatioBased(0.5))
+    tracing = collector(sampler)
+
+    for _ in range(50):
+        with tracing.span("root"):
+            pass
+
+    tracing.tracer_provider.force_flush()
+    exported = {
+        span.context.trace_id for span in tracing.exporter.get_finished_spans()
+    }
+    assert len(sampler.trace_ids) == 50
+    assert exported == {
+        trace_id
+        for trace_id in sampler.trace_ids
+        if sampler.sampler.should_sample(None, trace_id, "root").decision.is_sampled()
+    }
+    assert 0 < len(exported) < 50
+
+
+def test_sampler_can_be_swapped(collector):
+    tracing = collector(ParentBased(ALWAYS_OFF))
+    tracing.sampler = ParentBased(ALWAYS_ON)
+
+    with tracing.span("root"):
+        with tracing.span("child"):
+            pass
+
+    assert set(_finished(tracing)) == {"root", "child"}
+
+
+def test_ids_are_none_outside_a_span(collector):
+    tracing = collector(ParentBased(ALWAYS_ON))
+
+    assert tracing.get_trace_id() is None
+    assert tracing.get_span_id() is None
+    with tracing.span("root"):
+        assert len(tracing.get_trace_id()) == 32
+        assert len(tracing.get_span_id()) == 16
+    assert tracing.get_trace_id() is None